@@ -0,0 +1,5 @@
+"""Performance benchmarks for the hospital management system.
+
+Each module can be run on its own, e.g. ``python -m benchmarks.connection_bench``.
+Results are printed as JSON so runs can be compared before and after a change.
+"""
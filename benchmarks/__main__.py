@@ -0,0 +1,53 @@
+"""Run the data layer, grid and Jalali formatting benchmarks as one suite.
+
+    python -m benchmarks --scale 100k --output before.json
+    python -m benchmarks bench.db --output after.json
+
+With a database path the existing database is used, otherwise one is
+generated at --scale in a temporary file. All results are written as one
+JSON document so two runs can be compared.
+"""
+import argparse
+import os
+
+from database.connection import db
+from . import models_bench
+from .common import temp_db_path, remove_db, emit
+from .generate import generate, SCALES
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path", nargs="?", help="database generated by benchmarks.generate")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--grid-rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--skip-grid", action="store_true", help="do not start Qt")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    path = args.db_path or temp_db_path("suite")
+    results = {}
+    try:
+        if args.db_path is None:
+            results["generate"] = generate(path, *SCALES[args.scale])
+            db.close_all()
+        results["models"] = models_bench.run(path, args.iterations)
+        if not args.skip_grid:
+            # Imported late so --skip-grid works without PyQt5
+            from . import grid_bench
+            results["grid"] = grid_bench.run(path, args.grid_rows, max(1, args.iterations // 5))
+            # The views package imports PyQt5 as well
+            from . import jalali_bench
+            results["jalali"] = jalali_bench.run(iterations=max(1, args.iterations // 20))
+    finally:
+        if args.db_path is None:
+            remove_db(path)
+
+    results["scale"] = args.scale if args.db_path is None else os.path.basename(path)
+    emit("suite", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
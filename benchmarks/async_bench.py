@@ -0,0 +1,131 @@
+"""Compare concurrent reads through database.async_models with the synchronous API.
+
+    python -m benchmarks.async_bench bench.db --reads 2000 --concurrency 1 4 8
+
+The same mix of read queries (keyset pages, name searches, doctor
+agendas, uncached lookups by id) is run sequentially on the synchronous
+models and then through the async facade with a number of requests in
+flight at once. Reads per second are reported for each run, and for the
+async runs the longest delay of a 1 ms timer on the event loop, i.e. how
+long the loop was kept from other work. Each async call pays an executor
+hand-off; reads overlap only while SQLite runs without the GIL on a free
+core, so small lookups gain responsiveness rather than throughput.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from database.async_models import AsyncModels
+from database.connection import db
+from database.models import PatientModel, DoctorModel, AppointmentModel
+from .common import temp_db_path, remove_db, emit
+from .generate import generate, SCALES
+
+
+# Interval of the event loop responsiveness probe, in seconds
+TICK = 0.001
+
+
+def workload(reads, last_patient, last_doctor, seed=3):
+    """(model, method name, args) read requests"""
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    requests = []
+    for _ in range(reads):
+        day = start + timedelta(days=rng.randrange(700))
+        requests.append(rng.choice((
+            ("appointments", "get_appointments_page", ()),
+            ("patients", "search_patients", (rng.choice(("محمد", "رضایی", "زهرا", "احمدی")),)),
+            ("appointments", "get_doctor_agenda",
+             (rng.randint(1, last_doctor), day.isoformat(), (day + timedelta(days=6)).isoformat())),
+            ("patients", "get_patient_by_id", (rng.randint(1, last_patient),)),
+            ("doctors", "get_doctor_by_id", (rng.randint(1, last_doctor),)),
+        )))
+    return requests
+
+
+def run_sync(models, requests):
+    start = time.perf_counter()
+    for model, method, args in requests:
+        getattr(models[model], method)(*args)
+    return time.perf_counter() - start
+
+
+async def run_async(models, requests, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def call(model, method, args):
+        async with limit:
+            await getattr(getattr(models, model), method)(*args)
+
+    done = asyncio.Event()
+    lag = [0.0]
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lag[0] = max(lag[0], time.perf_counter() - start - TICK)
+
+    probing = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(call(*request) for request in requests))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probing
+    return elapsed, lag[0]
+
+
+def run(db_path=None, reads=2000, concurrency=(1, 2, 4, 8), workers=4):
+    path = db_path or temp_db_path("async")
+    try:
+        if db_path is None:
+            generate(path, *SCALES["10k"])
+        db.configure(path)
+
+        # cache=None so lookups by id reach the database
+        sync_models = {"patients": PatientModel(cache=None), "doctors": DoctorModel(cache=None),
+                       "appointments": AppointmentModel(cache=None)}
+        last_patient = sync_models["patients"].get_patients_page(limit=1)[0][0][0]
+        last_doctor = sync_models["doctors"].get_doctors_page(limit=1)[0][0][0]
+        requests = workload(reads, last_patient, last_doctor)
+
+        # Warm the page cache and the prepared statements first
+        run_sync(sync_models, requests[:100])
+        elapsed = run_sync(sync_models, requests)
+        results = {"reads": reads, "workers": workers,
+                   "sync": {"total_s": round(elapsed, 4), "reads_per_s": round(reads / elapsed, 1)}}
+
+        async_models = AsyncModels(workers, cache=None)
+        try:
+            for level in concurrency:
+                asyncio.run(run_async(async_models, requests[:100], level))
+                elapsed, lag = asyncio.run(run_async(async_models, requests, level))
+                results[f"async[concurrency={level}]"] = {
+                    "total_s": round(elapsed, 4), "reads_per_s": round(reads / elapsed, 1),
+                    "max_loop_lag_ms": round(lag * 1000, 3),
+                }
+        finally:
+            async_models.shutdown()
+        return results
+    finally:
+        db.close_all()
+        if db_path is None:
+            remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path", nargs="?", help="database generated by benchmarks.generate")
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--workers", type=int, default=4, help="reader threads")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    emit("async", run(args.db_path, args.reads, args.concurrency, args.workers), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def measure(func, iterations):
+    """Call func `iterations` times and return timing statistics"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "total_s": round(total, 6),
+        "mean_ms": round(total / iterations * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+        "ops_per_s": round(iterations / total, 1) if total else None,
+    }
+
+
+def temp_db_path(prefix="bench"):
+    """Return a path for a throwaway database file"""
+    fd, path = tempfile.mkstemp(prefix=f"{prefix}_", suffix=".db")
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def remove_db(path):
+    """Remove a database file together with its WAL/SHM companions"""
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def emit(name, results, output=None):
+    """Print benchmark results as JSON, optionally writing them to a file"""
+    payload = {
+        "benchmark": name,
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    return payload
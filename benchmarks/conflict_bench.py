@@ -0,0 +1,83 @@
+"""Benchmark the appointment conflict check for a doctor with a long history.
+
+    python -m benchmarks.conflict_bench --history 50000
+"""
+import argparse
+import random
+
+from database.connection import db
+from database.models import AppointmentModel, DoctorModel, PatientModel
+from .common import measure, temp_db_path, remove_db, emit
+
+
+def seed(history, patients=2000):
+    """One doctor with `history` appointments spread over past years"""
+    patient_ids = range(1, patients + 1)
+    PatientModel().bulk_create_patients(
+        (f"بیمار{i}", "آزمایشی", f"{i:010d}", None, None, None, None, None, None) for i in patient_ids
+    )
+    doctor_id = DoctorModel().create_doctor(("دکتر", "آزمایشی", "عمومی", "", "", "BENCH-1", "", 0))
+
+    rng = random.Random(42)
+    slots = [f"{hour:02d}:{minute:02d}" for hour in range(8, 20) for minute in (0, 15, 30, 45)]
+    rows = (
+        (rng.choice(patient_ids), doctor_id,
+         f"{2015 + i // (len(slots) * 300)}-{(i // len(slots)) % 12 + 1:02d}-{(i // len(slots)) % 28 + 1:02d}",
+         slots[i % len(slots)], "انجام شده", "")
+        for i in range(history)
+    )
+    AppointmentModel().bulk_create_appointments(rows)
+    return doctor_id, patients
+
+
+def run(history=50000, iterations=2000, output=None):
+    path = temp_db_path("conflict")
+    db.configure(path)
+    try:
+        doctor_id, patients = seed(history)
+        model = AppointmentModel()
+        rng = random.Random(7)
+
+        def probe():
+            slot = (rng.randint(1, patients), doctor_id, "2016-05-10",
+                    f"{rng.randint(8, 19):02d}:{rng.choice((0, 10, 20, 40)):02d}", "فعال", "")
+            model.find_conflicts(slot)
+
+        def book():
+            slot = (rng.randint(1, patients), doctor_id, "2030-01-01",
+                    f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}", "فعال", "")
+            try:
+                model.create_appointment(slot)
+            except Exception:
+                pass
+
+        plan = db.get_connection().execute('''
+            EXPLAIN QUERY PLAN
+            SELECT id FROM appointments
+            WHERE doctor_id = ? AND appointment_date = ? AND appointment_time > ? AND appointment_time < ?
+        ''', (doctor_id, "2016-05-10", "09:45", "10:15")).fetchall()
+
+        results = {
+            "history": history,
+            "duration_minutes": model.duration_minutes,
+            "find_conflicts": measure(probe, iterations),
+            "create_with_check": measure(book, min(iterations, 500)),
+            "query_plan": [row[-1] for row in plan],
+        }
+        return emit("conflict", results, output)
+    finally:
+        db.close_all()
+        remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    run(args.history, args.iterations, args.output)
+
+
+if __name__ == "__main__":
+    main()
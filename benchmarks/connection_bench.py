@@ -0,0 +1,63 @@
+"""Compare opening a connection per call against the pooled per-thread connection.
+
+    python -m benchmarks.connection_bench --iterations 2000
+"""
+import argparse
+import sqlite3
+
+from database.connection import DatabaseConnection
+from .common import measure, temp_db_path, remove_db, emit
+
+
+def seed(conn, rows):
+    conn.executemany(
+        "INSERT INTO patients (first_name, last_name, national_id) VALUES (?, ?, ?)",
+        ((f"نام{i}", f"خانوادگی{i}", f"{i:010d}") for i in range(rows)),
+    )
+    conn.commit()
+
+
+def run(iterations=2000, rows=1000, output=None):
+    path = temp_db_path("connection")
+    database = DatabaseConnection(path)
+    try:
+        seed(database.get_connection(), rows)
+        lookup = "SELECT * FROM patients WHERE id = ?"
+
+        def per_call_connect():
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute(lookup, (rows // 2,)).fetchone()
+            finally:
+                conn.close()
+
+        def pooled():
+            with database.cursor() as cursor:
+                cursor.execute(lookup, (rows // 2,))
+                cursor.fetchone()
+
+        results = {
+            "per_call_connect": measure(per_call_connect, iterations),
+            "pooled_connection": measure(pooled, iterations),
+            "pragmas": database.pragmas,
+        }
+        results["speedup"] = round(
+            results["per_call_connect"]["mean_ms"] / results["pooled_connection"]["mean_ms"], 2
+        )
+        return emit("connection", results, output)
+    finally:
+        database.close_all()
+        remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    run(args.iterations, args.rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
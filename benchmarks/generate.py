@@ -0,0 +1,155 @@
+"""Generate a synthetic hospital database with Persian names.
+
+    python -m benchmarks.generate bench.db --patients 200000 --doctors 500 --appointments 2000000
+    python -m benchmarks.generate bench.db --scale 1m
+
+Rows are streamed into the bulk_create_* methods, so memory use does not
+depend on the scale. The output is deterministic for a given --seed.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from database.connection import db
+from database.models import PatientModel, DoctorModel, AppointmentModel
+from .common import emit
+
+
+FIRST_NAMES = [
+    "علی", "محمد", "حسین", "رضا", "مهدی", "امیر", "حسن", "مصطفی", "سعید", "جواد",
+    "مجید", "حمید", "کامران", "بهرام", "داریوش", "فرهاد", "کیوان", "آرش", "سیاوش", "پویا",
+    "فاطمه", "زهرا", "مریم", "سارا", "نرگس", "لیلا", "مینا", "الهام", "شیرین", "پریسا",
+    "نازنین", "سمیرا", "فرشته", "مهسا", "آزاده", "ستاره", "رویا", "هانیه", "یاسمن", "نیلوفر",
+]
+
+LAST_NAMES = [
+    "محمدی", "حسینی", "احمدی", "رضایی", "موسوی", "کریمی", "جعفری", "صادقی", "رحیمی", "نوری",
+    "کاظمی", "هاشمی", "قاسمی", "عباسی", "اکبری", "طاهری", "شریفی", "یوسفی", "مرادی", "باقری",
+    "نجفی", "امیری", "زارعی", "سلطانی", "فرهادی", "بهرامی", "شیرازی", "تهرانی", "اصفهانی", "کرمانی",
+    "میرزایی", "قربانی", "ابراهیمی", "خسروی", "پورمحمدی", "نیکپور", "فتحی", "عسگری", "جلالی", "منصوری",
+]
+
+SPECIALTIES = [
+    "قلب و عروق", "مغز و اعصاب", "اطفال", "زنان و زایمان", "ارتوپدی", "پوست و مو",
+    "چشم پزشکی", "گوش و حلق و بینی", "داخلی", "جراحی عمومی", "روانپزشکی", "اورولوژی",
+    "رادیولوژی", "عفونی", "غدد", "ریه",
+]
+
+CITIES = ["تهران", "اصفهان", "شیراز", "مشهد", "تبریز", "کرج", "قم", "اهواز", "رشت", "کرمان"]
+STREETS = ["ولیعصر", "انقلاب", "آزادی", "فردوسی", "حافظ", "سعدی", "بهار", "شریعتی", "مطهری", "امام"]
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-", ""]
+ALLERGIES = ["", "", "", "", "پنی‌سیلین", "آسپرین", "گرده گل", "بادام زمینی", "لاکتوز"]
+
+# Status mix of historical appointments
+STATUSES = [("انجام شده", 70), ("فعال", 15), ("لغو شده", 10), ("به تعویق افتاده", 5)]
+
+SCALES = {
+    "10k": (10_000, 50, 10_000),
+    "100k": (50_000, 200, 100_000),
+    "1m": (200_000, 500, 1_000_000),
+    "10m": (1_000_000, 2_000, 10_000_000),
+}
+
+
+def phone(rng):
+    return f"09{rng.randint(10, 39)}{rng.randint(0, 9999999):07d}"
+
+
+def patients(count, rng):
+    start = date(1940, 1, 1)
+    for i in range(count):
+        birth = start + timedelta(days=rng.randint(0, 30000))
+        yield (
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            f"{i + 1:010d}",
+            birth.isoformat(),
+            phone(rng),
+            f"{rng.choice(CITIES)}، خیابان {rng.choice(STREETS)}، پلاک {rng.randint(1, 300)}",
+            phone(rng),
+            rng.choice(BLOOD_TYPES),
+            rng.choice(ALLERGIES),
+        )
+
+
+def doctors(count, rng):
+    for i in range(count):
+        yield (
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            rng.choice(SPECIALTIES),
+            phone(rng),
+            f"doctor{i + 1}@clinic.ir",
+            f"MD-{i + 1:06d}",
+            str(rng.randint(100, 999)),
+            rng.choice(range(100000, 1500001, 50000)),
+        )
+
+
+def appointments(count, patient_count, doctor_count, rng, years=5):
+    """Appointments spread over the last `years` years and the next month"""
+    first_day = date.today() - timedelta(days=365 * years)
+    days = 365 * years + 30
+    statuses = [status for status, weight in STATUSES for _ in range(weight)]
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(days))
+        yield (
+            rng.randint(1, patient_count),
+            rng.randint(1, doctor_count),
+            day.isoformat(),
+            f"{rng.randint(8, 19):02d}:{rng.choice((0, 15, 30, 45)):02d}",
+            rng.choice(statuses),
+            "",
+        )
+
+
+def generate(db_path, patient_count, doctor_count, appointment_count, seed=1):
+    """Fill db_path with synthetic rows and return per-table timings"""
+    # Durability does not matter for a throwaway benchmark database
+    db.configure(db_path, pragmas={"synchronous": "OFF"})
+    rng = random.Random(seed)
+    results = {}
+
+    for name, rows, bulk_create in (
+        ("patients", patients(patient_count, rng), PatientModel().bulk_create_patients),
+        ("doctors", doctors(doctor_count, rng), DoctorModel().bulk_create_doctors),
+        ("appointments", appointments(appointment_count, patient_count, doctor_count, rng),
+         AppointmentModel().bulk_create_appointments),
+    ):
+        start = time.perf_counter()
+        report = bulk_create(rows, 5000)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "rows": report["inserted"],
+            "errors": len(report["errors"]),
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(report["inserted"] / elapsed, 1) if elapsed else None,
+        }
+        # stderr: stdout carries the JSON results
+        print(f"Generated {report['inserted']} {name} in {elapsed:.1f}s", file=sys.stderr)
+
+    db.get_connection().execute("ANALYZE")
+    db.configure(db_path, pragmas={"synchronous": "NORMAL"})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path", nargs="?", default="hospital.db")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="preset row counts")
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--doctors", type=int, default=50)
+    parser.add_argument("--appointments", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+
+    counts = SCALES[args.scale] if args.scale else (args.patients, args.doctors, args.appointments)
+    results = generate(args.db_path, *counts, seed=args.seed)
+    emit("generate", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
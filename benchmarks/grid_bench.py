@@ -0,0 +1,108 @@
+"""Time grid rendering of the main window on the offscreen Qt platform.
+
+    python -m benchmarks.grid_bench bench.db --rows 100 1000 10000
+
+For every row count and view, setup_table is timed on its own and
+together with a forced repaint of the table (grab), which is what the
+user waits for. The asynchronous first-page load of each view is timed
+up to the point where its rows are painted.
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+# Must be set before the QApplication is created
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from database.connection import db
+from database.models import PatientModel, DoctorModel, AppointmentModel
+from .common import measure, temp_db_path, remove_db, emit
+from .generate import generate, SCALES
+
+
+def wait_idle(app, window, timeout=60):
+    """Process events until the window's background queries have finished"""
+    deadline = time.perf_counter() + timeout
+    while window.query_runner.is_busy() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+
+
+def run(db_path=None, row_counts=(100, 1000, 10000), iterations=20):
+    """Time setup_table for each view and row count against db_path (or a generated database)"""
+    import main
+
+    path = db_path or temp_db_path("grid")
+    try:
+        if db_path is None:
+            generate(path, *SCALES["10k"])
+        db.configure(path)
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        window = main.HospitalManagementSystem()
+        window.resize(1200, 800)
+        window.show()
+        wait_idle(app, window)
+
+        views = {
+            "patients": (main.PATIENT_HEADERS, PatientModel().iter_patients, window.show_patients),
+            "doctors": (main.DOCTOR_HEADERS, DoctorModel().iter_doctors, window.show_doctors),
+            "appointments": (main.APPOINTMENT_HEADERS, AppointmentModel().iter_appointments,
+                             window.show_appointments),
+        }
+
+        results = {}
+        for view, (headers, fetch_rows, show) in views.items():
+            rows = list(itertools.islice(fetch_rows(), max(row_counts)))
+
+            def first_page():
+                show()
+                wait_idle(app, window)
+                window.table.grab()
+
+            view_results = {"first_page": measure(first_page, iterations)}
+            for count in row_counts:
+                data = rows[:count]
+                if len(data) < count:
+                    continue
+
+                def setup():
+                    window.setup_table(data, headers)
+
+                def setup_and_paint():
+                    window.setup_table(data, headers)
+                    window.table.grab()
+
+                view_results[str(count)] = {
+                    "setup_table": measure(setup, iterations),
+                    "setup_table+paint": measure(setup_and_paint, iterations),
+                }
+            results[view] = view_results
+
+        window.hide()
+        window.deleteLater()
+        app.processEvents()
+        return results
+    finally:
+        db.close_all()
+        if db_path is None:
+            remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path", nargs="?", help="database generated by benchmarks.generate")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    emit("grid", run(args.db_path, args.rows, args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark Gregorian to Jalali date conversion for the grid.
+
+    python -m benchmarks.jalali_bench --values 400000 --days 3650
+
+Converts `values` stored yyyy-MM-dd dates drawn from `days` distinct days
+(a grid repeats the same dates across many rows) with jdatetime per
+value, with the year-start lookup table of views.jalali, and through the
+memoized format_jalali, cold and warm.
+"""
+import argparse
+import random
+from datetime import date, timedelta
+
+from views.jalali import format_jalali, query_date, to_jalali
+from .common import measure, emit
+
+
+def sample_dates(values, days, seed=1):
+    rng = random.Random(seed)
+    first = date(2020, 1, 1)
+    return [(first + timedelta(days=rng.randrange(days))).isoformat() for _ in range(values)]
+
+
+def with_throughput(stats, values):
+    stats["values_per_s"] = round(values / (stats["mean_ms"] / 1000)) if stats["mean_ms"] else None
+    return stats
+
+
+def run(values=400000, days=3650, iterations=5):
+    import jdatetime
+
+    dates = sample_dates(values, days)
+    typed = [format_jalali(value) for value in dates[:10000]]
+
+    def with_jdatetime():
+        for value in dates:
+            jdatetime.date.fromgregorian(date=date.fromisoformat(value)).strftime("%Y/%m/%d")
+
+    def with_table():
+        for value in dates:
+            year, month, day = to_jalali(date.fromisoformat(value))
+            f"{year:04d}/{month:02d}/{day:02d}"
+
+    def cached_cold():
+        format_jalali.cache_clear()
+        for value in dates:
+            format_jalali(value)
+
+    def cached_warm():
+        for value in dates:
+            format_jalali(value)
+
+    def parse_typed():
+        for value in typed:
+            query_date(value)
+
+    results = {
+        "values": values,
+        "distinct_days": days,
+        "jdatetime": with_throughput(measure(with_jdatetime, iterations), values),
+        "lookup_table": with_throughput(measure(with_table, iterations), values),
+        "format_jalali[cold]": with_throughput(measure(cached_cold, iterations), values),
+        "format_jalali[warm]": with_throughput(measure(cached_warm, iterations), values),
+        "query_date": with_throughput(measure(parse_typed, iterations), len(typed)),
+    }
+    results["cache"] = format_jalali.cache_info()._asdict()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=400000)
+    parser.add_argument("--days", type=int, default=3650, help="distinct dates among the values")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    emit("jalali", run(args.values, args.days, args.iterations), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Load-test the HTTP/JSON service (server.py) on localhost.
+
+    HMS_TOKEN=secret python server.py --db bench.db &
+    HMS_TOKEN=secret python -m benchmarks.load_test --url http://127.0.0.1:8765 --clients 8 --requests 4000
+
+Without --url a 10k database is generated and a server is started in this
+process on a free port, with a random token. Each client is a thread with
+its own keep-alive connection sending a mix of page, search and get
+requests plus --write-ratio creates and updates. Latency percentiles per operation,
+status counts and the server's own /metrics are reported.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+from .common import temp_db_path, remove_db, emit
+from .generate import generate, SCALES
+
+
+TAG = "LOAD"
+
+
+def stats(samples):
+    samples = sorted(samples)
+    total = sum(samples)
+    return {
+        "count": len(samples),
+        "mean_ms": round(total / len(samples) * 1000, 4),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 4),
+        "max_ms": round(samples[-1] * 1000, 4),
+    }
+
+
+class Client:
+    """One keep-alive connection to the service"""
+
+    def __init__(self, host, port, token=None):
+        self.connection = http.client.HTTPConnection(host, port, timeout=30)
+        self.token = token
+
+    def request(self, method, path, body=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        self.connection.request(method, path, payload, headers)
+        response = self.connection.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+
+    def close(self):
+        self.connection.close()
+
+
+def operations(rng, write_ratio, last_patient, last_doctor):
+    """Endless (name, method, path, body) requests"""
+    terms = ("محمد", "رضایی", "زهرا", "احمدی")
+    reads = (
+        lambda: ("page appointments", "GET", "/api/appointments?limit=100", None),
+        lambda: ("search patients", "GET", f"/api/patients?q={quote(rng.choice(terms))}", None),
+        lambda: ("get patient", "GET", f"/api/patients/{rng.randint(1, last_patient)}", None),
+        lambda: ("get doctor", "GET", f"/api/doctors/{rng.randint(1, last_doctor)}", None),
+    )
+    while True:
+        if rng.random() >= write_ratio:
+            yield rng.choice(reads)()
+        elif rng.random() < 0.5:
+            # Far-future slots so most creates pass the conflict check
+            day = f"{2200 + rng.randrange(100)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            yield ("create appointment", "POST", "/api/appointments", {
+                "patient_id": rng.randint(1, last_patient), "doctor_id": rng.randint(1, last_doctor),
+                "appointment_date": day, "appointment_time": f"{rng.randint(8, 19):02d}:{rng.choice((0, 15, 30, 45)):02d}",
+                "status": "فعال", "notes": TAG,
+            })
+        else:
+            yield ("update patient", "PUT", f"/api/patients/{rng.randint(1, last_patient)}", None)
+
+
+def worker(host, port, token, count, seed, write_ratio, last_ids, results, lock):
+    rng = random.Random(seed)
+    client = Client(host, port, token)
+    timings, statuses = {}, {}
+    try:
+        source = operations(rng, write_ratio, *last_ids)
+        for _ in range(count):
+            name, method, path, body = next(source)
+            start = time.perf_counter()
+            if method == "PUT":
+                # Read-modify-write of the same record
+                status, record = client.request("GET", path)
+                if status == 200:
+                    record.pop("id")
+                    record["allergies"] = TAG
+                    status, _ = client.request("PUT", path, record)
+            else:
+                status, _ = client.request(method, path, body)
+            timings.setdefault(name, []).append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        client.close()
+        with lock:
+            for name, samples in timings.items():
+                results["timings"].setdefault(name, []).extend(samples)
+            for status, count in statuses.items():
+                results["statuses"][status] = results["statuses"].get(status, 0) + count
+
+
+def run(url=None, clients=8, requests=4000, write_ratio=0.1, token=None):
+    server, thread, path = None, None, None
+    if url is None:
+        import server as service
+        from database.connection import db
+
+        path = temp_db_path("load")
+        generate(path, *SCALES["10k"])
+        db.configure(path)
+        token = secrets.token_urlsafe()
+        server = service.ApiServer(("127.0.0.1", 0), token=token)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = "http://%s:%d" % server.server_address[:2]
+
+    try:
+        parts = urlsplit(url)
+        probe = Client(parts.hostname, parts.port, token)
+        last_ids = tuple(probe.request("GET", f"/api/{name}?limit=1")[1]["rows"][0]["id"]
+                         for name in ("patients", "doctors"))
+        probe.close()
+
+        results = {"timings": {}, "statuses": {}}
+        lock = threading.Lock()
+        threads = [threading.Thread(target=worker,
+                                    args=(parts.hostname, parts.port, token, requests // clients, seed,
+                                          write_ratio, last_ids, results, lock))
+                   for seed in range(clients)]
+        start = time.perf_counter()
+        for client_thread in threads:
+            client_thread.start()
+        for client_thread in threads:
+            client_thread.join()
+        elapsed = time.perf_counter() - start
+
+        # A new connection: the server drops keep-alive connections idle for long
+        probe = Client(parts.hostname, parts.port, token)
+        total = sum(results["statuses"].values())
+        report = {
+            "url": url,
+            "clients": clients,
+            "requests": total,
+            "write_ratio": write_ratio,
+            "total_s": round(elapsed, 4),
+            "requests_per_s": round(total / elapsed, 1),
+            "statuses": {str(status): count for status, count in sorted(results["statuses"].items())},
+            "operations": {name: stats(samples) for name, samples in sorted(results["timings"].items())},
+            "server": probe.request("GET", "/metrics")[1]["requests"],
+        }
+        probe.close()
+        return report
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            db.close_all()
+            remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="running server, e.g. http://127.0.0.1:8765 (default: start one)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=4000, help="total requests over all clients")
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--token", default=os.environ.get("HMS_TOKEN"),
+                        help="token of the --url server (default: $HMS_TOKEN)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    emit("load", run(args.url, args.clients, args.requests, args.write_ratio, args.token), args.output)
+
+
+if __name__ == "__main__":
+    main()
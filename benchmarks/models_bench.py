@@ -0,0 +1,276 @@
+"""Time every public method of PatientModel, DoctorModel and AppointmentModel.
+
+    python -m benchmarks.generate bench.db --scale 100k
+    python -m benchmarks.models_bench bench.db --iterations 200
+
+Without a database path a 10k-row database is generated in a temporary
+file. Rows written by the create/bulk benchmarks are tagged and removed
+afterwards, so an existing database keeps its content.
+"""
+import argparse
+import inspect
+import itertools
+import random
+from datetime import date, timedelta
+
+from database.connection import db
+from database.models import PatientModel, DoctorModel, AppointmentModel, FREE_STATUSES, to_timestamp
+from .common import measure, temp_db_path, remove_db, emit
+from .generate import generate, SCALES
+
+
+# Marker of rows written by the benchmark
+TAG = "BENCH"
+
+# Methods reading a whole table are timed once per run
+FULL_SCAN_ITERATIONS = 1
+
+# Rows per call of the *_many methods
+BATCH = 100
+
+# Ids re-read by the [hot] lookups; small enough to stay in the entity cache
+HOT_IDS = 200
+
+
+def public_methods(model_class):
+    return sorted(name for name, _ in inspect.getmembers(model_class, inspect.isfunction)
+                  if not name.startswith("_"))
+
+
+def max_id(table):
+    return db.get_connection().execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+
+
+def owner_ids(column):
+    """Patient or doctor ids having appointments; the patient and doctor cases add rows that have none"""
+    return [row[0] for row in db.get_connection().execute(
+        f"SELECT DISTINCT {column} FROM appointments WHERE notes IS NOT ?", (TAG,))]
+
+
+def hot_ids(last_id, rng):
+    return rng.sample(range(1, last_id + 1), min(HOT_IDS, last_id))
+
+
+def second_page_cursor(get_page):
+    """Cursor of the second page, so paging is timed away from the table start"""
+    return get_page(None)[1]
+
+
+def batches(iterations):
+    """Iterations of the benchmarks handling many rows per call"""
+    return max(1, iterations // BATCH)
+
+
+def drain(iterable, limit=None):
+    for _ in itertools.islice(iterable, limit):
+        pass
+
+
+def patient_cases(iterations, rng):
+    model = PatientModel()
+    uncached = PatientModel(cache=None)
+    last_id = max_id("patients")
+    hot = hot_ids(last_id, rng)
+    counter = itertools.count(1)
+    created = []
+
+    def row():
+        return ("بیمار", "آزمایشی", f"{TAG}-{next(counter)}", "1990-01-01", "", "", "", "", "")
+
+    cursor = second_page_cursor(model.get_patients_page)
+    return [
+        ("get_all_patients", lambda: model.get_all_patients(), FULL_SCAN_ITERATIONS),
+        ("get_patients_page", lambda: model.get_patients_page(cursor), iterations),
+        ("iter_patients", lambda: drain(model.iter_patients(), 1000), iterations),
+        ("stream_patients", lambda: drain(model.stream_patients(), 10000), iterations),
+        ("get_patient_by_id", lambda: model.get_patient_by_id(rng.randint(1, last_id)), iterations),
+        ("get_patient_by_id[hot]", lambda: model.get_patient_by_id(rng.choice(hot)), iterations),
+        ("get_patient_by_id[uncached]",
+         lambda: uncached.get_patient_by_id(rng.randint(1, last_id)), iterations),
+        ("search_patients", lambda: model.search_patients(rng.choice(("محمد", "رضایی", "00001"))),
+         iterations),
+        # Enough rows for delete_many and delete_patient below
+        ("create_patient", lambda: created.append(model.create_patient(row())),
+         iterations + BATCH * batches(iterations)),
+        ("update_patient", lambda: model.update_patient(created[next(counter) % len(created)], row()),
+         iterations),
+        ("get_many", lambda: uncached.get_many(rng.sample(range(1, last_id + 1), min(BATCH, last_id))),
+         iterations),
+        ("update_many", lambda: model.update_many((record_id, row()) for record_id in created[-BATCH:]),
+         batches(iterations)),
+        ("delete_many", lambda: model.delete_many(created.pop() for _ in range(BATCH)), batches(iterations)),
+        ("delete_patient", lambda: model.delete_patient(created.pop()), iterations),
+        ("bulk_create_patients", lambda: model.bulk_create_patients(row() for _ in range(1000)),
+         batches(iterations)),
+        ("rebuild_search_index", lambda: model.rebuild_search_index(), FULL_SCAN_ITERATIONS),
+    ]
+
+
+def doctor_cases(iterations, rng):
+    model = DoctorModel()
+    uncached = DoctorModel(cache=None)
+    last_id = max_id("doctors")
+    hot = hot_ids(last_id, rng)
+    counter = itertools.count(1)
+    created = []
+
+    def row():
+        return ("دکتر", "آزمایشی", "عمومی", "", "", f"{TAG}-{next(counter)}", "", 0)
+
+    cursor = second_page_cursor(model.get_doctors_page)
+    return [
+        ("get_all_doctors", lambda: model.get_all_doctors(), FULL_SCAN_ITERATIONS),
+        ("get_doctors_page", lambda: model.get_doctors_page(cursor), iterations),
+        ("iter_doctors", lambda: drain(model.iter_doctors(), 1000), iterations),
+        ("stream_doctors", lambda: drain(model.stream_doctors(), 10000), iterations),
+        ("get_doctor_by_id", lambda: model.get_doctor_by_id(rng.randint(1, last_id)), iterations),
+        ("get_doctor_by_id[hot]", lambda: model.get_doctor_by_id(rng.choice(hot)), iterations),
+        ("get_doctor_by_id[uncached]",
+         lambda: uncached.get_doctor_by_id(rng.randint(1, last_id)), iterations),
+        ("search_doctors", lambda: model.search_doctors(rng.choice(("قلب", "کریمی", "MD-0001"))),
+         iterations),
+        # Enough rows for delete_many and delete_doctor below
+        ("create_doctor", lambda: created.append(model.create_doctor(row())),
+         iterations + BATCH * batches(iterations)),
+        ("update_doctor", lambda: model.update_doctor(created[next(counter) % len(created)], row()),
+         iterations),
+        ("get_many", lambda: uncached.get_many(rng.sample(range(1, last_id + 1), min(BATCH, last_id))),
+         iterations),
+        ("update_many", lambda: model.update_many((record_id, row()) for record_id in created[-BATCH:]),
+         batches(iterations)),
+        ("delete_many", lambda: model.delete_many(created.pop() for _ in range(BATCH)), batches(iterations)),
+        ("delete_doctor", lambda: model.delete_doctor(created.pop()), iterations),
+        ("bulk_create_doctors", lambda: model.bulk_create_doctors(row() for _ in range(1000)),
+         batches(iterations)),
+        ("rebuild_search_index", lambda: model.rebuild_search_index(), FULL_SCAN_ITERATIONS),
+    ]
+
+
+def appointment_cases(iterations, rng):
+    model = AppointmentModel()
+    uncached = AppointmentModel(cache=None)
+    last_id = max_id("appointments")
+    hot = hot_ids(last_id, rng)
+    patient_ids, doctor_ids = owner_ids("patient_id"), owner_ids("doctor_id")
+    days = itertools.count()
+    statuses = itertools.cycle(FREE_STATUSES)
+    created = []
+
+    def row():
+        # One appointment per day far in the future never conflicts
+        day = next(days)
+        appointment_date = f"{2100 + day // 336}-{day // 28 % 12 + 1:02d}-{day % 28 + 1:02d}"
+        return (1, 1, appointment_date, "10:00", "فعال", TAG)
+
+    def probe():
+        return (rng.choice(patient_ids), rng.choice(doctor_ids), "2024-05-10",
+                f"{rng.randint(8, 19):02d}:{rng.choice((0, 10, 20, 40)):02d}", "فعال", "")
+
+    def agenda_week():
+        # generate spreads appointments over the last years
+        first_day = date.today() - timedelta(days=rng.randrange(365))
+        return (rng.choice(doctor_ids), first_day.isoformat(), (first_day + timedelta(days=6)).isoformat())
+
+    def one_day():
+        start = to_timestamp((date.today() - timedelta(days=rng.randrange(365))).isoformat())
+        return start, start + 24 * 60
+
+    cursor = second_page_cursor(model.get_appointments_page)
+    return [
+        ("get_all_appointments", lambda: model.get_all_appointments(), FULL_SCAN_ITERATIONS),
+        ("get_appointments_page", lambda: model.get_appointments_page(cursor), iterations),
+        ("iter_appointments", lambda: drain(model.iter_appointments(), 1000), iterations),
+        ("stream_appointments", lambda: drain(model.stream_appointments(), 10000), iterations),
+        ("stream_appointments[doctor]",
+         lambda: drain(model.stream_appointments(doctor_id=rng.choice(doctor_ids))), iterations),
+        ("search_appointments", lambda: model.search_appointments(rng.choice(("محمد", "رضایی"))),
+         iterations),
+        ("search_appointments[status]", lambda: model.search_appointments(status="لغو شده"), iterations),
+        ("get_appointment_row", lambda: model.get_appointment_row(rng.randint(1, last_id)), iterations),
+        ("get_appointment_by_id", lambda: model.get_appointment_by_id(rng.randint(1, last_id)), iterations),
+        ("get_appointment_by_id[hot]", lambda: model.get_appointment_by_id(rng.choice(hot)), iterations),
+        ("get_appointment_by_id[uncached]",
+         lambda: uncached.get_appointment_by_id(rng.randint(1, last_id)), iterations),
+        ("find_conflicts", lambda: model.find_conflicts(probe()), iterations),
+        ("get_doctor_agenda", lambda: model.get_doctor_agenda(*agenda_week()), iterations),
+        ("get_appointments_between", lambda: model.get_appointments_between(*one_day()), iterations),
+        ("get_appointments_between[status]",
+         lambda: model.get_appointments_between(*one_day(), status="لغو شده"), iterations),
+        # Enough rows for delete_many and delete_appointment below
+        ("create_appointment", lambda: created.append(model.create_appointment(row())),
+         iterations + BATCH * batches(iterations)),
+        ("update_appointment",
+         lambda: model.update_appointment(created[rng.randrange(len(created))], row()), iterations),
+        ("get_many", lambda: uncached.get_many(rng.sample(range(1, last_id + 1), min(BATCH, last_id))),
+         iterations),
+        ("update_many", lambda: model.update_many((record_id, row()) for record_id in created[-BATCH:]),
+         batches(iterations)),
+        # from_statuses=None and alternating statuses, so every call changes its rows
+        ("bulk_update_status",
+         lambda: model.bulk_update_status(next(statuses), ids=created[-BATCH:], from_statuses=None),
+         batches(iterations)),
+        ("bulk_update_status[doctor]",
+         lambda: model.bulk_update_status(next(statuses), doctor_id=1, date_from="2100-01-01",
+                                          date_to="2199-12-31", from_statuses=None),
+         batches(iterations)),
+        ("delete_many", lambda: model.delete_many(created.pop() for _ in range(BATCH)), batches(iterations)),
+        ("delete_appointment", lambda: model.delete_appointment(created.pop()), iterations),
+        ("bulk_create_appointments",
+         lambda: model.bulk_create_appointments(row() for _ in range(1000)), batches(iterations)),
+    ]
+
+
+def cleanup():
+    with db.cursor() as cursor:
+        cursor.execute("DELETE FROM appointments WHERE notes = ?", (TAG,))
+        cursor.execute("DELETE FROM patients WHERE national_id LIKE ?", (f"{TAG}-%",))
+        cursor.execute("DELETE FROM doctors WHERE license_number LIKE ?", (f"{TAG}-%",))
+
+
+def run_cases(model_class, cases):
+    results = {}
+    for name, func, iterations in cases:
+        results[name] = measure(func, iterations)
+    # Flag public methods that gained no benchmark
+    timed = {name.split("[")[0] for name, _, _ in cases}
+    missing = [name for name in public_methods(model_class) if name not in timed]
+    if missing:
+        results["untimed"] = missing
+    return results
+
+
+def run(db_path=None, iterations=100, seed=1):
+    """Time the model methods against db_path (or a generated 10k database)"""
+    path = db_path or temp_db_path("models")
+    try:
+        if db_path is None:
+            generate(path, *SCALES["10k"], seed=seed)
+        db.configure(path)
+        rng = random.Random(seed)
+        try:
+            return {
+                "database": {table: max_id(table) for table in ("patients", "doctors", "appointments")},
+                "PatientModel": run_cases(PatientModel, patient_cases(iterations, rng)),
+                "DoctorModel": run_cases(DoctorModel, doctor_cases(iterations, rng)),
+                "AppointmentModel": run_cases(AppointmentModel, appointment_cases(iterations, rng)),
+            }
+        finally:
+            cleanup()
+    finally:
+        db.close_all()
+        if db_path is None:
+            remove_db(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db_path", nargs="?", help="database generated by benchmarks.generate")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args()
+    emit("models", run(args.db_path, args.iterations, args.seed), args.output)
+
+
+if __name__ == "__main__":
+    main()
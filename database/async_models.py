@@ -0,0 +1,181 @@
+"""asyncio facade over the models, for automation outside the GUI.
+
+    models = AsyncModels()
+    patient = await models.patients.get_patient_by_id(7)
+    async for row in models.appointments.iter_appointments():
+        ...
+    await models.appointments.create_appointment(data)
+    models.shutdown()    # also closes the workers' database connections
+
+Every coroutine runs the synchronous model method on an executor, so the
+event loop never waits on SQLite. Reads run on a pool of read_workers
+threads, each with its own connection from the per-thread connection
+manager; with WAL they proceed concurrently with each other and with a
+write. Writes go to a single writer thread, so they are applied one at a
+time in submission order and never contend for the write lock among
+themselves.
+
+The stream_* generators are not mirrored: their cursor belongs to the
+thread that opened it. The iter_* methods are async generators reading
+one keyset page per executor call instead.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .connection import db
+from .models import PatientModel, DoctorModel, AppointmentModel, PAGE_SIZE, entity_cache
+
+
+# Threads running read queries concurrently
+READ_WORKERS = 4
+
+
+def _on_each_thread(executor, workers, func):
+    """Queue func once per thread of an executor whose `workers` threads are all started.
+
+    Every call waits for the others at a barrier, so no thread can take two.
+    """
+    barrier = threading.Barrier(workers)
+
+    def run():
+        try:
+            func()
+        finally:
+            barrier.wait()
+
+    return [executor.submit(run) for _ in range(workers)]
+
+
+class DatabaseExecutors:
+    """Reader thread pool and single writer thread shared by the async models"""
+
+    def __init__(self, read_workers=READ_WORKERS):
+        self.read_workers = read_workers
+        self.readers = ThreadPoolExecutor(read_workers, thread_name_prefix="db-read")
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+        # Start every reader now: shutdown reaches each thread's connection by running
+        # one call per thread, which needs the set of threads to be fixed
+        _on_each_thread(self.readers, read_workers, lambda: None)
+
+    def read(self, func, *args, **kwargs):
+        """Await func(*args, **kwargs) run on a reader thread"""
+        return asyncio.get_running_loop().run_in_executor(
+            self.readers, functools.partial(func, *args, **kwargs))
+
+    def write(self, func, *args, **kwargs):
+        """Await func(*args, **kwargs) run on the writer thread, after earlier writes"""
+        return asyncio.get_running_loop().run_in_executor(
+            self.writer, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        """Stop the threads once the queued calls have run, each closing its own connection"""
+        # A connection can only be closed by its thread; closing the last one checkpoints the WAL
+        _on_each_thread(self.readers, self.read_workers, db.close)
+        self.writer.submit(db.close)
+        self.readers.shutdown(wait)
+        self.writer.shutdown(wait)
+
+
+def _delegate(model_class, name, write):
+    """Coroutine method calling the model method `name` on the reader pool or the writer"""
+    async def method(self, *args, **kwargs):
+        run = self.executors.write if write else self.executors.read
+        return await run(getattr(self.model, name), *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"Async{model_class.__name__}.{name}"
+    method.__doc__ = getattr(model_class, name).__doc__
+    return method
+
+
+class AsyncModel:
+    """Coroutine versions of a model's methods, declared by MODEL/READS/WRITES.
+
+    The methods are generated once per subclass: READS run on the reader
+    pool, WRITES on the writer thread.
+    """
+
+    MODEL = None
+    READS = ()
+    WRITES = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.READS:
+            setattr(cls, name, _delegate(cls.MODEL, name, write=False))
+        for name in cls.WRITES:
+            setattr(cls, name, _delegate(cls.MODEL, name, write=True))
+
+    def __init__(self, executors, cache=entity_cache):
+        self.executors = executors
+        self.model = self.MODEL(cache=cache)
+
+    async def _iter_pages(self, page_method, page_size):
+        after_key = None
+        fetch_page = getattr(self.model, page_method)
+        while True:
+            rows, after_key = await self.executors.read(fetch_page, after_key, page_size)
+            for row in rows:
+                yield row
+            if after_key is None:
+                return
+
+
+class AsyncPatientModel(AsyncModel):
+    MODEL = PatientModel
+    READS = ("get_all_patients", "get_patients_page", "get_patient_by_id", "get_many",
+             "search_patients")
+    WRITES = ("create_patient", "bulk_create_patients", "update_patient", "delete_patient",
+              "update_many", "delete_many", "rebuild_search_index")
+
+    def iter_patients(self, page_size=PAGE_SIZE):
+        """Asynchronously iterate all patients one keyset page at a time"""
+        return self._iter_pages("get_patients_page", page_size)
+
+
+class AsyncDoctorModel(AsyncModel):
+    MODEL = DoctorModel
+    READS = ("get_all_doctors", "get_doctors_page", "get_doctor_by_id", "get_many",
+             "search_doctors")
+    WRITES = ("create_doctor", "bulk_create_doctors", "update_doctor", "delete_doctor",
+              "update_many", "delete_many", "rebuild_search_index")
+
+    def iter_doctors(self, page_size=PAGE_SIZE):
+        """Asynchronously iterate all doctors one keyset page at a time"""
+        return self._iter_pages("get_doctors_page", page_size)
+
+
+class AsyncAppointmentModel(AsyncModel):
+    MODEL = AppointmentModel
+    READS = ("get_all_appointments", "get_appointments_page", "search_appointments",
+             "get_appointments_between", "get_appointment_row", "get_doctor_agenda",
+             "get_appointment_by_id", "get_many", "find_conflicts")
+    WRITES = ("create_appointment", "bulk_create_appointments", "update_appointment",
+              "bulk_update_status", "delete_appointment", "update_many", "delete_many")
+
+    def iter_appointments(self, page_size=PAGE_SIZE):
+        """Asynchronously iterate all appointments (latest first) one keyset page at a time"""
+        return self._iter_pages("get_appointments_page", page_size)
+
+
+class AsyncModels:
+    """The three async models over one set of executors"""
+
+    def __init__(self, read_workers=READ_WORKERS, cache=entity_cache):
+        self.executors = DatabaseExecutors(read_workers)
+        self.patients = AsyncPatientModel(self.executors, cache)
+        self.doctors = AsyncDoctorModel(self.executors, cache)
+        self.appointments = AsyncAppointmentModel(self.executors, cache)
+
+    def shutdown(self, wait=True):
+        """Stop the executor threads once the queued calls have run, closing their connections"""
+        self.executors.shutdown(wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # Let queued writes finish without blocking the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
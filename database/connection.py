@@ -1,77 +1,170 @@
+import logging
 import sqlite3
 import os
+import threading
+from contextlib import contextmanager
+
+from .instrumentation import InstrumentedConnection, INSTRUMENTED
+from .migrations import migrate
+from .search_index import table_exists
+
+
+# Pragmas applied once to every long-lived connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,      # milliseconds
+    "cache_size": -20000,      # negative = KiB, i.e. ~20 MB page cache
+    "mmap_size": 268435456,    # 256 MB
+    "temp_store": "MEMORY",
+    # Off by default in SQLite; the models decide whether deletes cascade (models.ON_DELETE)
+    "foreign_keys": "ON",
+}
+
+logger = logging.getLogger(__name__)
+
+# Prepared statements kept per connection; the models use a few dozen distinct statements
+STATEMENT_CACHE_SIZE = 256
 
 
 class DatabaseConnection:
-    def __init__(self, db_path="hospital.db"):
+    """Per-thread SQLite connections to one database file.
+
+    Nothing is opened on construction: the schema is brought up to date
+    by the first get_connection() call, so importing this module is cheap.
+    """
+
+    def __init__(self, db_path="hospital.db", pragmas=None, instrumented=INSTRUMENTED):
         self.db_path = db_path
-        self.init_database()
+        # Time every statement into instrumentation.query_stats (opt-in, it costs
+        # about as much as a primary key lookup per statement)
+        self.instrumented = instrumented
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+
+        # One persistent connection per thread
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._fts_enabled = False
+
+    @property
+    def fts_enabled(self):
+        """Whether the full-text indexes exist"""
+        self.ensure_initialized()
+        return self._fts_enabled
+
+    def ensure_initialized(self):
+        """Run init_database once, on first use of the database"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized:
+                self.init_database()
+                self._initialized = True
+
+    def connect(self):
+        """Open a new tuned connection (not pooled)"""
+        factory = InstrumentedConnection if self.instrumented else sqlite3.Connection
+        conn = sqlite3.connect(self.db_path, factory=factory, cached_statements=STATEMENT_CACHE_SIZE)
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
 
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get the long-lived database connection of the current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.ensure_initialized()
+            conn = self._thread_connection()
+        return conn
 
-    def init_database(self):
-        """Initialize database with tables"""
+    def _thread_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def cursor(self, immediate=False):
+        """Yield a cursor on the thread's connection, commit on success and rollback on error.
+
+        With immediate=True the write lock is taken up front (BEGIN IMMEDIATE),
+        so a read-check-write sequence cannot race another connection.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
-
         try:
-            # Create patients table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS patients (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    national_id TEXT UNIQUE NOT NULL,
-                    birth_date DATE,
-                    phone TEXT,
-                    address TEXT,
-                    emergency_contact TEXT,
-                    blood_type TEXT,
-                    allergies TEXT
-                )
-            ''')
-
-            # Create doctors table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS doctors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    specialty TEXT NOT NULL,
-                    phone TEXT,
-                    email TEXT,
-                    license_number TEXT UNIQUE,
-                    office_number TEXT,
-                    consultation_fee REAL DEFAULT 0
-                )
-            ''')
-
-            # Create appointments table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS appointments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    patient_id INTEGER NOT NULL,
-                    doctor_id INTEGER NOT NULL,
-                    appointment_date DATE NOT NULL,
-                    appointment_time TIME NOT NULL,
-                    status TEXT DEFAULT 'فعال',
-                    notes TEXT,
-                    FOREIGN KEY (patient_id) REFERENCES patients (id),
-                    FOREIGN KEY (doctor_id) REFERENCES doctors (id)
-                )
-            ''')
-
+            if immediate:
+                cursor.execute("BEGIN IMMEDIATE")
+            yield cursor
             conn.commit()
-            print("Database initialized successfully")
-
-        except Exception as e:
-            print(f"Error initializing database: {e}")
+        except Exception:
             conn.rollback()
+            raise
         finally:
+            cursor.close()
+
+    def configure(self, db_path=None, pragmas=None, instrumented=None):
+        """Switch to another database file, pragmas and/or instrumentation; connections are reopened on next use"""
+        self.close_all()
+        if db_path is not None:
+            self.db_path = db_path
+        if pragmas:
+            self.pragmas.update(pragmas)
+        if instrumented is not None:
+            self.instrumented = instrumented
+        # The new database is initialized on first use
+        self._initialized = False
+
+    def close(self):
+        """Close the current thread's connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
             conn.close()
 
+    def close_all(self):
+        """Close every connection opened by this instance"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connection belongs to another thread; it is released with that thread
+                pass
+        self._local = threading.local()
+
+    def init_database(self):
+        """Bring the schema up to date; no DDL runs when it is already current"""
+        conn = self._thread_connection()
+
+        try:
+            if migrate(conn):
+                logger.info("Database %s initialized", self.db_path)
+        except Exception:
+            # Every query would run against a half-migrated schema
+            logger.exception("Error initializing database %s", self.db_path)
+            raise
+
+        cursor = conn.cursor()
+        try:
+            self._fts_enabled = (table_exists(cursor, "patients_fts")
+                                 and table_exists(cursor, "doctors_fts"))
+        finally:
+            cursor.close()
+
 
-# Global database instance
-db = DatabaseConnection()
\ No newline at end of file
+# Global database instance; opened lazily on first query
+db = DatabaseConnection()
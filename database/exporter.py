@@ -0,0 +1,100 @@
+"""Streaming export of patients, doctors and appointments to CSV or JSONL.
+
+Rows are read from the cursor in fixed-size batches and written as they
+arrive, so memory use stays constant however large the export is.
+Appointment filters are applied in SQL.
+
+    python -m database.exporter appointments appointments-1403.csv --from 2024-03-20 --to 2025-03-20
+    python -m database.exporter appointments - --format jsonl --doctor 7
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from .connection import db
+from .models import PatientModel, DoctorModel, AppointmentModel, STREAM_BATCH_SIZE
+
+
+def write_csv(rows, columns, file):
+    writer = csv.writer(file)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl(rows, columns, file):
+    count = 0
+    for row in rows:
+        file.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+}
+
+
+def export_rows(entity, date_from=None, date_to=None, doctor_id=None, batch_size=STREAM_BATCH_SIZE):
+    """Return (columns, row iterator) for an entity"""
+    if entity == "patients":
+        return ("id",) + PatientModel.COLUMNS, PatientModel().stream_patients(batch_size)
+    if entity == "doctors":
+        return ("id",) + DoctorModel.COLUMNS, DoctorModel().stream_doctors(batch_size)
+    if entity == "appointments":
+        rows = AppointmentModel().stream_appointments(date_from, date_to, doctor_id, batch_size)
+        return AppointmentModel.EXPORT_COLUMNS, rows
+    raise ValueError(f"Unknown entity: {entity}")
+
+
+def export_to_file(entity, file, file_format="csv", **filters):
+    """Write an export to an open text file; return the number of rows written"""
+    columns, rows = export_rows(entity, **filters)
+    return WRITERS[file_format](rows, columns, file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export records to CSV or JSONL")
+    parser.add_argument("entity", choices=["patients", "doctors", "appointments"])
+    parser.add_argument("path", help="output file, or - for stdout")
+    parser.add_argument("--format", choices=sorted(WRITERS), help="defaults to the file extension, else csv")
+    parser.add_argument("--from", dest="date_from", help="first appointment date (yyyy-MM-dd)")
+    parser.add_argument("--to", dest="date_to", help="last appointment date (yyyy-MM-dd)")
+    parser.add_argument("--doctor", type=int, dest="doctor_id", help="only this doctor's appointments")
+    parser.add_argument("--batch-size", type=int, default=STREAM_BATCH_SIZE)
+    parser.add_argument("--db", default="hospital.db", help="database file")
+    args = parser.parse_args()
+
+    db.configure(args.db)
+
+    file_format = args.format
+    if file_format is None:
+        extension = os.path.splitext(args.path)[1].lstrip(".").lower()
+        file_format = extension if extension in WRITERS else "csv"
+
+    filters = {"batch_size": args.batch_size}
+    if args.entity == "appointments":
+        filters.update(date_from=args.date_from, date_to=args.date_to, doctor_id=args.doctor_id)
+
+    start = time.perf_counter()
+    if args.path == "-":
+        count = export_to_file(args.entity, sys.stdout, file_format, **filters)
+    else:
+        # utf-8-sig so spreadsheet programs detect the Persian text correctly
+        encoding = "utf-8-sig" if file_format == "csv" else "utf-8"
+        with open(args.path, "w", newline="", encoding=encoding) as file:
+            count = export_to_file(args.entity, file, file_format, **filters)
+    elapsed = time.perf_counter() - start
+
+    print(f"Exported {count} {args.entity} in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
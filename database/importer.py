@@ -0,0 +1,111 @@
+"""Streaming bulk import of patients, doctors and appointments.
+
+Rows are read lazily from CSV (with a header row) or JSONL files and
+inserted in chunked transactions, so memory use does not grow with the
+file size. Rows violating a constraint (duplicate national_id or
+license_number, missing patient or doctor) and appointments whose date is
+not yyyy-MM-dd or time not HH:mm are reported and skipped.
+
+    python -m database.importer patients patients.csv
+    python -m database.importer appointments appointments.jsonl --errors errors.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from .connection import db
+from .models import PatientModel, DoctorModel, AppointmentModel, BULK_CHUNK_SIZE
+
+
+def read_csv(path):
+    """Yield one dict per CSV row"""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        yield from csv.DictReader(file)
+
+
+def read_jsonl(path):
+    """Yield one dict per non-empty JSONL line"""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+}
+
+
+def as_tuples(records, columns):
+    """Turn dict records into tuples in column order; missing or empty fields become None"""
+    for record in records:
+        yield tuple(None if record.get(column) == "" else record.get(column) for column in columns)
+
+
+def importers():
+    patients, doctors, appointments = PatientModel(), DoctorModel(), AppointmentModel()
+    return {
+        "patients": (PatientModel.COLUMNS, patients.bulk_create_patients),
+        "doctors": (DoctorModel.COLUMNS, doctors.bulk_create_doctors),
+        "appointments": (AppointmentModel.COLUMNS, appointments.bulk_create_appointments),
+    }
+
+
+def import_file(entity, path, file_format=None, chunk_size=BULK_CHUNK_SIZE):
+    """Import a CSV/JSONL file; return the bulk report with timing added"""
+    if file_format is None:
+        file_format = os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format not in READERS:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    columns, bulk_create = importers()[entity]
+    rows = as_tuples(READERS[file_format](path), columns)
+
+    start = time.perf_counter()
+    report = bulk_create(rows, chunk_size)
+    elapsed = time.perf_counter() - start
+
+    processed = report["inserted"] + len(report["errors"])
+    report["seconds"] = elapsed
+    report["rows_per_second"] = processed / elapsed if elapsed else 0.0
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import records from CSV or JSONL")
+    parser.add_argument("entity", choices=["patients", "doctors", "appointments"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(READERS), help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--errors", help="write rejected rows to this JSONL file")
+    parser.add_argument("--db", default="hospital.db", help="database file")
+    args = parser.parse_args()
+
+    db.configure(args.db)
+
+    report = import_file(args.entity, args.path, args.format, args.chunk_size)
+
+    print(f"Imported {report['inserted']} {args.entity} in {report['seconds']:.2f}s "
+          f"({report['rows_per_second']:.0f} rows/sec), {len(report['errors'])} rejected")
+
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as file:
+            for number, message, row in report["errors"]:
+                file.write(json.dumps({"row": number, "error": message, "values": row},
+                                      ensure_ascii=False) + "\n")
+    else:
+        for number, message, _ in report["errors"][:20]:
+            print(f"  row {number}: {message}")
+        if len(report["errors"]) > 20:
+            print(f"  ... {len(report['errors']) - 20} more (use --errors to save them all)")
+
+    sys.exit(1 if report["errors"] and not report["inserted"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Per-statement timing, slow-query log and query-plan capture.
+
+When enabled, connections opened by DatabaseConnection use
+InstrumentedConnection, whose cursors time every statement from execute
+until its last row has been fetched (SQLite computes rows lazily, so
+fetching is part of the cost) and count the rows returned or changed.
+The samples are aggregated per SQL text in query_stats.
+
+The first time a statement is seen its EXPLAIN QUERY PLAN is captured, so
+statements scanning a whole table are flagged with full_scan. Statements
+slower than the threshold are written to the "database.slow_queries"
+logger as one JSON object per line.
+
+Instrumentation is off by default: timing and recording a statement costs
+about as much as a primary key lookup. Configuration through the
+environment:
+
+    HMS_QUERY_STATS=1      instrument every connection
+    HMS_QUERY_STATS_FILE   instrument, and dump the aggregated statistics to
+                           this JSON file at exit
+    HMS_SLOW_QUERY_LOG     instrument, and also append the slow-query log to this file
+    HMS_SLOW_QUERY_MS      slow-query threshold in milliseconds (default 100)
+"""
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+
+# Durations kept per statement for the percentiles
+SAMPLE_WINDOW = 1000
+
+SLOW_QUERY_MS = float(os.environ.get("HMS_SLOW_QUERY_MS", 100))
+
+# Default of DatabaseConnection(instrumented=...)
+INSTRUMENTED = any(os.environ.get(name) for name in ("HMS_QUERY_STATS", "HMS_QUERY_STATS_FILE",
+                                                     "HMS_SLOW_QUERY_LOG"))
+
+# Statements EXPLAIN QUERY PLAN can describe
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+slow_log = logging.getLogger("database.slow_queries")
+
+
+@lru_cache(maxsize=1024)
+def normalize(sql):
+    """SQL text with whitespace collapsed, used as the statistics key"""
+    return " ".join(sql.split())
+
+
+def explain(connection, sql, parameters=()):
+    """EXPLAIN QUERY PLAN rows of a statement as a list of detail strings"""
+    if not normalize(sql).upper().startswith(EXPLAINABLE):
+        return []
+    # A plain cursor, so capturing the plan is not itself instrumented
+    cursor = sqlite3.Cursor(connection)
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    except sqlite3.Error:
+        return []
+    finally:
+        cursor.close()
+
+
+def is_full_scan(plan):
+    """True if the plan reads a whole table (FTS virtual tables excluded)"""
+    return any(detail.startswith("SCAN ")
+               and "VIRTUAL TABLE" not in detail
+               and detail != "SCAN CONSTANT ROW"
+               for detail in plan)
+
+
+class QueryStats:
+    """Aggregated timings per statement, shared by every connection"""
+
+    def __init__(self, slow_threshold_ms=SLOW_QUERY_MS):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._queries = {}
+        self._lock = threading.Lock()
+
+    def record(self, connection, sql, parameters, elapsed, rows):
+        key = normalize(sql)
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry is None:
+                entry = self._queries[key] = {
+                    "count": 0, "rows": 0, "total": 0.0, "max": 0.0,
+                    "samples": deque(maxlen=SAMPLE_WINDOW), "plan": None,
+                }
+            entry["count"] += 1
+            entry["rows"] += rows
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["samples"].append(elapsed)
+            plan = entry["plan"]
+
+        if plan is None:
+            plan = entry["plan"] = explain(connection, sql, parameters)
+
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= self.slow_threshold_ms:
+            # Parameters are left out: they hold patient data
+            slow_log.warning(json.dumps({
+                "event": "slow_query",
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "duration_ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "sql": key,
+                "full_scan": is_full_scan(plan),
+                "plan": plan,
+            }, ensure_ascii=False))
+
+    def snapshot(self):
+        """Per-statement statistics, the most expensive statements first"""
+        with self._lock:
+            items = [(key, dict(entry, samples=sorted(entry["samples"])))
+                     for key, entry in self._queries.items()]
+
+        stats = []
+        for key, entry in items:
+            samples = entry["samples"]
+            plan = entry["plan"] or []
+            stats.append({
+                "sql": key,
+                "count": entry["count"],
+                "rows": entry["rows"],
+                "total_ms": round(entry["total"] * 1000, 3),
+                "mean_ms": round(entry["total"] / entry["count"] * 1000, 4),
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+                "max_ms": round(entry["max"] * 1000, 4),
+                "full_scan": is_full_scan(plan),
+                "plan": plan,
+            })
+        stats.sort(key=lambda item: item["total_ms"], reverse=True)
+        return stats
+
+    def dump(self, path=None):
+        """Statistics as JSON text, optionally written to a file"""
+        text = json.dumps(self.snapshot(), indent=2, ensure_ascii=False)
+        if path:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(text + "\n")
+        return text
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+
+
+query_stats = QueryStats()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor reporting each statement to query_stats once its rows are consumed"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._sample = None
+
+    def _begin(self, sql, parameters, start):
+        self._finish()
+        elapsed = time.perf_counter() - start
+        if self.description is None:
+            # No result rows: done, rowcount holds the changed rows
+            query_stats.record(self.connection, sql, parameters, elapsed, max(self.rowcount, 0))
+        else:
+            self._sample = [sql, parameters, elapsed, 0]
+
+    def _finish(self):
+        sample, self._sample = self._sample, None
+        if sample is not None:
+            query_stats.record(self.connection, *sample)
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._begin(sql, parameters, start)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        # Keep the first parameter set for the plan; the sequence may be a one-shot iterator
+        first = []
+
+        def remember(rows):
+            for row in rows:
+                if not first:
+                    first.append(row)
+                yield row
+
+        start = time.perf_counter()
+        super().executemany(sql, remember(seq_of_parameters))
+        self._begin(sql, first[0] if first else (), start)
+        return self
+
+    def _fetched(self, start, rows, done):
+        sample = self._sample
+        if sample is not None:
+            sample[2] += time.perf_counter() - start
+            sample[3] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, and execute shortcuts, are instrumented"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute* would otherwise bypass the cursor factory
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def configure_slow_log(path):
+    """Append the slow-query log to a file as JSON lines"""
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_log.addHandler(handler)
+
+
+if os.environ.get("HMS_SLOW_QUERY_LOG"):
+    configure_slow_log(os.environ["HMS_SLOW_QUERY_LOG"])
+
+if os.environ.get("HMS_QUERY_STATS_FILE"):
+    atexit.register(query_stats.dump, os.environ["HMS_QUERY_STATS_FILE"])
@@ -0,0 +1,82 @@
+"""One-off maintenance jobs.
+
+Before foreign keys were enforced, deleting a patient or doctor left
+their appointments behind. The joins of the appointment lists hide these
+orphans but still scan them, the reports count them, and with foreign
+keys on they can no longer be updated. The orphans job finds every row
+whose foreign key points at a missing row (PRAGMA foreign_key_check) and,
+with --delete, removes them all in one transaction, optionally archiving
+them as JSON lines first.
+
+    python -m database.maintenance orphans
+    python -m database.maintenance orphans --delete --archive orphans.jsonl
+"""
+import argparse
+import json
+import sys
+
+from .connection import db
+from .exporter import write_jsonl
+from .models import entity_cache
+
+
+def find_orphans(cursor):
+    """{table: sorted rowids} of the rows violating a foreign key"""
+    cursor.execute("PRAGMA foreign_key_check")
+    orphans = {}
+    for table, rowid, _parent, _fkid in cursor.fetchall():
+        orphans.setdefault(table, set()).add(rowid)
+    return {table: sorted(rowids) for table, rowids in orphans.items()}
+
+
+def clean_orphans(delete=False, archive=None):
+    """Count (and with delete=True remove) orphaned rows; return {table: count}.
+
+    archive is an open text file receiving the orphaned rows as JSON lines,
+    each with its table name, before they are deleted.
+    """
+    with db.cursor(immediate=delete) as cursor:
+        orphans = find_orphans(cursor)
+        for table, rowids in orphans.items():
+            rowid_list = json.dumps(rowids)
+            if archive is not None:
+                cursor.execute(f"SELECT * FROM {table} WHERE rowid IN (SELECT value FROM json_each(?))",
+                               (rowid_list,))
+                columns = ("table",) + tuple(column[0] for column in cursor.description)
+                write_jsonl(((table,) + row for row in cursor.fetchall()), columns, archive)
+            if delete:
+                cursor.execute(f"DELETE FROM {table} WHERE rowid IN (SELECT value FROM json_each(?))",
+                               (rowid_list,))
+    if delete:
+        for table, rowids in orphans.items():
+            for rowid in rowids:
+                entity_cache.invalidate(table, rowid)
+    return {table: len(rowids) for table, rowids in orphans.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance jobs")
+    parser.add_argument("job", choices=["orphans"])
+    parser.add_argument("--db", help="database file (default: hospital.db)")
+    parser.add_argument("--delete", action="store_true", help="delete the orphans instead of only counting them")
+    parser.add_argument("--archive", help="write the orphaned rows to this JSON lines file first")
+    args = parser.parse_args()
+
+    if args.db:
+        db.configure(args.db)
+
+    if args.archive:
+        with open(args.archive, "w", encoding="utf-8") as file:
+            counts = clean_orphans(args.delete, file)
+    else:
+        counts = clean_orphans(args.delete)
+
+    action = "deleted" if args.delete else "found"
+    if not counts:
+        print("No orphaned rows", file=sys.stderr)
+    for table, count in counts.items():
+        print(f"{table}: {count} orphaned rows {action}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
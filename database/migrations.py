@@ -0,0 +1,266 @@
+"""Versioned schema migrations keyed on PRAGMA user_version.
+
+Each migration is a (version, description, steps) entry where a step is
+either an SQL string or a callable taking a cursor. Pending migrations
+are applied in order, each one in its own transaction together with the
+user_version bump, so a failed migration leaves the schema untouched.
+
+The schema needs SQLite 3.35 or newer (generated columns, UPSERT,
+RETURNING); migrate() refuses to run on an older library.
+"""
+import logging
+import sqlite3
+
+from .search_index import create_index
+
+
+logger = logging.getLogger(__name__)
+
+# Oldest SQLite library the schema and the models' statements run on
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def _create_patient_fts(cursor):
+    # FTS5/trigram may be missing from the SQLite build; search then falls back to LIKE
+    create_index(cursor, "patients")
+
+
+def _create_doctor_fts(cursor):
+    create_index(cursor, "doctors")
+
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS patients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            national_id TEXT UNIQUE NOT NULL,
+            birth_date DATE,
+            phone TEXT,
+            address TEXT,
+            emergency_contact TEXT,
+            blood_type TEXT,
+            allergies TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS doctors (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            specialty TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            license_number TEXT UNIQUE,
+            office_number TEXT,
+            consultation_fee REAL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS appointments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            appointment_date DATE NOT NULL,
+            appointment_time TIME NOT NULL,
+            status TEXT DEFAULT 'فعال',
+            notes TEXT,
+            FOREIGN KEY (patient_id) REFERENCES patients (id),
+            FOREIGN KEY (doctor_id) REFERENCES doctors (id)
+        )
+        ''',
+    ]),
+    (2, "appointment indexes", [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date_time
+        ON appointments (doctor_id, appointment_date, appointment_time)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient_date
+        ON appointments (patient_id, appointment_date)
+        ''',
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_date_time
+        ON appointments (appointment_date, appointment_time)
+        ''',
+    ]),
+    (3, "patient full-text search", [
+        _create_patient_fts,
+    ]),
+    (4, "patient schedule index for conflict checks", [
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient_date_time
+        ON appointments (patient_id, appointment_date, appointment_time)
+        ''',
+        # Prefix of the index above
+        "DROP INDEX IF EXISTS idx_appointments_patient_date",
+    ]),
+    (5, "doctor full-text search and status index", [
+        _create_doctor_fts,
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_status_date_time
+        ON appointments (status, appointment_date, appointment_time)
+        ''',
+    ]),
+    (6, "covering index for doctor agendas", [
+        # Holds every appointments column the agenda reads, so a doctor-week
+        # is one index range scan without touching the table
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_agenda
+        ON appointments (doctor_id, appointment_date, appointment_time, status, patient_id)
+        ''',
+        # Prefix of the index above
+        "DROP INDEX IF EXISTS idx_appointments_doctor_date_time",
+    ]),
+    (7, "integer appointment timestamps", [
+        # Minutes since 1970-01-01 00:00 of the clinic-local date and time
+        # (no time zone conversion); the text columns stay the source of truth.
+        # A virtual generated column costs nothing on write and adding it does
+        # not rewrite the table; its indexes store the computed value
+        '''
+        ALTER TABLE appointments ADD COLUMN appointment_ts INTEGER GENERATED ALWAYS AS (
+            CAST(strftime('%s', appointment_date || ' ' || appointment_time) AS INTEGER) / 60
+        ) VIRTUAL
+        ''',
+        # id is implicitly the last index column, so (appointment_ts, id) order is free
+        "CREATE INDEX IF NOT EXISTS idx_appointments_ts ON appointments (appointment_ts)",
+        '''
+        CREATE INDEX IF NOT EXISTS idx_appointments_status_ts
+        ON appointments (status, appointment_ts)
+        ''',
+        # Listing and date ranges now go through the timestamp indexes
+        "DROP INDEX IF EXISTS idx_appointments_date_time",
+        "DROP INDEX IF EXISTS idx_appointments_status_date_time",
+    ]),
+    (8, "doctor daily and monthly statistics", [
+        # Appointments per doctor, day (or month) and status, maintained by the
+        # triggers below so reports never aggregate the appointments table
+        # itself; long ranges read whole months from doctor_monthly_stats
+        '''
+        CREATE TABLE IF NOT EXISTS doctor_daily_stats (
+            doctor_id INTEGER NOT NULL,
+            day DATE NOT NULL,
+            status TEXT NOT NULL,
+            appointments INTEGER NOT NULL,
+            PRIMARY KEY (day, doctor_id, status)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS doctor_monthly_stats (
+            doctor_id INTEGER NOT NULL,
+            month TEXT NOT NULL,
+            status TEXT NOT NULL,
+            appointments INTEGER NOT NULL,
+            PRIMARY KEY (month, doctor_id, status)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT INTO doctor_daily_stats (doctor_id, day, status, appointments)
+        SELECT doctor_id, appointment_date, COALESCE(status, ''), COUNT(*)
+        FROM appointments
+        GROUP BY doctor_id, appointment_date, COALESCE(status, '')
+        ''',
+        '''
+        INSERT INTO doctor_monthly_stats (doctor_id, month, status, appointments)
+        SELECT doctor_id, substr(day, 1, 7), status, SUM(appointments)
+        FROM doctor_daily_stats
+        GROUP BY doctor_id, substr(day, 1, 7), status
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS appointments_stats_insert AFTER INSERT ON appointments BEGIN
+            INSERT INTO doctor_daily_stats (doctor_id, day, status, appointments)
+            VALUES (new.doctor_id, new.appointment_date, COALESCE(new.status, ''), 1)
+            ON CONFLICT (day, doctor_id, status) DO UPDATE SET appointments = appointments + 1;
+            INSERT INTO doctor_monthly_stats (doctor_id, month, status, appointments)
+            VALUES (new.doctor_id, substr(new.appointment_date, 1, 7), COALESCE(new.status, ''), 1)
+            ON CONFLICT (month, doctor_id, status) DO UPDATE SET appointments = appointments + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS appointments_stats_delete AFTER DELETE ON appointments BEGIN
+            UPDATE doctor_daily_stats SET appointments = appointments - 1
+            WHERE day = old.appointment_date AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '');
+            DELETE FROM doctor_daily_stats
+            WHERE day = old.appointment_date AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '') AND appointments <= 0;
+            UPDATE doctor_monthly_stats SET appointments = appointments - 1
+            WHERE month = substr(old.appointment_date, 1, 7) AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '');
+            DELETE FROM doctor_monthly_stats
+            WHERE month = substr(old.appointment_date, 1, 7) AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '') AND appointments <= 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS appointments_stats_update
+        AFTER UPDATE OF doctor_id, appointment_date, status ON appointments
+        WHEN old.doctor_id IS NOT new.doctor_id OR old.appointment_date IS NOT new.appointment_date
+          OR old.status IS NOT new.status
+        BEGIN
+            UPDATE doctor_daily_stats SET appointments = appointments - 1
+            WHERE day = old.appointment_date AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '');
+            DELETE FROM doctor_daily_stats
+            WHERE day = old.appointment_date AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '') AND appointments <= 0;
+            UPDATE doctor_monthly_stats SET appointments = appointments - 1
+            WHERE month = substr(old.appointment_date, 1, 7) AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '');
+            DELETE FROM doctor_monthly_stats
+            WHERE month = substr(old.appointment_date, 1, 7) AND doctor_id = old.doctor_id
+              AND status = COALESCE(old.status, '') AND appointments <= 0;
+            INSERT INTO doctor_daily_stats (doctor_id, day, status, appointments)
+            VALUES (new.doctor_id, new.appointment_date, COALESCE(new.status, ''), 1)
+            ON CONFLICT (day, doctor_id, status) DO UPDATE SET appointments = appointments + 1;
+            INSERT INTO doctor_monthly_stats (doctor_id, month, status, appointments)
+            VALUES (new.doctor_id, substr(new.appointment_date, 1, 7), COALESCE(new.status, ''), 1)
+            ON CONFLICT (month, doctor_id, status) DO UPDATE SET appointments = appointments + 1;
+        END
+        ''',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(cursor):
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations; return the list of versions applied"""
+    if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+        required = ".".join(map(str, MIN_SQLITE_VERSION))
+        raise RuntimeError(f"SQLite {required} or newer is required, this Python has {sqlite3.sqlite_version}")
+    cursor = conn.cursor()
+    applied = []
+    try:
+        if get_version(cursor) >= SCHEMA_VERSION:
+            return applied
+
+        for version, description, steps in MIGRATIONS:
+            # Take the write lock first so concurrent processes cannot both migrate
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                if get_version(cursor) >= version:
+                    cursor.execute("COMMIT")
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(f"PRAGMA user_version = {version:d}")
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            applied.append(version)
+            logger.info("Applied migration %d: %s", version, description)
+        return applied
+    finally:
+        cursor.close()
@@ -1,232 +1,1006 @@
+import base64
+import binascii
+import json
+import logging
+import re
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from itertools import islice
 from .connection import db
+from .search_index import FTS_COLUMNS, MIN_TERM_LENGTH, match_expression, rebuild_index
 
 
-class PatientModel:
-    def __init__(self):
-        pass
+logger = logging.getLogger(__name__)
+
+
+# Default number of rows returned by the *_page methods
+PAGE_SIZE = 100
+
+# Maximum number of rows returned by search methods
+SEARCH_LIMIT = 100
+
+# Patients or doctors a search term may match before search_appointments stops
+# collecting their ids and filters appointments newest first by name instead
+OWNER_MATCH_LIMIT = 2000
+
+# Rows per transaction in the bulk_create_* methods
+BULK_CHUNK_SIZE = 1000
+
+# Rows fetched from the cursor at a time by the stream_* methods
+STREAM_BATCH_SIZE = 500
+
+# Maximum number of rows held by the shared entity cache
+CACHE_SIZE = 1024
+
+# Seconds between a thread's checks for writes by other processes, i.e. the
+# longest such a write can be hidden by a cached row
+CACHE_SYNC_INTERVAL = 1.0
+
+# Default length of an appointment slot, in minutes
+APPOINTMENT_DURATION_MINUTES = 15
+
+# Origin of appointments.appointment_ts (clinic-local minutes, no time zone)
+TIMESTAMP_EPOCH = datetime(1970, 1, 1)
+
+# Formats of appointments.appointment_date and appointment_time
+DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+TIME_PATTERN = re.compile(r"\d{2}:\d{2}(:\d{2})?")
+
+# Status of a booked appointment that has not taken place yet
+ACTIVE_STATUS = "فعال"
+
+# Appointments in these statuses do not occupy their slot
+FREE_STATUSES = ("لغو شده", "به تعویق افتاده")
+
+# What deleting a patient or doctor does to their appointments: "restrict"
+# refuses while any exist, "cascade" deletes them in the same transaction
+ON_DELETE = "restrict"
+ON_DELETE_MODES = ("restrict", "cascade")
+
+
+class AppointmentConflictError(Exception):
+    """The doctor or the patient already has an appointment overlapping the slot"""
+
+    def __init__(self, kind, conflicts):
+        self.kind = kind            # "doctor" or "patient"
+        self.conflicts = conflicts  # rows of (id, patient_id, doctor_id, date, time)
+        times = ", ".join(row[4] for row in conflicts)
+        super().__init__(f"{kind} already has an appointment at {times}")
+
+
+class ReferencedRecordError(Exception):
+    """Records cannot be deleted while other rows still reference them (on_delete="restrict")"""
+
+    def __init__(self, table, references):
+        self.table = table
+        self.references = references  # {referencing table: number of rows}
+        counts = ", ".join(f"{count} {child}" for child, count in references.items())
+        super().__init__(f"{table} still referenced by {counts}")
+
+
+def _on_delete_mode(on_delete):
+    if on_delete not in ON_DELETE_MODES:
+        raise ValueError(f"on_delete must be one of {ON_DELETE_MODES}, not {on_delete!r}")
+    return on_delete
+
+
+def encode_cursor(key):
+    """Encode a keyset position as an opaque token the UI can hand back"""
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(token):
+    """Decode a token produced by encode_cursor; None means the first page"""
+    if not token:
+        return None
+    try:
+        return tuple(json.loads(base64.urlsafe_b64decode(token.encode("ascii"))))
+    except (ValueError, binascii.Error):
+        raise ValueError(f"Invalid page cursor: {token!r}")
+
+
+def _page(cursor, limit, key_of):
+    """Fetch limit + 1 rows to learn whether another page exists"""
+    rows = cursor.fetchmany(limit + 1)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(key_of(rows[-1]))
+    return rows, None
+
+
+def _iter_pages(fetch_page, page_size):
+    """Yield rows from successive keyset pages until the last one"""
+    after_key = None
+    while True:
+        rows, after_key = fetch_page(after_key, page_size)
+        yield from rows
+        if after_key is None:
+            return
+
+
+def _bulk_insert(sql, rows, chunk_size, validate=None):
+    """Insert rows with executemany, one transaction per chunk.
+
+    A chunk that hits a constraint violation is rolled back and retried
+    row by row, so a bad row is reported without aborting the batch.
+    validate(row) may raise ValueError to reject a row before the insert.
+    Returns {"inserted": count, "errors": [(row_number, message, row), ...]}
+    with 1-based row numbers.
+    """
+    report = {"inserted": 0, "errors": []}
+    numbered = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered, chunk_size))
+        if not batch:
+            report["errors"].sort(key=lambda error: error[0])
+            return report
+
+        chunk = []
+        for number, row in batch:
+            row = tuple(row)
+            if validate is not None:
+                try:
+                    validate(row)
+                except ValueError as e:
+                    report["errors"].append((number, str(e), row))
+                    continue
+            chunk.append((number, row))
+        if not chunk:
+            continue
 
-    def get_all_patients(self):
-        """Get all patients"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("SELECT * FROM patients ORDER BY id DESC")
+            with db.cursor() as cursor:
+                cursor.executemany(sql, (row for _, row in chunk))
+            report["inserted"] += len(chunk)
+        except sqlite3.Error:
+            with db.cursor() as cursor:
+                for number, row in chunk:
+                    try:
+                        cursor.execute(sql, row)
+                        report["inserted"] += 1
+                    except sqlite3.Error as e:
+                        report["errors"].append((number, str(e), row))
+
+
+class EntityCache:
+    """Bounded LRU cache of single rows keyed by (entity, id).
+
+    The create_*/update_*/delete_* methods invalidate the rows they touch.
+    Writes made through other connections (another process) are detected
+    through PRAGMA data_version, which then empties the cache; each thread
+    checks it at most every CACHE_SYNC_INTERVAL seconds, so a cache hit
+    does not cost a query.
+
+    Every invalidation bumps a generation counter. A reader takes the
+    generation before querying and passes it to put(), which drops the row
+    if anything was invalidated meanwhile: a row read before a concurrent
+    write is never cached after that write's invalidation.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=CACHE_SIZE, sync_interval=CACHE_SYNC_INTERVAL):
+        self.maxsize = maxsize
+        self.sync_interval = sync_interval
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = threading.local()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(entity, record_id):
+        try:
+            return entity, int(record_id)
+        except (TypeError, ValueError):
+            return entity, record_id
+
+    def sync(self):
+        """Drop everything if another connection has written since this thread last looked"""
+        now = time.monotonic()
+        versions = self._versions
+        if now < getattr(versions, "next_check", 0):
+            return
+        versions.next_check = now + self.sync_interval
+
+        connection = db.get_connection()
+        version = connection.execute("PRAGMA data_version").fetchone()[0]
+        if getattr(versions, "connection", None) is not connection:
+            versions.connection = connection
+        elif versions.version != version:
+            self.clear()
+        versions.version = version
+
+    def get(self, entity, record_id):
+        """Cached row, or EntityCache._MISSING"""
+        key = self._key(entity, record_id)
+        with self._lock:
+            row = self._rows.get(key, self._MISSING)
+            if row is self._MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._rows.move_to_end(key)
+            return row
+
+    def put(self, entity, record_id, row, generation):
+        """Cache a row read after taking `generation`, unless something was invalidated since"""
+        key = self._key(entity, record_id)
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._rows[key] = row
+            self._rows.move_to_end(key)
+            while len(self._rows) > self.maxsize:
+                self._rows.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, entity, record_id):
+        with self._lock:
+            self.generation += 1
+            self._rows.pop(self._key(entity, record_id), None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._rows.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._rows),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every model instance; pass cache=None to a model to bypass it
+entity_cache = EntityCache()
+
+
+def _search(cursor, table, search_term, limit):
+    """Full-text search on a table, best matches first.
+
+    Terms shorter than a trigram (or a SQLite build without FTS5) fall
+    back to a prefix LIKE that stops at the limit.
+    """
+    expression = match_expression(search_term) if db.fts_enabled else None
+    if expression is not None:
+        cursor.execute(f'''
+            SELECT t.* FROM {table}_fts
+            JOIN {table} t ON t.id = {table}_fts.rowid
+            WHERE {table}_fts MATCH ?
+            ORDER BY {table}_fts.rank
+            LIMIT ?
+        ''', (expression, limit))
+    else:
+        columns = FTS_COLUMNS[table]
+        where = " OR ".join(f"{column} LIKE ?" for column in columns)
+        pattern = f"{search_term.strip()}%"
+        cursor.execute(f"SELECT t.* FROM {table} t WHERE {where} ORDER BY id DESC LIMIT ?",
+                       (pattern,) * len(columns) + (limit,))
+    return cursor.fetchall()
+
+
+def _match_ids(cursor, table, search_term, limit):
+    """Ids of up to limit rows of a table matching a search term (full-text, or prefix LIKE as in _search)"""
+    expression = match_expression(search_term) if db.fts_enabled else None
+    if expression is not None:
+        cursor.execute(f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ? LIMIT ?", (expression, limit))
+    else:
+        columns = FTS_COLUMNS[table]
+        where = " OR ".join(f"{column} LIKE ?" for column in columns)
+        cursor.execute(f"SELECT id FROM {table} WHERE {where} LIMIT ?",
+                       (f"{search_term.strip()}%",) * len(columns) + (limit,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _match_condition(alias, table, search_term):
+    """SQL condition and parameters matching the row `alias` of a table like _match_ids does.
+
+    A full-text search matches rows holding every word of three or more
+    characters in one of the indexed columns (the trigram index folds ASCII
+    case); the fallback is the prefix LIKE.
+    """
+    columns = FTS_COLUMNS[table]
+    if db.fts_enabled and match_expression(search_term) is not None:
+        words = [word.lower() for word in search_term.split() if len(word) >= MIN_TERM_LENGTH]
+        any_column = " OR ".join(f"instr(lower({alias}.{column}), ?)" for column in columns)
+        return (" AND ".join(f"({any_column})" for _ in words),
+                [word for word in words for _ in columns])
+    any_column = " OR ".join(f"{alias}.{column} LIKE ?" for column in columns)
+    return any_column, [f"{search_term.strip()}%"] * len(columns)
+
+
+def _stream(sql, params, batch_size):
+    """Yield query rows, fetching batch_size rows from the cursor at a time"""
+    with db.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+
+def _id_list(ids):
+    """Encode ids as one JSON array parameter for `IN (SELECT value FROM json_each(?))`"""
+    return json.dumps([int(record_id) for record_id in ids])
+
+
+def _crud_sql(table, columns, children=()):
+    """Statements of the generic CRUD methods of a table"""
+    names = ", ".join(columns)
+    placeholders = ", ".join("?" for _ in columns)
+    assignments = ", ".join(f"{column}=?" for column in columns)
+    # One statement for any number of ids, so it is prepared only once
+    in_ids = "id IN (SELECT value FROM json_each(?))"
+    sql = {
+        "all": f"SELECT * FROM {table} ORDER BY id DESC",
+        "first_page": f"SELECT * FROM {table} ORDER BY id DESC LIMIT ?",
+        "next_page": f"SELECT * FROM {table} WHERE id < ? ORDER BY id DESC LIMIT ?",
+        "stream": f"SELECT * FROM {table} ORDER BY id",
+        "get": f"SELECT * FROM {table} WHERE id = ?",
+        "get_many": f"SELECT * FROM {table} WHERE {in_ids}",
+        "insert": f"INSERT INTO {table} ({names}) VALUES ({placeholders})",
+        "update": f"UPDATE {table} SET {assignments} WHERE id = ?",
+        "delete_many": f"DELETE FROM {table} WHERE {in_ids}",
+    }
+    for child, column in children:
+        in_parents = f"{column} IN (SELECT value FROM json_each(?))"
+        sql[f"count:{child}"] = f"SELECT COUNT(*) FROM {child} WHERE {in_parents}"
+        sql[f"cascade:{child}"] = f"DELETE FROM {child} WHERE {in_parents} RETURNING id"
+    return sql
+
+
+class Repository:
+    """Data access for one table, driven by its TABLE/COLUMNS declaration.
+
+    The CRUD statements are generated once per subclass (in SQL) and always
+    run on the thread's long-lived connection, where sqlite3's statement
+    cache keeps them prepared. Single-row reads go through the entity cache.
+    """
+
+    TABLE = None
+    NAME = None     # singular, for log messages
+    COLUMNS = ()
+    # (table, foreign key column) of the rows referencing this table
+    CHILDREN = ()
+    SQL = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.TABLE:
+            cls.SQL = _crud_sql(cls.TABLE, cls.COLUMNS, cls.CHILDREN)
+
+    def __init__(self, cache=entity_cache, on_delete=ON_DELETE):
+        self.cache = cache
+        self.on_delete = _on_delete_mode(on_delete)
+
+    def _invalidate(self, record_id):
+        if self.cache is not None:
+            self.cache.invalidate(self.TABLE, record_id)
+
+    def _get_all(self):
+        with db.cursor() as cursor:
+            cursor.execute(self.SQL["all"])
             return cursor.fetchall()
-        finally:
-            conn.close()
+
+    def _get_page(self, after_key, limit):
+        key = decode_cursor(after_key)
+        with db.cursor() as cursor:
+            if key is None:
+                cursor.execute(self.SQL["first_page"], (limit + 1,))
+            else:
+                cursor.execute(self.SQL["next_page"], (key[0], limit + 1))
+            return _page(cursor, limit, lambda row: (row[0],))
+
+    def _stream_all(self, batch_size):
+        return _stream(self.SQL["stream"], (), batch_size)
+
+    def _get(self, record_id):
+        """Read-through lookup of one row by primary key"""
+        cache = self.cache
+        if cache is not None:
+            cache.sync()
+            generation = cache.generation
+            row = cache.get(self.TABLE, record_id)
+            if row is not EntityCache._MISSING:
+                return row
+
+        with db.cursor() as cursor:
+            cursor.execute(self.SQL["get"], (record_id,))
+            row = cursor.fetchone()
+        if cache is not None and row is not None:
+            cache.put(self.TABLE, record_id, row, generation)
+        return row
+
+    def _create(self, data, before_write=None):
+        # before_write(cursor) runs in the same write transaction, e.g. to check conflicts
+        with db.cursor(immediate=before_write is not None) as cursor:
+            if before_write is not None:
+                before_write(cursor)
+            cursor.execute(self.SQL["insert"], data)
+            return cursor.lastrowid
+
+    def _bulk_create(self, rows, chunk_size, validate=None):
+        return _bulk_insert(self.SQL["insert"], rows, chunk_size, validate)
+
+    def _update(self, record_id, data, before_write=None):
+        try:
+            with db.cursor(immediate=before_write is not None) as cursor:
+                if before_write is not None:
+                    before_write(cursor)
+                cursor.execute(self.SQL["update"], tuple(data) + (record_id,))
+                cursor.execute(self.SQL["get"], (record_id,))
+                row = cursor.fetchone()
+            self._invalidate(record_id)
+            logger.info("%s %s updated", self.NAME.capitalize(), record_id)
+            return row
+        except Exception as e:
+            logger.error("Error updating %s %s: %s", self.NAME, record_id, e)
+            raise
+
+    def _delete(self, record_id, on_delete=None):
+        self.delete_many([record_id], on_delete)
+        return record_id
+
+    def get_many(self, ids):
+        """Rows for the given ids in the same order; ids that do not exist are skipped"""
+        ids = [int(record_id) for record_id in ids]
+        found = {}
+        cache = self.cache
+        missing = ids
+        if cache is not None:
+            cache.sync()
+            generation = cache.generation
+            missing = []
+            for record_id in ids:
+                row = cache.get(self.TABLE, record_id)
+                if row is EntityCache._MISSING:
+                    missing.append(record_id)
+                else:
+                    found[record_id] = row
+
+        if missing:
+            with db.cursor() as cursor:
+                cursor.execute(self.SQL["get_many"], (_id_list(missing),))
+                rows = cursor.fetchall()
+            for row in rows:
+                found[row[0]] = row
+                if cache is not None:
+                    cache.put(self.TABLE, row[0], row, generation)
+        return [found[record_id] for record_id in ids if record_id in found]
+
+    def update_many(self, updates):
+        """Apply (id, data) pairs with one executemany in one transaction; return the rows changed"""
+        updates = [(record_id, tuple(data)) for record_id, data in updates]
+        with db.cursor() as cursor:
+            cursor.executemany(self.SQL["update"], (data + (record_id,) for record_id, data in updates))
+            changed = cursor.rowcount
+        for record_id, _ in updates:
+            self._invalidate(record_id)
+        return changed
+
+    def delete_many(self, ids, on_delete=None):
+        """Delete the given ids with a single statement; return the number of rows deleted.
+
+        Rows referencing them (CHILDREN) are handled in the same transaction
+        according to on_delete (default: the model's): "restrict" raises
+        ReferencedRecordError and deletes nothing, "cascade" deletes them too.
+        """
+        on_delete = _on_delete_mode(on_delete or self.on_delete)
+        ids = list(ids)
+        id_list = _id_list(ids)
+        cascaded = {}
+        with db.cursor(immediate=bool(self.CHILDREN)) as cursor:
+            references = {}
+            for child, _ in self.CHILDREN:
+                if on_delete == "cascade":
+                    cursor.execute(self.SQL[f"cascade:{child}"], (id_list,))
+                    cascaded[child] = [row[0] for row in cursor.fetchall()]
+                else:
+                    cursor.execute(self.SQL[f"count:{child}"], (id_list,))
+                    count = cursor.fetchone()[0]
+                    if count:
+                        references[child] = count
+            if references:
+                raise ReferencedRecordError(self.TABLE, references)
+
+            cursor.execute(self.SQL["delete_many"], (id_list,))
+            deleted = cursor.rowcount
+        for record_id in ids:
+            self._invalidate(record_id)
+        for child, child_ids in cascaded.items():
+            if child_ids:
+                logger.info("Deleted %d %s with %d %s", len(child_ids), child, deleted, self.TABLE)
+            if self.cache is not None:
+                for child_id in child_ids:
+                    self.cache.invalidate(child, child_id)
+        return deleted
+
+    def _search_table(self, search_term, limit):
+        with db.cursor() as cursor:
+            return _search(cursor, self.TABLE, search_term, limit)
+
+    def _rebuild_search_index(self):
+        with db.cursor() as cursor:
+            rebuild_index(cursor, self.TABLE)
+
+
+class PatientModel(Repository):
+    TABLE = "patients"
+    NAME = "patient"
+    COLUMNS = ("first_name", "last_name", "national_id", "birth_date",
+               "phone", "address", "emergency_contact", "blood_type", "allergies")
+    CHILDREN = (("appointments", "patient_id"),)
+
+    def get_all_patients(self):
+        """Get all patients"""
+        return self._get_all()
+
+    def get_patients_page(self, after_key=None, limit=PAGE_SIZE):
+        """Get one page of patients (newest first) and the cursor of the next page"""
+        return self._get_page(after_key, limit)
+
+    def iter_patients(self, page_size=PAGE_SIZE):
+        """Lazily iterate all patients one keyset page at a time"""
+        return _iter_pages(self.get_patients_page, page_size)
+
+    def stream_patients(self, batch_size=STREAM_BATCH_SIZE):
+        """Stream all patients in id order with constant memory"""
+        return self._stream_all(batch_size)
 
     def get_patient_by_id(self, patient_id):
         """Get patient by ID"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM patients WHERE id = ?", (patient_id,))
-            return cursor.fetchone()
-        finally:
-            conn.close()
+        return self._get(patient_id)
 
     def create_patient(self, patient_data):
         """Create new patient"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO patients (first_name, last_name, national_id, birth_date, 
-                                    phone, address, emergency_contact, blood_type, allergies)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', patient_data)
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self._create(patient_data)
+
+    def bulk_create_patients(self, rows, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many patients from an iterable; duplicate national IDs are reported, not fatal"""
+        return self._bulk_create(rows, chunk_size)
 
     def update_patient(self, patient_id, patient_data):
-        """Update patient - FIXED: Removed updated_at reference"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                UPDATE patients SET 
-                    first_name=?, last_name=?, national_id=?, birth_date=?,
-                    phone=?, address=?, emergency_contact=?, blood_type=?, allergies=?
-                WHERE id=?
-            ''', patient_data + (patient_id,))
-            conn.commit()
-            print(f"Patient {patient_id} updated successfully")
-        except Exception as e:
-            print(f"Error updating patient: {e}")
-            raise
-        finally:
-            conn.close()
+        """Update patient; return the updated row"""
+        return self._update(patient_id, patient_data)
 
-    def delete_patient(self, patient_id):
-        """Delete patient"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM patients WHERE id = ?", (patient_id,))
-            conn.commit()
-        finally:
-            conn.close()
-
-    def search_patients(self, search_term):
-        """Search patients"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                SELECT * FROM patients 
-                WHERE first_name LIKE ? OR last_name LIKE ? OR national_id LIKE ?
-                ORDER BY id DESC
-            ''', (f'%{search_term}%', f'%{search_term}%', f'%{search_term}%'))
-            return cursor.fetchall()
-        finally:
-            conn.close()
+    def delete_patient(self, patient_id, on_delete=None):
+        """Delete patient (and, with on_delete="cascade", their appointments); return the deleted id"""
+        return self._delete(patient_id, on_delete)
+
+    def search_patients(self, search_term, limit=SEARCH_LIMIT):
+        """Search patients by name or national ID, best matches first"""
+        return self._search_table(search_term, limit)
 
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the patients table"""
+        self._rebuild_search_index()
 
-class DoctorModel:
-    def __init__(self):
-        pass
+
+class DoctorModel(Repository):
+    TABLE = "doctors"
+    NAME = "doctor"
+    COLUMNS = ("first_name", "last_name", "specialty", "phone",
+               "email", "license_number", "office_number", "consultation_fee")
+    CHILDREN = (("appointments", "doctor_id"),)
 
     def get_all_doctors(self):
         """Get all doctors"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM doctors ORDER BY id DESC")
-            return cursor.fetchall()
-        finally:
-            conn.close()
+        return self._get_all()
+
+    def get_doctors_page(self, after_key=None, limit=PAGE_SIZE):
+        """Get one page of doctors (newest first) and the cursor of the next page"""
+        return self._get_page(after_key, limit)
+
+    def iter_doctors(self, page_size=PAGE_SIZE):
+        """Lazily iterate all doctors one keyset page at a time"""
+        return _iter_pages(self.get_doctors_page, page_size)
+
+    def stream_doctors(self, batch_size=STREAM_BATCH_SIZE):
+        """Stream all doctors in id order with constant memory"""
+        return self._stream_all(batch_size)
 
     def get_doctor_by_id(self, doctor_id):
         """Get doctor by ID"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM doctors WHERE id = ?", (doctor_id,))
-            return cursor.fetchone()
-        finally:
-            conn.close()
+        return self._get(doctor_id)
 
     def create_doctor(self, doctor_data):
         """Create new doctor"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO doctors (first_name, last_name, specialty, phone, 
-                                   email, license_number, office_number, consultation_fee)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', doctor_data)
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        return self._create(doctor_data)
+
+    def bulk_create_doctors(self, rows, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many doctors from an iterable; duplicate license numbers are reported, not fatal"""
+        return self._bulk_create(rows, chunk_size)
 
     def update_doctor(self, doctor_id, doctor_data):
-        """Update doctor - FIXED: Removed updated_at reference"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                UPDATE doctors SET 
-                    first_name=?, last_name=?, specialty=?, phone=?,
-                    email=?, license_number=?, office_number=?, consultation_fee=?
-                WHERE id=?
-            ''', doctor_data + (doctor_id,))
-            conn.commit()
-            print(f"Doctor {doctor_id} updated successfully")
-        except Exception as e:
-            print(f"Error updating doctor: {e}")
-            raise
-        finally:
-            conn.close()
+        """Update doctor; return the updated row"""
+        return self._update(doctor_id, doctor_data)
 
-    def delete_doctor(self, doctor_id):
-        """Delete doctor"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM doctors WHERE id = ?", (doctor_id,))
-            conn.commit()
-        finally:
-            conn.close()
+    def delete_doctor(self, doctor_id, on_delete=None):
+        """Delete doctor (and, with on_delete="cascade", their appointments); return the deleted id"""
+        return self._delete(doctor_id, on_delete)
+
+    def search_doctors(self, search_term, limit=SEARCH_LIMIT):
+        """Search doctors by name, specialty, license number or e-mail, best matches first"""
+        return self._search_table(search_term, limit)
+
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the doctors table"""
+        self._rebuild_search_index()
+
+
+def to_timestamp(appointment_date, appointment_time="00:00"):
+    """appointment_ts value of a yyyy-MM-dd date and HH:mm time"""
+    hours, minutes = appointment_time.split(":")[:2]
+    day = datetime.strptime(appointment_date, "%Y-%m-%d")
+    return (day - TIMESTAMP_EPOCH) // timedelta(minutes=1) + int(hours) * 60 + int(minutes)
+
+
+def _check_slot(appointment_data):
+    """Raise ValueError unless the date is yyyy-MM-dd and the time HH:mm[:ss].
+
+    appointment_ts is computed from these texts and is NULL for anything
+    else, which would hide the appointment from the listings and ranges.
+    """
+    appointment_date, appointment_time = tuple(appointment_data)[2:4]
+    if not isinstance(appointment_date, str) or not DATE_PATTERN.fullmatch(appointment_date):
+        raise ValueError(f"appointment_date must be yyyy-MM-dd, not {appointment_date!r}")
+    if not isinstance(appointment_time, str) or not TIME_PATTERN.fullmatch(appointment_time):
+        raise ValueError(f"appointment_time must be HH:mm, not {appointment_time!r}")
+    try:
+        datetime.strptime(f"{appointment_date} {appointment_time[:5]}", "%Y-%m-%d %H:%M")
+    except ValueError:
+        raise ValueError(f"no such date and time: {appointment_date} {appointment_time}") from None
+
+
+def _timestamp_range(date_from, date_to, column="a.appointment_ts"):
+    """Conditions and parameters for an inclusive yyyy-MM-dd date range on appointment_ts"""
+    conditions, params = [], []
+    if date_from:
+        conditions.append(f"{column} >= ?")
+        params.append(to_timestamp(date_from))
+    if date_to:
+        conditions.append(f"{column} < ?")
+        params.append(to_timestamp(date_to) + 24 * 60)
+    return conditions, params
+
+
+def _time_bounds(appointment_time, duration_minutes):
+    """Exclusive HH:mm bounds of start times overlapping a slot on the same day"""
+    hours, minutes = appointment_time.split(":")[:2]
+    start = int(hours) * 60 + int(minutes)
+    low = start - duration_minutes
+    high = start + duration_minutes
+    low_text = f"{low // 60:02d}:{low % 60:02d}" if low >= 0 else ""
+    high_text = f"{high // 60:02d}:{high % 60:02d}" if high < 24 * 60 else "24:00"
+    return low_text, high_text
+
+
+class AppointmentModel(Repository):
+    TABLE = "appointments"
+    NAME = "appointment"
+    COLUMNS = ("patient_id", "doctor_id", "appointment_date",
+               "appointment_time", "status", "notes")
 
+    # The trailing appointment_ts is the page key; the grid shows the first seven columns
+    LIST_COLUMNS = '''
+        SELECT a.id,
+               p.first_name || ' ' || p.last_name as patient_name,
+               d.first_name || ' ' || d.last_name as doctor_name,
+               a.appointment_date, a.appointment_time, a.status, a.notes,
+               a.appointment_ts
+        FROM appointments a
+        JOIN patients p ON a.patient_id = p.id
+        JOIN doctors d ON a.doctor_id = d.id
+    '''
 
-class AppointmentModel:
-    def __init__(self):
-        pass
+    # Column names of the rows produced by get_doctor_agenda
+    AGENDA_COLUMNS = ("id", "appointment_date", "appointment_time", "status",
+                      "patient_id", "patient_name")
+
+    # Column names of the rows produced by stream_appointments
+    EXPORT_COLUMNS = ("id", "appointment_date", "appointment_time", "status",
+                      "patient_id", "patient_name", "national_id",
+                      "doctor_id", "doctor_name", "specialty",
+                      "consultation_fee", "notes")
+
+    def __init__(self, duration_minutes=APPOINTMENT_DURATION_MINUTES, cache=entity_cache):
+        super().__init__(cache)
+        self.duration_minutes = duration_minutes
 
     def get_all_appointments(self):
         """Get all appointments with patient and doctor names"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
+        with db.cursor() as cursor:
+            cursor.execute(self.LIST_COLUMNS + '''
+                ORDER BY a.appointment_ts DESC, a.id DESC
+            ''')
+            return cursor.fetchall()
+
+    def get_appointments_page(self, after_key=None, limit=PAGE_SIZE):
+        """Get one page of appointments (latest first) and the cursor of the next page"""
+        key = decode_cursor(after_key)
+        with db.cursor() as cursor:
+            if key is None:
+                cursor.execute(self.LIST_COLUMNS + '''
+                    ORDER BY a.appointment_ts DESC, a.id DESC
+                    LIMIT ?
+                ''', (limit + 1,))
+            else:
+                cursor.execute(self.LIST_COLUMNS + '''
+                    WHERE (a.appointment_ts, a.id) < (?, ?)
+                    ORDER BY a.appointment_ts DESC, a.id DESC
+                    LIMIT ?
+                ''', key + (limit + 1,))
+            return _page(cursor, limit, lambda row: (row[7], row[0]))
+
+    def iter_appointments(self, page_size=PAGE_SIZE):
+        """Lazily iterate all appointments one keyset page at a time"""
+        return _iter_pages(self.get_appointments_page, page_size)
+
+    def stream_appointments(self, date_from=None, date_to=None, doctor_id=None,
+                            batch_size=STREAM_BATCH_SIZE):
+        """Stream appointments joined with patient and doctor details, oldest first.
+
+        The date range (inclusive, yyyy-MM-dd) and doctor filter are applied
+        in SQL, so only matching rows are read.
+        """
+        conditions, params = _timestamp_range(date_from, date_to)
+        if doctor_id is not None:
+            conditions.append("a.doctor_id = ?")
+            params.append(doctor_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        return _stream(f'''
+            SELECT a.id, a.appointment_date, a.appointment_time, a.status,
+                   a.patient_id, p.first_name || ' ' || p.last_name, p.national_id,
+                   a.doctor_id, d.first_name || ' ' || d.last_name, d.specialty,
+                   d.consultation_fee, a.notes
+            FROM appointments a
+            JOIN patients p ON a.patient_id = p.id
+            JOIN doctors d ON a.doctor_id = d.id
+            {where}
+            ORDER BY a.appointment_ts, a.id
+        ''', params, batch_size)
+
+    def search_appointments(self, search_term=None, status=None, date_from=None, date_to=None,
+                            limit=SEARCH_LIMIT):
+        """Search appointments by patient/doctor name, status and date range, latest first.
+
+        A term matching up to OWNER_MATCH_LIMIT patients and doctors is
+        looked up in their full-text indexes, and one query reads the
+        appointments of those ids: through the appointment_ts index newest
+        first when they are a large share of the table, else through the
+        patient/doctor indexes. A more common term is not collected: the
+        appointment_ts index is walked newest first and each row's patient
+        and doctor names are matched until the limit is reached, which is
+        quick precisely because the term is common. Without a term the range
+        and order come from the (status,) appointment_ts indexes. Dates are
+        inclusive yyyy-MM-dd strings.
+        """
+        conditions, params = [], []
+        if status:
+            conditions.append("a.status = ?")
+            params.append(status)
+        range_conditions, range_params = _timestamp_range(date_from, date_to)
+        conditions += range_conditions
+        params += range_params
+        order = "ORDER BY a.appointment_ts DESC, a.id DESC LIMIT ?"
+
+        with db.cursor() as cursor:
+            if search_term:
+                patient_ids = _match_ids(cursor, "patients", search_term, OWNER_MATCH_LIMIT + 1)
+                doctor_ids = _match_ids(cursor, "doctors", search_term, OWNER_MATCH_LIMIT + 1)
+                if not patient_ids and not doctor_ids:
+                    return []
+                if len(patient_ids) > OWNER_MATCH_LIMIT or len(doctor_ids) > OWNER_MATCH_LIMIT:
+                    patient_match, patient_params = _match_condition("p", "patients", search_term)
+                    doctor_match, doctor_params = _match_condition("d", "doctors", search_term)
+                    conditions.insert(0, f"(({patient_match}) OR ({doctor_match}))")
+                    params = patient_params + doctor_params + params
+                else:
+                    # Unary + keeps SQLite from using the index of a column
+                    if self._scan_by_time(cursor, len(patient_ids), len(doctor_ids), limit):
+                        owner = "+a."
+                    else:
+                        owner = "a."
+                        order = "ORDER BY +a.appointment_ts DESC, a.id DESC LIMIT ?"
+                    conditions.insert(0, f"({owner}patient_id IN (SELECT value FROM json_each(?)) "
+                                         f"OR {owner}doctor_id IN (SELECT value FROM json_each(?)))")
+                    params = [json.dumps(patient_ids), json.dumps(doctor_ids)] + params
+
+            where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+            cursor.execute(self.LIST_COLUMNS + where + order, params + [limit])
+            return cursor.fetchall()
+
+    @staticmethod
+    def _scan_by_time(cursor, patients, doctors, limit):
+        """Whether walking appointment_ts reads fewer rows than the matched owners' appointments.
+
+        With a share s of the appointments matching, the walk reads about
+        limit / s index entries and the owner lookups about s * appointments.
+        """
+        cursor.execute("SELECT (SELECT MAX(id) FROM patients), (SELECT MAX(id) FROM doctors), "
+                       "(SELECT MAX(id) FROM appointments)")
+        patient_count, doctor_count, appointment_count = (count or 1 for count in cursor.fetchone())
+        share = min(1.0, patients / patient_count + doctors / doctor_count)
+        return limit / share < share * appointment_count
+
+    def get_appointments_between(self, ts_from, ts_to, status=None, limit=SEARCH_LIMIT):
+        """Appointments starting in [ts_from, ts_to) (appointment_ts minutes), earliest first.
+
+        Answered by a range scan of the (status,) appointment_ts index;
+        build the bounds with to_timestamp.
+        """
+        conditions, params = ["a.appointment_ts >= ?", "a.appointment_ts < ?"], [ts_from, ts_to]
+        if status:
+            conditions.append("a.status = ?")
+            params.append(status)
+        with db.cursor() as cursor:
+            cursor.execute(self.LIST_COLUMNS + f"WHERE {' AND '.join(conditions)} "
+                           "ORDER BY a.appointment_ts, a.id LIMIT ?", params + [limit])
+            return cursor.fetchall()
+
+    def get_appointment_row(self, appointment_id):
+        """Get one appointment in the list format (with patient and doctor names)"""
+        with db.cursor() as cursor:
+            cursor.execute(self.LIST_COLUMNS + "WHERE a.id = ?", (appointment_id,))
+            return cursor.fetchone()
+
+    def get_doctor_agenda(self, doctor_id, date_from, date_to):
+        """A doctor's appointments between two inclusive yyyy-MM-dd dates, in time order.
+
+        Rows are AGENDA_COLUMNS. The appointments side is read entirely
+        from the (doctor_id, date, time, status, patient_id) covering index,
+        so the cost depends on the days asked for, not on the history size.
+        """
+        with db.cursor() as cursor:
             cursor.execute('''
-                SELECT a.id, 
-                       p.first_name || ' ' || p.last_name as patient_name,
-                       d.first_name || ' ' || d.last_name as doctor_name,
-                       a.appointment_date, a.appointment_time, a.status, a.notes
+                SELECT a.id, a.appointment_date, a.appointment_time, a.status, a.patient_id,
+                       p.first_name || ' ' || p.last_name
                 FROM appointments a
-                JOIN patients p ON a.patient_id = p.id
-                JOIN doctors d ON a.doctor_id = d.id
-                ORDER BY a.appointment_date DESC, a.appointment_time DESC
-            ''')
+                JOIN patients p ON p.id = a.patient_id
+                WHERE a.doctor_id = ? AND a.appointment_date BETWEEN ? AND ?
+                ORDER BY a.appointment_date, a.appointment_time
+            ''', (doctor_id, date_from, date_to))
             return cursor.fetchall()
-        finally:
-            conn.close()
 
     def get_appointment_by_id(self, appointment_id):
         """Get appointment by ID"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM appointments WHERE id = ?", (appointment_id,))
-            return cursor.fetchone()
-        finally:
-            conn.close()
+        return self._get(appointment_id)
 
-    def create_appointment(self, appointment_data):
-        """Create new appointment"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO appointments (patient_id, doctor_id, appointment_date, 
-                                        appointment_time, status, notes)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', appointment_data)
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+    def find_conflicts(self, appointment_data, exclude_id=None):
+        """Return (kind, rows) for appointments overlapping the slot, or None"""
+        with db.cursor() as cursor:
+            return self._find_conflicts(cursor, appointment_data, exclude_id)
 
-    def update_appointment(self, appointment_id, appointment_data):
-        """Update appointment - FIXED: Removed updated_at reference"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                UPDATE appointments SET 
-                    patient_id=?, doctor_id=?, appointment_date=?, 
-                    appointment_time=?, status=?, notes=?
-                WHERE id=?
-            ''', appointment_data + (appointment_id,))
-            conn.commit()
-            print(f"Appointment {appointment_id} updated successfully")
-        except Exception as e:
-            print(f"Error updating appointment: {e}")
-            raise
-        finally:
-            conn.close()
+    def _find_conflicts(self, cursor, appointment_data, exclude_id=None):
+        # One index range probe each on (doctor_id|patient_id, appointment_date, appointment_time)
+        patient_id, doctor_id, appointment_date, appointment_time, status = appointment_data[:5]
+        if status in FREE_STATUSES:
+            return None
 
-    def delete_appointment(self, appointment_id):
-        """Delete appointment"""
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("DELETE FROM appointments WHERE id = ?", (appointment_id,))
-            conn.commit()
-        finally:
-            conn.close()
\ No newline at end of file
+        low, high = _time_bounds(appointment_time, self.duration_minutes)
+        placeholders = ", ".join("?" for _ in FREE_STATUSES)
+        for kind, column, owner_id in (("doctor", "doctor_id", doctor_id),
+                                       ("patient", "patient_id", patient_id)):
+            cursor.execute(f'''
+                SELECT id, patient_id, doctor_id, appointment_date, appointment_time
+                FROM appointments
+                WHERE {column} = ? AND appointment_date = ?
+                  AND appointment_time > ? AND appointment_time < ?
+                  AND status NOT IN ({placeholders}) AND id IS NOT ?
+            ''', (owner_id, appointment_date, low, high) + FREE_STATUSES + (exclude_id,))
+            conflicts = cursor.fetchall()
+            if conflicts:
+                return kind, conflicts
+        return None
+
+    def _check_conflicts(self, cursor, appointment_data, exclude_id=None):
+        conflict = self._find_conflicts(cursor, appointment_data, exclude_id)
+        if conflict:
+            raise AppointmentConflictError(*conflict)
+
+    def _conflict_check(self, appointment_data, exclude_id=None):
+        """before_write hook raising AppointmentConflictError for an overlapping slot"""
+        return lambda cursor: self._check_conflicts(cursor, appointment_data, exclude_id)
+
+    def create_appointment(self, appointment_data, check_conflicts=True):
+        """Create new appointment; the conflict check and insert share one write transaction"""
+        _check_slot(appointment_data)
+        check = self._conflict_check(appointment_data) if check_conflicts else None
+        return self._create(appointment_data, check)
+
+    def bulk_create_appointments(self, rows, chunk_size=BULK_CHUNK_SIZE):
+        """Insert many appointments from an iterable; failing rows are reported, not fatal.
+
+        Rows whose date or time is malformed (_check_slot) are reported too.
+        """
+        return self._bulk_create(rows, chunk_size, _check_slot)
+
+    def update_appointment(self, appointment_id, appointment_data, check_conflicts=True):
+        """Update appointment; the conflict check and update share one write transaction"""
+        _check_slot(appointment_data)
+        check = self._conflict_check(appointment_data, appointment_id) if check_conflicts else None
+        return self._update(appointment_id, appointment_data, check)
+
+    def update_many(self, updates, check_conflicts=True):
+        """Apply (id, data) pairs in one transaction; return the rows changed.
+
+        Each row is checked for conflicts against the rows already updated
+        before it, so the batch cannot double-book a slot either.
+        """
+        updates = [(record_id, tuple(data)) for record_id, data in updates]
+        for _, data in updates:
+            _check_slot(data)
+        if not check_conflicts:
+            return super().update_many(updates)
+
+        changed = 0
+        with db.cursor(immediate=True) as cursor:
+            for record_id, data in updates:
+                self._check_conflicts(cursor, data, exclude_id=record_id)
+                cursor.execute(self.SQL["update"], data + (record_id,))
+                changed += cursor.rowcount
+        for record_id, _ in updates:
+            self._invalidate(record_id)
+        return changed
+
+    def bulk_update_status(self, new_status, ids=None, doctor_id=None, date_from=None, date_to=None,
+                           from_statuses=(ACTIVE_STATUS,)):
+        """Set the status of many appointments with a single UPDATE; return {"updated": count, "ids": [...]}.
+
+        The appointments are those matching every given criterion: ids,
+        doctor_id and an inclusive yyyy-MM-dd date range. Only appointments
+        currently in from_statuses change (None: any other status). The new
+        status must free the slot (FREE_STATUSES), so nothing can conflict.
+        """
+        if new_status not in FREE_STATUSES:
+            raise ValueError(f"new_status must be one of {FREE_STATUSES}, not {new_status!r}")
+        if ids is None and doctor_id is None and not date_from and not date_to:
+            raise ValueError("bulk_update_status needs ids, a doctor or a date range")
+
+        conditions, params = ["status IS NOT ?"], [new_status]
+        if ids is not None:
+            conditions.append("id IN (SELECT value FROM json_each(?))")
+            params.append(_id_list(ids))
+        if doctor_id is not None:
+            # A doctor's date range is a range scan of the agenda index
+            conditions.append("doctor_id = ?")
+            params.append(doctor_id)
+            if date_from:
+                conditions.append("appointment_date >= ?")
+                params.append(date_from)
+            if date_to:
+                conditions.append("appointment_date <= ?")
+                params.append(date_to)
+        else:
+            range_conditions, range_params = _timestamp_range(date_from, date_to, "appointment_ts")
+            conditions += range_conditions
+            params += range_params
+        if from_statuses is not None:
+            conditions.append(f"status IN ({', '.join('?' for _ in from_statuses)})")
+            params += list(from_statuses)
+
+        with db.cursor() as cursor:
+            cursor.execute(f"UPDATE appointments SET status = ? WHERE {' AND '.join(conditions)} RETURNING id",
+                           [new_status] + params)
+            updated = sorted(row[0] for row in cursor.fetchall())
+        for record_id in updated:
+            self._invalidate(record_id)
+        logger.info("%d appointments set to %s", len(updated), new_status)
+        return {"updated": len(updated), "ids": updated}
+
+    def delete_appointment(self, appointment_id, on_delete=None):
+        """Delete appointment; return the deleted id (nothing references appointments)"""
+        return self._delete(appointment_id, on_delete)
@@ -0,0 +1,239 @@
+"""Doctor utilization, status and revenue reports.
+
+The reports read doctor_daily_stats and doctor_monthly_stats, summaries
+of appointments per doctor, day (month) and status that triggers on the
+appointments table keep up to date (migration 8). A report over years of
+data aggregates one row per doctor, month and status for the whole months
+in its range and daily rows only for the days around them.
+
+Revenue is completed appointments times the doctor's current
+consultation fee. An appointment still "فعال" after its day has passed
+counts as a no-show.
+
+    python -m database.reports doctors report.csv --from 2024-03-20 --to 2025-03-20
+"""
+import argparse
+import calendar
+import sys
+import time
+from datetime import date
+
+from .connection import db
+from .exporter import write_csv
+
+
+ACTIVE_STATUS = "فعال"
+DONE_STATUS = "انجام شده"
+CANCELLED_STATUS = "لغو شده"
+POSTPONED_STATUS = "به تعویق افتاده"
+
+
+# Bounds of an open date range
+MIN_DAY = "0001-01-01"
+MAX_DAY = "9999-12-31"
+
+
+def _month_before(month):
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year - (number == 1):04d}-{(number - 2) % 12 + 1:02d}"
+
+
+def _month_after(month):
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+def _range_conditions(date_from, date_to, doctor_id=None):
+    conditions, params = [], []
+    if date_from:
+        conditions.append("s.day >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("s.day <= ?")
+        params.append(date_to)
+    if doctor_id is not None:
+        conditions.append("s.doctor_id = ?")
+        params.append(doctor_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where, params
+
+
+def _stats_source(date_from, date_to, today, doctor_id=None):
+    """Summary rows (doctor_id, status, appointments, past) covering the range, as SQL and params.
+
+    Whole months come from doctor_monthly_stats, the partial months at
+    either end from doctor_daily_stats. past is 1 for rows entirely
+    before today, so the month holding today is always read by day.
+    """
+    first_day, last_day = date_from or MIN_DAY, date_to or MAX_DAY
+    first_month = first_day[:7] if first_day[8:] == "01" else _month_after(first_day[:7])
+    year, month = int(last_day[:4]), int(last_day[5:7])
+    last_month = last_day[:7] if int(last_day[8:]) == calendar.monthrange(year, month)[1] \
+        else _month_before(last_day[:7])
+
+    day_ranges, month_ranges = [], []
+    if first_month > last_month:
+        day_ranges.append((first_day, last_day))
+    else:
+        if first_month != first_day[:7]:
+            day_ranges.append((first_day, f"{first_day[:7]}-31"))
+        if last_month != last_day[:7]:
+            day_ranges.append((f"{last_day[:7]}-01", last_day))
+        current = today[:7]
+        if first_month <= current <= last_month:
+            day_ranges.append((f"{current}-01", f"{current}-31"))
+            month_ranges.append((first_month, _month_before(current)))
+            month_ranges.append((_month_after(current), last_month))
+        else:
+            month_ranges.append((first_month, last_month))
+
+    doctor = " AND doctor_id = ?" if doctor_id is not None else ""
+    parts, params = [], []
+    for first, last in day_ranges:
+        parts.append("SELECT doctor_id, status, appointments, day < ? AS past "
+                     f"FROM doctor_daily_stats WHERE day BETWEEN ? AND ?{doctor}")
+        params += [today, first, last] + ([doctor_id] if doctor else [])
+    for first, last in month_ranges:
+        if first <= last:
+            parts.append("SELECT doctor_id, status, appointments, month < ? AS past "
+                         f"FROM doctor_monthly_stats WHERE month BETWEEN ? AND ?{doctor}")
+            params += [today[:7], first, last] + ([doctor_id] if doctor else [])
+    return " UNION ALL ".join(parts), params
+
+
+class ReportModel:
+    # Column names of the rows produced by each report
+    DOCTOR_SUMMARY_COLUMNS = ("doctor_id", "doctor_name", "specialty", "appointments", "completed",
+                              "cancelled", "postponed", "no_show", "cancel_rate", "no_show_rate",
+                              "revenue")
+    DOCTOR_DAILY_COLUMNS = ("day", "doctor_id", "doctor_name", "appointments", "completed",
+                            "cancelled", "postponed", "revenue")
+    STATUS_SUMMARY_COLUMNS = ("status", "appointments", "share")
+
+    def doctor_summary(self, date_from=None, date_to=None, today=None):
+        """Per doctor: appointment counts by outcome, cancel/no-show rates (%) and revenue.
+
+        Dates are inclusive yyyy-MM-dd strings; no-shows are counted for
+        days before today (default: the current date). Highest revenue first.
+        """
+        today = today or date.today().isoformat()
+        source, params = _stats_source(date_from, date_to, today)
+        with db.cursor() as cursor:
+            cursor.execute(f'''
+                SELECT doctor_id, doctor_name, specialty, total, completed, cancelled, postponed,
+                       no_show,
+                       ROUND(100.0 * cancelled / total, 1),
+                       ROUND(100.0 * no_show / total, 1),
+                       completed * fee AS revenue
+                FROM (
+                    SELECT s.doctor_id, d.first_name || ' ' || d.last_name AS doctor_name,
+                           d.specialty, COALESCE(d.consultation_fee, 0) AS fee,
+                           SUM(s.appointments) AS total,
+                           SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END) AS completed,
+                           SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END) AS cancelled,
+                           SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END) AS postponed,
+                           SUM(CASE WHEN s.status = ? AND s.past THEN s.appointments ELSE 0 END)
+                               AS no_show
+                    FROM ({source}) s
+                    JOIN doctors d ON d.id = s.doctor_id
+                    GROUP BY s.doctor_id
+                )
+                ORDER BY revenue DESC, doctor_id
+            ''', [DONE_STATUS, CANCELLED_STATUS, POSTPONED_STATUS, ACTIVE_STATUS] + params)
+            return cursor.fetchall()
+
+    def doctor_daily(self, date_from=None, date_to=None, doctor_id=None):
+        """Per day and doctor: appointment counts by outcome and revenue, by day"""
+        where, params = _range_conditions(date_from, date_to, doctor_id)
+        with db.cursor() as cursor:
+            cursor.execute(f'''
+                SELECT s.day, s.doctor_id, d.first_name || ' ' || d.last_name,
+                       SUM(s.appointments),
+                       SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END),
+                       SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END),
+                       SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END),
+                       SUM(CASE WHEN s.status = ? THEN s.appointments ELSE 0 END)
+                           * COALESCE(d.consultation_fee, 0)
+                FROM doctor_daily_stats s
+                JOIN doctors d ON d.id = s.doctor_id
+                {where}
+                GROUP BY s.day, s.doctor_id
+                ORDER BY s.day, s.doctor_id
+            ''', [DONE_STATUS, CANCELLED_STATUS, POSTPONED_STATUS, DONE_STATUS] + params)
+            return cursor.fetchall()
+
+    def status_summary(self, date_from=None, date_to=None, doctor_id=None):
+        """Appointments per status and their share (%) of the total"""
+        source, params = _stats_source(date_from, date_to, date.today().isoformat(), doctor_id)
+        with db.cursor() as cursor:
+            cursor.execute(f'''
+                SELECT status, total, ROUND(100.0 * total / SUM(total) OVER (), 1)
+                FROM (
+                    SELECT s.status, SUM(s.appointments) AS total
+                    FROM ({source}) s
+                    GROUP BY s.status
+                )
+                ORDER BY total DESC
+            ''', params)
+            return cursor.fetchall()
+
+    def rebuild_stats(self):
+        """Recompute the daily and monthly summaries from the appointments table; return the daily row count"""
+        with db.cursor(immediate=True) as cursor:
+            cursor.execute("DELETE FROM doctor_daily_stats")
+            cursor.execute("DELETE FROM doctor_monthly_stats")
+            cursor.execute('''
+                INSERT INTO doctor_daily_stats (doctor_id, day, status, appointments)
+                SELECT doctor_id, appointment_date, COALESCE(status, ''), COUNT(*)
+                FROM appointments
+                GROUP BY doctor_id, appointment_date, COALESCE(status, '')
+            ''')
+            rows = cursor.rowcount
+            cursor.execute('''
+                INSERT INTO doctor_monthly_stats (doctor_id, month, status, appointments)
+                SELECT doctor_id, substr(day, 1, 7), status, SUM(appointments)
+                FROM doctor_daily_stats
+                GROUP BY doctor_id, substr(day, 1, 7), status
+            ''')
+            return rows
+
+
+REPORTS = {
+    "doctors": ("doctor_summary", ReportModel.DOCTOR_SUMMARY_COLUMNS),
+    "daily": ("doctor_daily", ReportModel.DOCTOR_DAILY_COLUMNS),
+    "status": ("status_summary", ReportModel.STATUS_SUMMARY_COLUMNS),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a report as CSV")
+    parser.add_argument("report", choices=sorted(REPORTS))
+    parser.add_argument("path", help="output file, or - for stdout")
+    parser.add_argument("--from", dest="date_from", help="first day (yyyy-MM-dd)")
+    parser.add_argument("--to", dest="date_to", help="last day (yyyy-MM-dd)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the summary tables first")
+    parser.add_argument("--db", default="hospital.db", help="database file")
+    args = parser.parse_args()
+
+    db.configure(args.db)
+
+    model = ReportModel()
+    if args.rebuild:
+        model.rebuild_stats()
+
+    method, columns = REPORTS[args.report]
+    start = time.perf_counter()
+    rows = getattr(model, method)(args.date_from, args.date_to)
+    elapsed = time.perf_counter() - start
+
+    if args.path == "-":
+        write_csv(rows, columns, sys.stdout)
+    else:
+        # utf-8-sig so spreadsheet programs detect the Persian text correctly
+        with open(args.path, "w", newline="", encoding="utf-8-sig") as file:
+            write_csv(rows, columns, file)
+    print(f"{len(rows)} rows in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
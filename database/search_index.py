@@ -0,0 +1,118 @@
+"""FTS5 full-text indexes over patients and doctors.
+
+Each index is an external-content FTS5 table using the trigram tokenizer,
+so any substring of at least three characters (Persian names, national ID
+or license number prefixes, e-mail fragments) is answered from the index
+instead of a LIKE '%term%' scan. Triggers keep it in sync with its table.
+
+Rebuild the indexes of an existing database with:
+
+    python -m database.search_index [path/to/hospital.db]
+"""
+import logging
+import sqlite3
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+# Trigram tokens are three characters long; shorter terms cannot be matched
+MIN_TERM_LENGTH = 3
+
+# Indexed columns per table
+FTS_COLUMNS = {
+    "patients": ("first_name", "last_name", "national_id"),
+    "doctors": ("first_name", "last_name", "specialty", "license_number", "email"),
+}
+
+
+def fts_schema(table):
+    """DDL for the FTS table of `table` and the triggers keeping it in sync"""
+    columns = ", ".join(FTS_COLUMNS[table])
+    new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS[table])
+    old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS[table])
+    fts = f"{table}_fts"
+    return [
+        f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {columns},
+            content='{table}', content_rowid='id', tokenize='trigram'
+        )
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {columns} ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new_values});
+        END
+        ''',
+    ]
+
+
+def table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+    return cursor.fetchone() is not None
+
+
+def create_index(cursor, table):
+    """Create the FTS table and triggers of `table`; return False if FTS5/trigram is unavailable"""
+    existed = table_exists(cursor, f"{table}_fts")
+    try:
+        for statement in fts_schema(table):
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        logger.warning("Full-text search unavailable, falling back to LIKE: %s", e)
+        return False
+
+    if not existed:
+        # Index rows that were inserted before the FTS table existed
+        rebuild_index(cursor, table)
+    return True
+
+
+def rebuild_index(cursor, table):
+    """Rebuild the FTS index of `table` from its content table"""
+    cursor.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+
+
+def match_expression(search_term):
+    """Build an FTS5 MATCH expression, or None if no word is long enough.
+
+    Every word becomes a quoted phrase so user input cannot inject FTS
+    operators; the phrases are implicitly AND-ed.
+    """
+    words = [word for word in search_term.split() if len(word) >= MIN_TERM_LENGTH]
+    if not words:
+        return None
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "hospital.db"
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        for table in FTS_COLUMNS:
+            existed = table_exists(cursor, f"{table}_fts")
+            if not create_index(cursor, table):
+                sys.exit(1)
+            if existed:
+                rebuild_index(cursor, table)
+            conn.commit()
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            print(f"Rebuilt {table} search index ({cursor.fetchone()[0]} rows)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
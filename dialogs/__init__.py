@@ -1,5 +1,19 @@
-from .patient_dialog import PatientDialog
-from .doctor_dialog import DoctorDialog
-from .appointment_dialog import AppointmentDialog
+import importlib
 
-__all__ = ['PatientDialog', 'DoctorDialog', 'AppointmentDialog']
\ No newline at end of file
+# Dialog modules are imported on first access, i.e. when a dialog is first opened
+_MODULES = {
+    'PatientDialog': '.patient_dialog',
+    'DoctorDialog': '.doctor_dialog',
+    'AppointmentDialog': '.appointment_dialog',
+    'BulkStatusDialog': '.bulk_status_dialog',
+}
+
+__all__ = ['PatientDialog', 'DoctorDialog', 'AppointmentDialog', 'BulkStatusDialog']
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name], __name__), name)
+    globals()[name] = value
+    return value
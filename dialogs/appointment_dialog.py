@@ -1,18 +1,22 @@
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
-from database.models import AppointmentModel, PatientModel, DoctorModel
+from PyQt5.QtWidgets import (QComboBox, QDateEdit, QDialog, QDialogButtonBox, QFormLayout, QLabel,
+                             QMessageBox, QTextEdit, QTimeEdit)
+from PyQt5.QtCore import Qt, QCalendar, QDate, QTime
+from database.models import AppointmentModel, PatientModel, DoctorModel, AppointmentConflictError
+from .record_picker import RecordPicker
 
 
 class AppointmentDialog(QDialog):
-    def __init__(self, parent=None, appointment_id=None):
+    def __init__(self, parent=None, appointment_id=None, query_runner=None):
         super().__init__(parent)
         self.appointment_id = appointment_id
+        # Runs the pickers' searches; each picker makes its own without one
+        self.query_runner = query_runner
+        # ID of the created/updated record once the dialog is accepted
+        self.saved_id = None
         self.appointment_model = AppointmentModel()
         self.patient_model = PatientModel()
         self.doctor_model = DoctorModel()
         self.setup_ui()
-        self.load_combo_data()
 
         if appointment_id:
             self.load_appointment_data()
@@ -26,15 +30,22 @@ class AppointmentDialog(QDialog):
         layout = QFormLayout(self)
 
         # Create form fields
-        self.patient_combo = QComboBox()
+        self.patient_combo = RecordPicker(self.patient_model.search_patients, self.format_patient,
+                                          "نام یا کد ملی بیمار را تایپ کنید",
+                                          query_runner=self.query_runner)
         self.patient_combo.setMinimumHeight(35)
 
-        self.doctor_combo = QComboBox()
+        self.doctor_combo = RecordPicker(self.doctor_model.search_doctors, self.format_doctor,
+                                         "نام یا تخصص پزشک را تایپ کنید",
+                                         query_runner=self.query_runner)
         self.doctor_combo.setMinimumHeight(35)
 
         self.appointment_date = QDateEdit()
         self.appointment_date.setDate(QDate.currentDate())
         self.appointment_date.setCalendarPopup(True)
+        # Shown and picked in the Jalali calendar; date() stays a Gregorian QDate
+        self.appointment_date.setCalendar(QCalendar(QCalendar.System.Jalali))
+        self.appointment_date.setDisplayFormat("yyyy/MM/dd")
         self.appointment_date.setMinimumHeight(35)
 
         self.appointment_time = QTimeEdit()
@@ -120,40 +131,19 @@ class AppointmentDialog(QDialog):
         label.setStyleSheet("font-weight: bold; color: #2c3e50;")
         return label
 
-    def load_combo_data(self):
-        try:
-            # Load patients
-            patients = self.patient_model.get_all_patients()
-            self.patient_combo.clear()
-            self.patient_combo.addItem("انتخاب بیمار", None)
-            for patient in patients:
-                display_text = f"{patient[1]} {patient[2]} - {patient[3]}"
-                self.patient_combo.addItem(display_text, patient[0])
-
-            # Load doctors
-            doctors = self.doctor_model.get_all_doctors()
-            self.doctor_combo.clear()
-            self.doctor_combo.addItem("انتخاب پزشک", None)
-            for doctor in doctors:
-                display_text = f"دکتر {doctor[1]} {doctor[2]} - {doctor[3]}"
-                self.doctor_combo.addItem(display_text, doctor[0])
+    def format_patient(self, patient):
+        return f"{patient[1]} {patient[2]} - {patient[3]}"
 
-        except Exception as e:
-            QMessageBox.critical(self, "خطا", f"خطا در بارگذاری اطلاعات: {str(e)}")
+    def format_doctor(self, doctor):
+        return f"دکتر {doctor[1]} {doctor[2]} - {doctor[3]}"
 
     def load_appointment_data(self):
         try:
             appointment = self.appointment_model.get_appointment_by_id(self.appointment_id)
             if appointment:
-                # Set patient
-                patient_index = self.patient_combo.findData(appointment[1])
-                if patient_index >= 0:
-                    self.patient_combo.setCurrentIndex(patient_index)
-
-                # Set doctor
-                doctor_index = self.doctor_combo.findData(appointment[2])
-                if doctor_index >= 0:
-                    self.doctor_combo.setCurrentIndex(doctor_index)
+                # Resolve only the appointment's own patient and doctor
+                self.patient_combo.set_record(self.patient_model.get_patient_by_id(appointment[1]))
+                self.doctor_combo.set_record(self.doctor_model.get_doctor_by_id(appointment[2]))
 
                 # Set date and time
                 if appointment[3]:
@@ -191,13 +181,19 @@ class AppointmentDialog(QDialog):
 
             if self.appointment_id:
                 self.appointment_model.update_appointment(self.appointment_id, appointment_data)
+                self.saved_id = self.appointment_id
                 QMessageBox.information(self, "موفقیت", "نوبت با موفقیت به‌روزرسانی شد.")
             else:
-                self.appointment_model.create_appointment(appointment_data)
+                self.saved_id = self.appointment_model.create_appointment(appointment_data)
                 QMessageBox.information(self, "موفقیت", "نوبت جدید با موفقیت ثبت شد.")
 
             self.accept()
 
+        except AppointmentConflictError as e:
+            times = "، ".join(row[4] for row in e.conflicts)
+            owner = "پزشک" if e.kind == "doctor" else "بیمار"
+            QMessageBox.warning(self, "تداخل نوبت", f"{owner} در این بازه زمانی نوبت دیگری دارد (ساعت {times}).")
+            self.appointment_time.setFocus()
         except Exception as e:
             QMessageBox.critical(self, "خطا", f"خطا در ذخیره اطلاعات: {str(e)}")
 
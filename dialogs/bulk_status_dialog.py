@@ -0,0 +1,183 @@
+from PyQt5.QtWidgets import (QComboBox, QDateEdit, QDialog, QDialogButtonBox, QFormLayout, QLabel,
+                             QMessageBox, QRadioButton)
+from PyQt5.QtCore import Qt, QCalendar, QDate
+from database.models import AppointmentModel, DoctorModel, FREE_STATUSES
+from .record_picker import RecordPicker
+
+
+class BulkStatusDialog(QDialog):
+    """Cancel or postpone many active appointments at once.
+
+    The appointments are either the rows selected in the grid or those of
+    one doctor within a date range; either way they change with a single
+    UPDATE (AppointmentModel.bulk_update_status).
+    """
+
+    def __init__(self, parent=None, appointment_ids=(), query_runner=None):
+        super().__init__(parent)
+        self.appointment_ids = list(appointment_ids)
+        # Runs the doctor picker's searches; the picker makes its own without one
+        self.query_runner = query_runner
+        # {"updated": count, "ids": [...]} once the dialog is accepted
+        self.changes = None
+        self.appointment_model = AppointmentModel()
+        self.doctor_model = DoctorModel()
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("تغییر وضعیت گروهی نوبت‌ها")
+        self.setLayoutDirection(Qt.RightToLeft)
+        self.resize(500, 350)
+        self.setModal(True)
+
+        layout = QFormLayout(self)
+
+        self.selected_option = QRadioButton(f"نوبت‌های انتخاب‌شده ({len(self.appointment_ids)})")
+        self.range_option = QRadioButton("نوبت‌های یک پزشک در بازه تاریخ")
+        self.selected_option.setEnabled(bool(self.appointment_ids))
+        if self.appointment_ids:
+            self.selected_option.setChecked(True)
+        else:
+            self.range_option.setChecked(True)
+
+        self.doctor_combo = RecordPicker(self.doctor_model.search_doctors, self.format_doctor,
+                                         "نام یا تخصص پزشک را تایپ کنید",
+                                         query_runner=self.query_runner)
+        self.doctor_combo.setMinimumHeight(35)
+
+        self.date_from = self.create_date_edit()
+        self.date_to = self.create_date_edit()
+
+        self.status = QComboBox()
+        self.status.addItems(FREE_STATUSES)
+        self.status.setMinimumHeight(35)
+
+        layout.addRow(self.create_label("نوبت‌ها:"), self.selected_option)
+        layout.addRow("", self.range_option)
+        layout.addRow(self.create_label("پزشک:"), self.doctor_combo)
+        layout.addRow(self.create_label("از تاریخ:"), self.date_from)
+        layout.addRow(self.create_label("تا تاریخ:"), self.date_to)
+        layout.addRow(self.create_label("وضعیت جدید:"), self.status)
+        layout.addRow(QLabel("فقط نوبت‌های «فعال» تغییر می‌کنند."))
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Ok).setText("اعمال")
+        buttons.button(QDialogButtonBox.Cancel).setText("انصراف")
+
+        buttons.button(QDialogButtonBox.Ok).setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                padding: 8px 16px;
+                border: none;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #219a52;
+            }
+        """)
+
+        buttons.button(QDialogButtonBox.Cancel).setStyleSheet("""
+            QPushButton {
+                background-color: #e74c3c;
+                color: white;
+                padding: 8px 16px;
+                border: none;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #c0392b;
+            }
+        """)
+
+        buttons.accepted.connect(self.apply_status)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+        self.range_option.toggled.connect(self.update_range_fields)
+        self.update_range_fields()
+
+        self.setStyleSheet("""
+            QDialog {
+                background-color: #f8f9fa;
+            }
+            QComboBox, QDateEdit {
+                padding: 8px;
+                border: 2px solid #ddd;
+                border-radius: 4px;
+                font-size: 12px;
+            }
+            QComboBox:focus, QDateEdit:focus {
+                border-color: #e74c3c;
+            }
+            QLabel {
+                font-weight: bold;
+                color: #2c3e50;
+            }
+        """)
+
+    def create_label(self, text):
+        label = QLabel(text)
+        label.setStyleSheet("font-weight: bold; color: #2c3e50;")
+        return label
+
+    def create_date_edit(self):
+        date_edit = QDateEdit()
+        date_edit.setDate(QDate.currentDate())
+        date_edit.setCalendarPopup(True)
+        # Shown and picked in the Jalali calendar; date() stays a Gregorian QDate
+        date_edit.setCalendar(QCalendar(QCalendar.System.Jalali))
+        date_edit.setDisplayFormat("yyyy/MM/dd")
+        date_edit.setMinimumHeight(35)
+        return date_edit
+
+    def format_doctor(self, doctor):
+        return f"دکتر {doctor[1]} {doctor[2]} - {doctor[3]}"
+
+    def update_range_fields(self):
+        by_range = self.range_option.isChecked()
+        for widget in (self.doctor_combo, self.date_from, self.date_to):
+            widget.setEnabled(by_range)
+
+    def apply_status(self):
+        if not self.validate_input():
+            return
+
+        new_status = self.status.currentText()
+        try:
+            if self.selected_option.isChecked():
+                self.changes = self.appointment_model.bulk_update_status(new_status, ids=self.appointment_ids)
+                skipped = len(self.appointment_ids) - self.changes["updated"]
+            else:
+                self.changes = self.appointment_model.bulk_update_status(
+                    new_status, doctor_id=self.doctor_combo.currentData(),
+                    date_from=self.date_from.date().toString("yyyy-MM-dd"),
+                    date_to=self.date_to.date().toString("yyyy-MM-dd"))
+                skipped = 0
+
+            message = f"وضعیت {self.changes['updated']} نوبت به «{new_status}» تغییر کرد."
+            if skipped:
+                message += f"\n{skipped} نوبت انتخاب‌شده فعال نبود و تغییر نکرد."
+            QMessageBox.information(self, "موفقیت", message)
+            self.accept()
+
+        except Exception as e:
+            QMessageBox.critical(self, "خطا", f"خطا در تغییر وضعیت: {str(e)}")
+
+    def validate_input(self):
+        if self.selected_option.isChecked():
+            return True
+
+        if self.doctor_combo.currentData() is None:
+            QMessageBox.warning(self, "خطا", "انتخاب پزشک الزامی است.")
+            self.doctor_combo.setFocus()
+            return False
+
+        if self.date_from.date() > self.date_to.date():
+            QMessageBox.warning(self, "خطا", "تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد.")
+            self.date_from.setFocus()
+            return False
+
+        return True
@@ -1,6 +1,6 @@
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from PyQt5.QtWidgets import (QDialog, QDialogButtonBox, QDoubleSpinBox, QFormLayout, QLabel, QLineEdit,
+                             QMessageBox)
+from PyQt5.QtCore import Qt
 from database.models import DoctorModel
 import sqlite3
 
@@ -9,6 +9,8 @@ class DoctorDialog(QDialog):
     def __init__(self, parent=None, doctor_id=None):
         super().__init__(parent)
         self.doctor_id = doctor_id
+        # ID of the created/updated record once the dialog is accepted
+        self.saved_id = None
         self.doctor_model = DoctorModel()
         self.setup_ui()
 
@@ -156,9 +158,10 @@ class DoctorDialog(QDialog):
 
             if self.doctor_id:
                 self.doctor_model.update_doctor(self.doctor_id, doctor_data)
+                self.saved_id = self.doctor_id
                 QMessageBox.information(self, "موفقیت", "اطلاعات پزشک با موفقیت به‌روزرسانی شد.")
             else:
-                self.doctor_model.create_doctor(doctor_data)
+                self.saved_id = self.doctor_model.create_doctor(doctor_data)
                 QMessageBox.information(self, "موفقیت", "پزشک جدید با موفقیت ثبت شد.")
 
             self.accept()
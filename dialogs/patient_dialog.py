@@ -1,14 +1,20 @@
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+from PyQt5.QtWidgets import (QComboBox, QDateEdit, QDialog, QDialogButtonBox, QFormLayout, QLabel,
+                             QLineEdit, QMessageBox, QTextEdit)
+from PyQt5.QtCore import Qt, QCalendar, QDate
 from database.models import PatientModel
+import logging
 import sqlite3
 
 
+logger = logging.getLogger(__name__)
+
+
 class PatientDialog(QDialog):
     def __init__(self, parent=None, patient_id=None):
         super().__init__(parent)
         self.patient_id = patient_id
+        # ID of the created/updated record once the dialog is accepted
+        self.saved_id = None
         self.patient_model = PatientModel()
         self.setup_ui()
 
@@ -37,6 +43,9 @@ class PatientDialog(QDialog):
         self.birth_date = QDateEdit()
         self.birth_date.setDate(QDate.currentDate().addYears(-30))
         self.birth_date.setCalendarPopup(True)
+        # Shown and picked in the Jalali calendar; date() stays a Gregorian QDate
+        self.birth_date.setCalendar(QCalendar(QCalendar.System.Jalali))
+        self.birth_date.setDisplayFormat("yyyy/MM/dd")
 
         self.phone = QLineEdit()
         self.phone.setPlaceholderText("شماره تلفن")
@@ -167,27 +176,21 @@ class PatientDialog(QDialog):
                 self.allergies.toPlainText().strip()
             )
 
-            print(f"Patient data: {patient_data}")  # DEBUG
-            print(f"Patient ID: {self.patient_id}")  # DEBUG
-
             if self.patient_id:
-                print("Attempting to update patient...")  # DEBUG
                 self.patient_model.update_patient(self.patient_id, patient_data)
+                self.saved_id = self.patient_id
                 QMessageBox.information(self, "موفقیت", "اطلاعات بیمار با موفقیت به‌روزرسانی شد.")
             else:
-                print("Attempting to create patient...")  # DEBUG
-                self.patient_model.create_patient(patient_data)
+                self.saved_id = self.patient_model.create_patient(patient_data)
                 QMessageBox.information(self, "موفقیت", "بیمار جدید با موفقیت ثبت شد.")
 
             self.accept()
 
         except sqlite3.IntegrityError as e:
-            print(f"Integrity Error: {e}")  # DEBUG
+            logger.warning("Duplicate national ID on patient save: %s", e)
             QMessageBox.warning(self, "خطا", "کد ملی تکراری است. لطفاً کد ملی دیگری وارد کنید.")
         except Exception as e:
-            print(f"General Error: {e}")  # DEBUG
-            import traceback
-            traceback.print_exc()  # DEBUG
+            logger.exception("Error saving patient %s", self.patient_id)
             QMessageBox.critical(self, "خطا", f"خطا در ذخیره اطلاعات: {str(e)}")
 
     def validate_input(self):
@@ -0,0 +1,93 @@
+from PyQt5.QtWidgets import QComboBox, QCompleter, QMessageBox
+from PyQt5.QtCore import Qt, QTimer, QModelIndex
+from PyQt5.QtGui import QStandardItem, QStandardItemModel
+
+
+class RecordPicker(QComboBox):
+    """Searchable picker for one record (patient, doctor, ...).
+
+    Instead of loading every record up front, typing runs a limit-bounded
+    search and offers the matches in a completer popup. The search runs on
+    a QueryRunner (the window's, or the picker's own) on a channel of its
+    own, once typing pauses, so the GUI thread never waits on it. Only the
+    chosen record is kept as the combo's single item, so currentData()
+    returns its id (or None while nothing valid is chosen).
+    """
+
+    SUGGESTION_LIMIT = 50
+    SEARCH_DELAY_MS = 250
+
+    def __init__(self, search, format_record, placeholder="", parent=None, query_runner=None):
+        super().__init__(parent)
+        self._search = search
+        self._format_record = format_record
+
+        if query_runner is None:
+            # Imported here: the views package imports this module
+            from views.query_runner import QueryRunner
+            query_runner = QueryRunner(self, max_threads=1)
+        self._query_runner = query_runner
+        self._channel = f"picker:{id(self)}"
+        # A result arriving after the picker is gone is dropped
+        channel = self._channel
+        self.destroyed.connect(lambda _obj=None: query_runner.cancel(channel))
+
+        self.setEditable(True)
+        self.setInsertPolicy(QComboBox.NoInsert)
+        self.lineEdit().setPlaceholderText(placeholder)
+
+        self._suggestions = QStandardItemModel(self)
+        self._completer = QCompleter(self._suggestions, self)
+        # Matching is done by the database query, not by the completer
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.activated[QModelIndex].connect(self._on_activated)
+        self.setCompleter(self._completer)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.SEARCH_DELAY_MS)
+        self._timer.timeout.connect(self.refresh_suggestions)
+        self.lineEdit().textEdited.connect(lambda _text: self._timer.start())
+
+    def refresh_suggestions(self):
+        """Search the best matches for the typed text in the background"""
+        term = self.lineEdit().text().strip()
+        self._suggestions.clear()
+        if not term:
+            # Drop the result of a search still running for older text
+            self._query_runner.cancel(self._channel)
+            return
+
+        self._query_runner.submit(self._channel, self._search, term, self.SUGGESTION_LIMIT,
+                                  on_result=self.show_suggestions, on_error=self.on_search_error)
+
+    def show_suggestions(self, records):
+        self._suggestions.clear()
+        for record in records:
+            item = QStandardItem(self._format_record(record))
+            item.setData(record[0], Qt.UserRole)
+            self._suggestions.appendRow(item)
+
+        if self._suggestions.rowCount():
+            self._completer.complete()
+
+    def on_search_error(self, message):
+        QMessageBox.critical(self, "خطا", f"خطا در جستجو: {message}")
+
+    def set_record(self, record):
+        """Select a record (a database row whose first column is the id)"""
+        self.clear()
+        if record is not None:
+            self.addItem(self._format_record(record), record[0])
+            self.setCurrentIndex(0)
+
+    def currentData(self, role=Qt.UserRole):
+        # Text edited after choosing no longer refers to the chosen record
+        if self.currentIndex() < 0 or self.currentText() != self.itemText(self.currentIndex()):
+            return None
+        return super().currentData(role)
+
+    def _on_activated(self, index):
+        self.clear()
+        self.addItem(index.data(Qt.DisplayRole), index.data(Qt.UserRole))
+        self.setCurrentIndex(0)
@@ -1,8 +1,66 @@
+import time
+
+# Taken before the heavy imports so startup profiling covers them
+STARTUP_STARTED = time.perf_counter()
+
 import sys
 import os
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import *
+import re
+import logging
+from PyQt5.QtWidgets import (QApplication, QDialog, QHeaderView, QMainWindow, QMessageBox, QProgressBar,
+                             QShortcut, QWidget)
+from PyQt5.QtCore import Qt, QEvent, QObject, QTimer
+from PyQt5.QtGui import QFont, QKeySequence
+
+
+class StartupProfiler(QObject):
+    """Reports the time to the first painted main window, by phase.
+
+    Enabled with HMS_PROFILE_STARTUP=1; HMS_PROFILE_STARTUP=exit also
+    quits once the report is written, for scripted measurements.
+    """
+
+    def __init__(self, started):
+        super().__init__()
+        self.mode = os.environ.get("HMS_PROFILE_STARTUP", "")
+        self.marks = [("start", started)]
+        self.window = None
+
+    def mark(self, phase):
+        """Record the end of a startup phase"""
+        if self.mode:
+            self.marks.append((phase, time.perf_counter()))
+
+    def watch(self, window):
+        """Report once the window has been painted for the first time"""
+        if self.mode:
+            self.window = window
+            QApplication.instance().installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if (event.type() == QEvent.Paint and isinstance(obj, QWidget)
+                and (obj is self.window or self.window.isAncestorOf(obj))):
+            QApplication.instance().removeEventFilter(self)
+            # Queued behind the rest of the paint pass
+            QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self):
+        self.mark("first paint")
+        self.window = None
+        log = logging.getLogger("startup")
+        started = previous = self.marks[0][1]
+        for phase, at in self.marks[1:]:
+            log.info("%-16s %8.1f ms  (at %8.1f ms)", phase, (at - previous) * 1000, (at - started) * 1000)
+            previous = at
+        log.info("%-16s %8.1f ms", "total", (previous - started) * 1000)
+        self.mode, mode = "", self.mode
+        if mode == "exit":
+            QApplication.instance().quit()
+
+
+startup = StartupProfiler(STARTUP_STARTED)
+startup.mark("qt imports")
 
 # Import the generated UI class
 try:
@@ -13,8 +71,30 @@ except ImportError:
     UI_FILE_AVAILABLE = False
     print("UI file not found, using programmatic UI")
 
-from database.models import PatientModel, DoctorModel, AppointmentModel
-from dialogs import PatientDialog, DoctorDialog, AppointmentDialog
+from database.models import PatientModel, DoctorModel, AppointmentModel, ReferencedRecordError
+# Each dialog module is imported when its dialog is first opened
+import dialogs
+from views import RecordTableModel, QueryRunner, DoctorAgendaView, ReportsView
+from views.jalali import format_jalali, normalize_digits, query_date
+
+startup.mark("app imports")
+
+
+PATIENT_HEADERS = ["شناسه", "نام", "نام خانوادگی", "کد ملی", "تاریخ تولد", "تلفن", "آدرس", "تماس اضطراری",
+                   "گروه خون", "آلرژی‌ها"]
+DOCTOR_HEADERS = ["شناسه", "نام", "نام خانوادگی", "تخصص", "تلفن", "ایمیل", "شماره نظام پزشکی", "شماره اتاق",
+                  "هزینه ویزیت"]
+APPOINTMENT_HEADERS = ["شناسه", "نام بیمار", "نام پزشک", "تاریخ", "ساعت", "وضعیت", "یادداشت"]
+
+# Grid columns holding stored yyyy-MM-dd dates, shown in the Jalali calendar
+DATE_HEADERS = ("تاریخ", "تاریخ تولد")
+
+# Delay before search-as-you-type fires, in milliseconds
+SEARCH_DELAY_MS = 300
+
+APPOINTMENT_STATUSES = ["فعال", "انجام شده", "لغو شده", "به تعویق افتاده"]
+# Gregorian yyyy-MM-dd or Jalali yyyy/MM/dd (see views.jalali.query_date)
+DATE_PATTERN = re.compile(r"\d{4}[-/]\d{1,2}[-/]\d{1,2}")
 
 
 class HospitalManagementSystem(QMainWindow):
@@ -26,14 +106,30 @@ class HospitalManagementSystem(QMainWindow):
         self.appointment_model = AppointmentModel()
 
         self.current_view = "patients"
+        # Panels shown instead of the record grid, created the first time they are opened
+        self.agenda_view = None
+        self.reports_view = None
+
+        # Queries run off the GUI thread; the grid pages through _grid_fetch_page
+        self.query_runner = QueryRunner(self)
+        self._grid_fetch_page = None
+        self._grid_next_cursor = None
+        self._grid_error = ""
+
+        # Search-as-you-type fires once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
 
         # Load UI from file or create programmatically
         if UI_FILE_AVAILABLE:
             self.load_ui_from_file()
         else:
             self.setup_ui_programmatically()
+        startup.mark("ui setup")
 
         self.load_styles()
+        startup.mark("styles")
         self.connect_signals()
         self.show_patients()
 
@@ -46,15 +142,50 @@ class HospitalManagementSystem(QMainWindow):
         self.btn_patients = self.ui.btn_patients
         self.btn_doctors = self.ui.btn_doctors
         self.btn_appointments = self.ui.btn_appointments
+        self.btn_agenda = self.ui.btn_agenda
+        self.btn_reports = self.ui.btn_reports
         self.search_input = self.ui.search_input
         self.btn_search = self.ui.btn_search
+        self.btn_refresh = self.ui.btn_refresh
         self.table = self.ui.table
         self.btn_add = self.ui.btn_add
         self.btn_edit = self.ui.btn_edit
         self.btn_delete = self.ui.btn_delete
+        self.btn_bulk_status = self.ui.btn_bulk_status
+
+        self.setup_table_view()
+        self.setup_loading_indicator()
 
         print("UI loaded from file successfully")
 
+    def setup_table_view(self):
+        """Bind the grid to a virtual model that formats cells on demand"""
+        self.table_model = RecordTableModel(parent=self)
+        self.table.setModel(self.table_model)
+        self.table.setWordWrap(False)
+        # Only measure the loaded chunk when sizing columns, not every row
+        self.table.horizontalHeader().setResizeContentsPrecision(RecordTableModel.CHUNK_SIZE)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_model.moreRequested.connect(self.load_next_page)
+
+    def setup_loading_indicator(self):
+        """Busy bar in the status bar while a query is running"""
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)
+        self.loading_bar.setMaximumWidth(160)
+        self.loading_bar.setMaximumHeight(14)
+        self.loading_bar.setTextVisible(False)
+        self.loading_bar.hide()
+        self.statusBar().addPermanentWidget(self.loading_bar)
+        self.query_runner.busyChanged.connect(self.set_loading)
+
+    def set_loading(self, busy):
+        self.loading_bar.setVisible(busy)
+        if busy:
+            self.statusBar().showMessage("در حال بارگذاری...")
+        else:
+            self.statusBar().clearMessage()
+
     # def setup_ui_programmatically(self):
     #     """Fallback: Create UI programmatically"""
     #     self.setWindowTitle("سیستم مدیریت بیمارستان")
@@ -132,13 +263,21 @@ class HospitalManagementSystem(QMainWindow):
         self.btn_patients.clicked.connect(self.show_patients)
         self.btn_doctors.clicked.connect(self.show_doctors)
         self.btn_appointments.clicked.connect(self.show_appointments)
+        self.btn_agenda.clicked.connect(self.show_agenda)
+        self.btn_reports.clicked.connect(self.show_reports)
 
         self.btn_add.clicked.connect(self.add_record)
         self.btn_edit.clicked.connect(self.edit_record)
         self.btn_delete.clicked.connect(self.delete_record)
+        self.btn_bulk_status.clicked.connect(self.bulk_update_status)
 
         self.btn_search.clicked.connect(self.search_records)
         self.search_input.returnPressed.connect(self.search_records)
+        self.search_input.textEdited.connect(lambda _text: self.search_timer.start())
+        self.search_timer.timeout.connect(self.search_records)
+
+        self.btn_refresh.clicked.connect(self.refresh_view)
+        QShortcut(QKeySequence(QKeySequence.Refresh), self, self.refresh_view)
 
         self.table.doubleClicked.connect(self.edit_record)
 
@@ -156,6 +295,7 @@ class HospitalManagementSystem(QMainWindow):
 
     def show_patients(self):
         self.current_view = "patients"
+        self.show_panel(None)
         self.btn_add.setText("افزودن بیمار")
         self.btn_edit.setText("ویرایش بیمار")
         self.btn_delete.setText("حذف بیمار")
@@ -164,6 +304,7 @@ class HospitalManagementSystem(QMainWindow):
 
     def show_doctors(self):
         self.current_view = "doctors"
+        self.show_panel(None)
         self.btn_add.setText("افزودن پزشک")
         self.btn_edit.setText("ویرایش پزشک")
         self.btn_delete.setText("حذف پزشک")
@@ -172,120 +313,292 @@ class HospitalManagementSystem(QMainWindow):
 
     def show_appointments(self):
         self.current_view = "appointments"
+        self.show_panel(None)
         self.btn_add.setText("افزودن نوبت")
         self.btn_edit.setText("ویرایش نوبت")
         self.btn_delete.setText("حذف نوبت")
         self.search_input.setPlaceholderText("جستجو در نوبت‌ها...")
         self.load_appointments_data()
 
-    def load_patients_data(self):
+    def show_agenda(self):
+        """Weekly agenda of a doctor; opens on the selected doctor when coming from the doctors list"""
+        doctor_id = self.current_record_id() if self.current_view == "doctors" else None
+        if self.agenda_view is None:
+            self.agenda_view = DoctorAgendaView(self.query_runner, self.appointment_model,
+                                                self.doctor_model, self)
+            self.agenda_view.appointmentActivated.connect(self.edit_agenda_appointment)
+            self.add_panel(self.agenda_view)
+
+        self.current_view = "agenda"
+        self.show_panel(self.agenda_view)
+        if doctor_id is not None:
+            self.agenda_view.show_doctor(doctor_id)
+        else:
+            self.agenda_view.reload()
+
+    def show_reports(self):
+        """Doctor utilization, status and revenue reports"""
+        if self.reports_view is None:
+            self.reports_view = ReportsView(self.query_runner, self)
+            self.add_panel(self.reports_view)
+
+        self.current_view = "reports"
+        self.show_panel(self.reports_view)
+        self.reports_view.reload()
+
+    def add_panel(self, panel):
+        layout = self.centralWidget().layout()
+        layout.insertWidget(layout.indexOf(self.table) + 1, panel)
+
+    def show_panel(self, panel):
+        """Show a panel (the agenda or the reports) in place of the record grid, or the grid for None"""
+        if panel is not None:
+            self.search_timer.stop()
+            self.query_runner.cancel("grid")
+        for widget in (self.search_input, self.btn_search, self.btn_refresh, self.table,
+                       self.btn_add, self.btn_edit, self.btn_delete):
+            widget.setVisible(panel is None)
+        self.btn_bulk_status.setVisible(panel is None and self.current_view == "appointments")
+        for other in (self.agenda_view, self.reports_view):
+            if other is not None:
+                other.setVisible(other is panel)
+
+    def edit_agenda_appointment(self, appointment_id):
         try:
-            data = self.patient_model.get_all_patients()
-            headers = ["شناسه", "نام", "نام خانوادگی", "کد ملی", "تاریخ تولد", "تلفن", "آدرس", "تماس اضطراری",
-                       "گروه خون", "آلرژی‌ها"]
-            self.setup_table(data, headers)
+            dialog = dialogs.AppointmentDialog(self, appointment_id, self.query_runner)
+            if dialog.exec_() == QDialog.Accepted:
+                self.agenda_view.reload()
         except Exception as e:
-            QMessageBox.critical(self, "خطا", f"خطا در بارگذاری بیماران: {str(e)}")
+            QMessageBox.critical(self, "خطا", f"خطا در ویرایش: {str(e)}")
+
+    def load_patients_data(self):
+        self.load_grid(PATIENT_HEADERS, self.patient_model.get_patients_page, "خطا در بارگذاری بیماران")
 
     def load_doctors_data(self):
-        try:
-            data = self.doctor_model.get_all_doctors()
-            headers = ["شناسه", "نام", "نام خانوادگی", "تخصص", "تلفن", "ایمیل", "شماره نظام پزشکی", "شماره اتاق",
-                       "هزینه ویزیت"]
-            self.setup_table(data, headers)
-        except Exception as e:
-            QMessageBox.critical(self, "خطا", f"خطا در بارگذاری پزشکان: {str(e)}")
+        self.load_grid(DOCTOR_HEADERS, self.doctor_model.get_doctors_page, "خطا در بارگذاری پزشکان")
 
     def load_appointments_data(self):
-        try:
-            data = self.appointment_model.get_all_appointments()
-            headers = ["شناسه", "نام بیمار", "نام پزشک", "تاریخ", "ساعت", "وضعیت", "یادداشت"]
-            self.setup_table(data, headers)
-        except Exception as e:
-            QMessageBox.critical(self, "خطا", f"خطا در بارگذاری نوبت‌ها: {str(e)}")
-
-    def setup_table(self, data, headers):
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
-
-        for row, record in enumerate(data):
-            for col, value in enumerate(record):
-                item = QTableWidgetItem(str(value) if value is not None else "")
-                self.table.setItem(row, col, item)
-
+        self.load_grid(APPOINTMENT_HEADERS, self.appointment_model.get_appointments_page,
+                       "خطا در بارگذاری نوبت‌ها")
+
+    def load_grid(self, headers, fetch_page, error_text):
+        """Clear the grid and load the first page of fetch_page in the background"""
+        self.search_timer.stop()
+        self._grid_fetch_page = fetch_page
+        self._grid_next_cursor = None
+        self._grid_error = error_text
+        self.setup_table([], headers)
+        self.query_runner.submit("grid", fetch_page, None,
+                                 on_result=lambda page: self.on_first_page(headers, page),
+                                 on_error=self.on_grid_error)
+
+    def on_first_page(self, headers, page):
+        rows, next_cursor = page
+        self._grid_next_cursor = next_cursor
+        self.setup_table(rows, headers, has_more=next_cursor is not None)
+
+    def load_next_page(self):
+        if self._grid_fetch_page is None or self._grid_next_cursor is None:
+            self.table_model.stop_loading()
+            return
+        self.query_runner.submit("grid", self._grid_fetch_page, self._grid_next_cursor,
+                                 on_result=self.on_next_page, on_error=self.on_grid_error)
+
+    def on_next_page(self, page):
+        rows, next_cursor = page
+        self._grid_next_cursor = next_cursor
+        self.table_model.append_rows(rows, next_cursor is not None)
+
+    def on_grid_error(self, message):
+        self.table_model.stop_loading()
+        QMessageBox.critical(self, "خطا", f"{self._grid_error}: {message}")
+
+    def setup_table(self, data, headers, has_more=False):
+        formatters = {column: format_jalali for column, header in enumerate(headers)
+                      if header in DATE_HEADERS}
+        self.table_model.set_source(headers, data, has_more, formatters)
+        self.table.scrollToTop()
         self.table.resizeColumnsToContents()
 
+    def refresh_view(self):
+        """Explicit full reload of the current view (or of the current search)"""
+        if self.current_view == "agenda":
+            self.agenda_view.reload()
+            return
+        if self.current_view == "reports":
+            self.reports_view.reload()
+            return
+        self.search_records()
+
+    def grid_record_loader(self):
+        """Model method returning one record in the current grid's row format"""
+        if self.current_view == "patients":
+            return self.patient_model.get_patient_by_id
+        if self.current_view == "doctors":
+            return self.doctor_model.get_doctor_by_id
+        return self.appointment_model.get_appointment_row
+
+    def grid_sort_key(self):
+        """Key of the current grid's page order (descending), matching the models' keyset pages"""
+        if self.current_view == "appointments":
+            # appointment_ts DESC, id DESC; a NULL timestamp sorts last
+            return lambda record: (record[7] is not None, record[7] or 0, record[0])
+        return lambda record: record[0]
+
+    def patch_record(self, record_id, inserted=False):
+        """Reload a single record and patch it into the grid, keeping scroll and selection"""
+        view = self.current_view
+        sort_key = self.grid_sort_key()
+
+        def apply(record):
+            if view != self.current_view:
+                return
+            if record is None:
+                self.table_model.remove_record(record_id)
+            elif self._grid_fetch_page is None:
+                # Search results may be in rank order and may not match a new record
+                self.table_model.update_record(record)
+            else:
+                row = self.table_model.find_row(record_id)
+                if row >= 0 and sort_key(self.table_model.record(row)) == sort_key(record):
+                    self.table_model.update_record(record)
+                elif row >= 0 or inserted:
+                    # New, or moved in the page order (e.g. a rescheduled appointment)
+                    self.table_model.remove_record(record_id)
+                    self.table_model.insert_sorted(record, sort_key)
+
+        self.query_runner.submit(f"record:{view}:{record_id}", self.grid_record_loader(), record_id,
+                                 on_result=apply, on_error=self.on_grid_error)
+
+    def current_record_id(self):
+        """ID of the selected row, or None when nothing is selected"""
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.table_model.record_id(index.row())
+
     def add_record(self):
         try:
             if self.current_view == "patients":
-                dialog = PatientDialog(self)
+                dialog = dialogs.PatientDialog(self)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_patients_data()
+                    self.patch_record(dialog.saved_id, inserted=True)
             elif self.current_view == "doctors":
-                dialog = DoctorDialog(self)
+                dialog = dialogs.DoctorDialog(self)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_doctors_data()
+                    self.patch_record(dialog.saved_id, inserted=True)
             elif self.current_view == "appointments":
-                dialog = AppointmentDialog(self)
+                dialog = dialogs.AppointmentDialog(self, query_runner=self.query_runner)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_appointments_data()
+                    self.patch_record(dialog.saved_id, inserted=True)
         except Exception as e:
             QMessageBox.critical(self, "خطا", f"خطا در باز کردن فرم: {str(e)}")
 
     def edit_record(self):
-        current_row = self.table.currentRow()
-        if current_row < 0:
+        record_id = self.current_record_id()
+        if record_id is None:
             QMessageBox.warning(self, "هشدار", "لطفاً یک رکورد را انتخاب کنید.")
             return
 
         try:
-            record_id = self.table.item(current_row, 0).text()
-
             if self.current_view == "patients":
-                dialog = PatientDialog(self, record_id)
+                dialog = dialogs.PatientDialog(self, record_id)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_patients_data()
+                    self.patch_record(record_id)
             elif self.current_view == "doctors":
-                dialog = DoctorDialog(self, record_id)
+                dialog = dialogs.DoctorDialog(self, record_id)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_doctors_data()
+                    self.patch_record(record_id)
             elif self.current_view == "appointments":
-                dialog = AppointmentDialog(self, record_id)
+                dialog = dialogs.AppointmentDialog(self, record_id, self.query_runner)
                 if dialog.exec_() == QDialog.Accepted:
-                    self.load_appointments_data()
+                    self.patch_record(record_id)
         except Exception as e:
             QMessageBox.critical(self, "خطا", f"خطا در ویرایش: {str(e)}")
 
+    def selected_record_ids(self):
+        """IDs of the selected rows in view order, or of the current row when none is selected"""
+        rows = sorted(index.row() for index in self.table.selectionModel().selectedRows())
+        if not rows:
+            record_id = self.current_record_id()
+            return [] if record_id is None else [record_id]
+        return [self.table_model.record_id(row) for row in rows]
+
     def delete_record(self):
-        current_row = self.table.currentRow()
-        if current_row < 0:
+        """Delete every selected record in one transaction"""
+        record_ids = self.selected_record_ids()
+        if not record_ids:
             QMessageBox.warning(self, "هشدار", "لطفاً یک رکورد را انتخاب کنید.")
             return
 
-        reply = QMessageBox.question(self, "تأیید حذف", "آیا مطمئن هستید که می‌خواهید این رکورد را حذف کنید؟",
+        if len(record_ids) == 1:
+            question = "آیا مطمئن هستید که می‌خواهید این رکورد را حذف کنید؟"
+        else:
+            question = f"آیا مطمئن هستید که می‌خواهید {len(record_ids)} رکورد را حذف کنید؟"
+        reply = QMessageBox.question(self, "تأیید حذف", question,
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
 
-        if reply == QMessageBox.Yes:
+        if self.current_view == "patients":
+            model, noun = self.patient_model, "بیمار"
+        elif self.current_view == "doctors":
+            model, noun = self.doctor_model, "پزشک"
+        else:
+            model, noun = self.appointment_model, "نوبت"
+
+        view = self.current_view
+
+        def delete(on_delete=None):
+            # Runs on the pool: a refused delete returns what references the records
             try:
-                record_id = self.table.item(current_row, 0).text()
-
-                if self.current_view == "patients":
-                    self.patient_model.delete_patient(record_id)
-                    self.load_patients_data()
-                    QMessageBox.information(self, "موفقیت", "بیمار با موفقیت حذف شد.")
-                elif self.current_view == "doctors":
-                    self.doctor_model.delete_doctor(record_id)
-                    self.load_doctors_data()
-                    QMessageBox.information(self, "موفقیت", "پزشک با موفقیت حذف شد.")
-                elif self.current_view == "appointments":
-                    self.appointment_model.delete_appointment(record_id)
-                    self.load_appointments_data()
-                    QMessageBox.information(self, "موفقیت", "نوبت با موفقیت حذف شد.")
-            except Exception as e:
-                QMessageBox.critical(self, "خطا", f"خطا در حذف: {str(e)}")
+                return model.delete_many(record_ids, on_delete), None
+            except ReferencedRecordError as e:
+                return None, e.references
+
+        def on_deleted(result):
+            deleted, references = result
+            if references is not None:
+                count = sum(references.values())
+                reply = QMessageBox.question(self, "تأیید حذف",
+                                             f"برای رکوردهای انتخاب‌شده {count} نوبت ثبت شده است. "
+                                             "نوبت‌ها نیز حذف شوند؟",
+                                             QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+                if reply != QMessageBox.Yes:
+                    self.btn_delete.setEnabled(True)
+                    return
+                self.query_runner.submit("delete", delete, "cascade", on_result=on_deleted, on_error=on_error)
+                return
+
+            self.btn_delete.setEnabled(True)
+            if view == self.current_view:
+                self.table_model.remove_records(record_ids)
+            if len(record_ids) == 1:
+                QMessageBox.information(self, "موفقیت", f"{noun} با موفقیت حذف شد.")
+            else:
+                QMessageBox.information(self, "موفقیت", f"{deleted} {noun} با موفقیت حذف شدند.")
+
+        def on_error(message):
+            self.btn_delete.setEnabled(True)
+            QMessageBox.critical(self, "خطا", f"خطا در حذف: {message}")
+
+        # A cascade over many rows takes a while; no second delete meanwhile
+        self.btn_delete.setEnabled(False)
+        self.query_runner.submit("delete", delete, on_result=on_deleted, on_error=on_error)
+
+    def bulk_update_status(self):
+        """Cancel or postpone the selected appointments, or a doctor's appointments in a date range"""
+        try:
+            dialog = dialogs.BulkStatusDialog(self, self.selected_record_ids(), self.query_runner)
+            if dialog.exec_() == QDialog.Accepted:
+                # Only the status changed, so the loaded rows are patched without a reload
+                self.table_model.set_column(dialog.changes["ids"], APPOINTMENT_HEADERS.index("وضعیت"),
+                                            dialog.status.currentText())
+        except Exception as e:
+            QMessageBox.critical(self, "خطا", f"خطا در تغییر وضعیت: {str(e)}")
 
     def search_records(self):
+        self.search_timer.stop()
         search_term = self.search_input.text().strip()
 
         if not search_term:
@@ -297,27 +610,60 @@ class HospitalManagementSystem(QMainWindow):
                 self.load_appointments_data()
             return
 
-        try:
-            if self.current_view == "patients":
-                data = self.patient_model.search_patients(search_term)
-                headers = ["شناسه", "نام", "نام خانوادگی", "کد ملی", "تاریخ تولد", "تلفن", "آدرس", "تماس اضطراری",
-                           "گروه خون", "آلرژی‌ها"]
-                self.setup_table(data, headers)
-        except Exception as e:
-            QMessageBox.critical(self, "خطا", f"خطا در جستجو: {str(e)}")
+        if self.current_view == "patients":
+            self.search_grid(PATIENT_HEADERS, self.patient_model.search_patients, search_term)
+        elif self.current_view == "doctors":
+            self.search_grid(DOCTOR_HEADERS, self.doctor_model.search_doctors, search_term)
+        elif self.current_view == "appointments":
+            self.search_grid(APPOINTMENT_HEADERS, self.search_appointments, search_term)
+
+    def search_appointments(self, search_term):
+        """Split the search box into name, status and date-range filters.
+
+        "1403/10/16" (or Gregorian "2025-01-05") searches one day, two dates
+        search the range between them; a status text such as "لغو شده"
+        filters by status.
+        """
+        search_term = normalize_digits(search_term)
+        dates = [query_date(text) for text in DATE_PATTERN.findall(search_term)]
+        text = DATE_PATTERN.sub(" ", search_term).replace("..", " ").strip()
+
+        status = None
+        for candidate in APPOINTMENT_STATUSES:
+            if candidate in text:
+                status = candidate
+                text = text.replace(candidate, " ").strip()
+                break
+
+        date_from = min(dates) if dates else None
+        date_to = max(dates) if dates else None
+        return self.appointment_model.search_appointments(text or None, status, date_from, date_to)
+
+    def search_grid(self, headers, search, search_term):
+        """Run a search in the background; a newer search or view switch drops this one"""
+        self._grid_fetch_page = None
+        self._grid_next_cursor = None
+        self._grid_error = "خطا در جستجو"
+        self.query_runner.submit("grid", search, search_term,
+                                 on_result=lambda rows: self.setup_table(rows, headers),
+                                 on_error=self.on_grid_error)
 
     def closeEvent(self, event):
         reply = QMessageBox.question(self, "خروج از برنامه", "آیا مطمئن هستید که می‌خواهید از برنامه خارج شوید؟",
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
+            self.query_runner.shutdown()
             event.accept()
         else:
             event.ignore()
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
 
     # Set application properties
     app.setApplicationName("سیستم مدیریت بیمارستان")
@@ -332,7 +678,12 @@ def main():
 
     # Create and show main window
     window = HospitalManagementSystem()
+    # Also when the app quits without closing the window (e.g. the startup probe)
+    app.aboutToQuit.connect(window.query_runner.shutdown)
+    startup.mark("main window")
+    startup.watch(window)
     window.show()
+    startup.mark("show")
 
     sys.exit(app.exec_())
 
@@ -0,0 +1,379 @@
+"""Headless HTTP/JSON service over the models, for clinics with several desks.
+
+    HMS_TOKEN=<shared secret> python server.py --db hospital.db --host <LAN address> --port 8765
+
+Instead of sharing hospital.db over a network drive, one machine runs
+this server next to the database file and the desks talk to it. Every
+request must carry the shared token as "Authorization: Bearer <token>"
+(--token or HMS_TOKEN); without a token the server only listens on the
+loopback interface by default, and warns when told to listen elsewhere.
+The API is plain HTTP: on an untrusted network put it behind a TLS proxy.
+
+    GET    /api/<resource>?after=<cursor>&limit=100   one keyset page
+    GET    /api/<resource>?q=<term>                    search
+    GET    /api/<resource>/<id>                        one record
+    POST   /api/<resource>                             create from a JSON object
+    PUT    /api/<resource>/<id>                        update from a JSON object
+    DELETE /api/<resource>/<id>?on_delete=cascade      delete (with the record's appointments)
+    GET    /metrics                                    request timings (and query timings with --query-stats)
+    GET    /health
+
+<resource> is patients, doctors or appointments; appointment searches
+also take status, date_from and date_to (yyyy-MM-dd). Records are JSON
+objects keyed by column name.
+
+Requests are handled by a fixed pool of threads, each reading through its
+own WAL connection, so reads run concurrently. Every write is handed to
+one writer thread, so writes are serialized on a single connection and
+never wait on each other for the SQLite write lock.
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from database.connection import db
+from database.instrumentation import query_stats
+from database.models import (PatientModel, DoctorModel, AppointmentModel, AppointmentConflictError,
+                             ReferencedRecordError, PAGE_SIZE, SEARCH_LIMIT)
+
+
+logger = logging.getLogger("server")
+
+# Threads handling requests (and holding a read connection each)
+REQUEST_WORKERS = 16
+
+# Seconds an idle keep-alive connection may hold a request thread
+IDLE_TIMEOUT = 5
+
+# Largest accepted request body, in bytes
+MAX_BODY = 1024 * 1024
+
+# Durations kept per route for the percentiles
+SAMPLE_WINDOW = 1000
+
+PATH_PATTERN = re.compile(r"^/api/(?P<resource>[a-z]+)(?:/(?P<id>\d+))?/?$")
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class Resource:
+    """The model methods and column names behind one /api/<name> endpoint"""
+
+    def __init__(self, model, columns, record_columns, list_columns, page, search, get,
+                 create, update, delete):
+        self.model = model
+        self.columns = columns                # writable columns, in model order
+        self.record_columns = record_columns  # rows of get
+        self.list_columns = list_columns      # rows of page and search
+        self.page = getattr(model, page)
+        self.search = getattr(model, search)
+        self.get = getattr(model, get)
+        self.create = getattr(model, create)
+        self.update = getattr(model, update)
+        self.delete = getattr(model, delete)
+
+    def record_data(self, body):
+        """Model tuple from a JSON object; absent columns are NULL"""
+        if not isinstance(body, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body must be a JSON object")
+        unknown = set(body) - set(self.columns)
+        if unknown:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"unknown columns: {', '.join(sorted(unknown))}")
+        return tuple(body.get(column) for column in self.columns)
+
+
+def build_resources():
+    patients = PatientModel()
+    doctors = DoctorModel()
+    appointments = AppointmentModel()
+    patient_columns = ("id",) + PatientModel.COLUMNS
+    doctor_columns = ("id",) + DoctorModel.COLUMNS
+    return {
+        "patients": Resource(patients, PatientModel.COLUMNS, patient_columns, patient_columns,
+                             "get_patients_page", "search_patients", "get_patient_by_id",
+                             "create_patient", "update_patient", "delete_patient"),
+        "doctors": Resource(doctors, DoctorModel.COLUMNS, doctor_columns, doctor_columns,
+                            "get_doctors_page", "search_doctors", "get_doctor_by_id",
+                            "create_doctor", "update_doctor", "delete_doctor"),
+        "appointments": Resource(appointments, AppointmentModel.COLUMNS,
+                                 ("id",) + AppointmentModel.COLUMNS + ("appointment_ts",),
+                                 ("id", "patient_name", "doctor_name", "appointment_date",
+                                  "appointment_time", "status", "notes", "appointment_ts"),
+                                 "get_appointments_page", "search_appointments",
+                                 "get_appointment_by_id", "create_appointment",
+                                 "update_appointment", "delete_appointment"),
+    }
+
+
+class RequestMetrics:
+    """Count, errors and latency percentiles per route"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, elapsed, failed):
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                entry = self._routes[route] = {"count": 0, "errors": 0, "total": 0.0, "max": 0.0,
+                                               "samples": deque(maxlen=SAMPLE_WINDOW)}
+            entry["count"] += 1
+            entry["errors"] += failed
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["samples"].append(elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(route, dict(entry, samples=sorted(entry["samples"])))
+                     for route, entry in self._routes.items()]
+
+        routes = {}
+        for route, entry in sorted(items):
+            samples = entry["samples"]
+            routes[route] = {
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "mean_ms": round(entry["total"] / entry["count"] * 1000, 4),
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 4),
+                "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 4),
+                "max_ms": round(entry["max"] * 1000, 4),
+            }
+        return {"uptime_s": round(time.time() - self.started, 1), "routes": routes}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    timeout = IDLE_TIMEOUT
+    # Headers and body are written separately; without TCP_NODELAY each
+    # keep-alive response waits for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+    def do_PUT(self):
+        self.dispatch("PUT")
+
+    def do_DELETE(self):
+        self.dispatch("DELETE")
+
+    def dispatch(self, method):
+        start = time.perf_counter()
+        # Replaced by the route template once the path is recognized
+        self.route_name = f"{method} (unmatched)"
+        status = HTTPStatus.INTERNAL_SERVER_ERROR
+        try:
+            self.authenticate()
+            status, payload = self.route(method)
+        except ApiError as e:
+            status, payload = e.status, {"error": str(e)}
+        except AppointmentConflictError as e:
+            status, payload = HTTPStatus.CONFLICT, {"error": str(e), "kind": e.kind,
+                                                    "conflicts": e.conflicts}
+        except ReferencedRecordError as e:
+            status, payload = HTTPStatus.CONFLICT, {"error": str(e), "references": e.references}
+        except sqlite3.IntegrityError as e:
+            status, payload = HTTPStatus.CONFLICT, {"error": str(e)}
+        except (ValueError, TypeError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            logger.exception("%s failed", self.route_name)
+            payload = {"error": str(e)}
+        self.send_json(status, payload)
+        self.server.metrics.record(self.route_name, time.perf_counter() - start, status >= 400)
+
+    def authenticate(self):
+        """Reject the request unless it carries the server's token"""
+        token = self.server.token
+        if token is None:
+            return
+        scheme, _, credentials = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.strip().encode(), token.encode()):
+            # The unread body would be taken for the next request
+            self.close_connection = True
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "missing or invalid token")
+
+    def route(self, method):
+        """Run the request; returns (status, payload)"""
+        url = urlsplit(self.path)
+        if url.path in ("/health", "/metrics") and method == "GET":
+            self.route_name = f"GET {url.path}"
+            if url.path == "/health":
+                return HTTPStatus.OK, {"status": "ok"}
+            return HTTPStatus.OK, {"requests": self.server.metrics.snapshot(),
+                                   "queries": query_stats.snapshot()}
+
+        match = PATH_PATTERN.match(url.path)
+        resource = self.server.resources.get(match.group("resource")) if match else None
+        if resource is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"no such endpoint: {url.path}")
+        name, record_id = match.group("resource"), match.group("id")
+        self.route_name = f"{method} /api/{name}" + ("/{id}" if record_id else "")
+
+        if record_id is None:
+            if method == "GET":
+                return HTTPStatus.OK, self.list_rows(resource, parse_qs(url.query))
+            if method == "POST":
+                data = resource.record_data(self.read_json())
+                return HTTPStatus.CREATED, {"id": self.server.write(resource.create, data)}
+        else:
+            record_id = int(record_id)
+            if method == "DELETE":
+                # Idempotent: deleting a missing record succeeds too
+                query = parse_qs(url.query)
+                options = {"on_delete": query["on_delete"][0]} if "on_delete" in query else {}
+                return HTTPStatus.OK, {"id": self.server.write(resource.delete, record_id, **options)}
+            if method in ("GET", "PUT"):
+                if method == "GET":
+                    row = resource.get(record_id)
+                else:
+                    row = self.server.write(resource.update, record_id, resource.record_data(self.read_json()))
+                if row is None:
+                    raise ApiError(HTTPStatus.NOT_FOUND, f"{name} {record_id} not found")
+                return HTTPStatus.OK, dict(zip(resource.record_columns, row))
+        raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed on {url.path}")
+
+    def list_rows(self, resource, query):
+        """One page, or the search results when a search parameter is given"""
+        first = {key: values[0] for key, values in query.items()}
+        limit = int(first.get("limit", PAGE_SIZE if "q" not in first else SEARCH_LIMIT))
+        if not 1 <= limit <= 1000:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "limit must be between 1 and 1000")
+
+        if resource.model.TABLE == "appointments" and {"q", "status", "date_from", "date_to"} & set(first):
+            rows = resource.search(first.get("q"), first.get("status"), first.get("date_from"),
+                                   first.get("date_to"), limit)
+            return {"rows": [dict(zip(resource.list_columns, row)) for row in rows], "next": None}
+        if "q" in first:
+            rows = resource.search(first["q"], limit)
+            return {"rows": [dict(zip(resource.list_columns, row)) for row in rows], "next": None}
+
+        rows, next_cursor = resource.page(first.get("after"), limit)
+        return {"rows": [dict(zip(resource.list_columns, row)) for row in rows], "next": next_cursor}
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "request body is not valid JSON")
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.UNAUTHORIZED:
+            self.send_header("WWW-Authenticate", "Bearer")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+class ApiServer(HTTPServer):
+    """HTTP server with a fixed request thread pool and a single writer thread"""
+
+    def __init__(self, address, workers=REQUEST_WORKERS, token=None):
+        super().__init__(address, ApiHandler)
+        # Shared secret every request must present; None accepts anyone
+        self.token = token or None
+        self.resources = build_resources()
+        self.metrics = RequestMetrics()
+        # Request threads live on, so their read connections are reused
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="http")
+        self.writer = ThreadPoolExecutor(1, thread_name_prefix="db-write")
+
+    def write(self, func, *args, **kwargs):
+        """Run a write on the writer thread and wait for its result"""
+        return self.writer.submit(func, *args, **kwargs).result()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=True)
+        self.writer.shutdown(wait=True)
+
+
+def serve(db_path="hospital.db", host="127.0.0.1", port=8765, workers=REQUEST_WORKERS, token=None,
+          query_stats=None):
+    if not token and not is_loopback(host):
+        logger.warning("Listening on %s without a token: anyone who can reach it can read and change "
+                       "every record; set HMS_TOKEN or --token", host)
+    db.configure(db_path, instrumented=query_stats)
+    # Migrate before accepting requests
+    db.ensure_initialized()
+    server = ApiServer((host, port), workers, token)
+    logger.info("Serving %s on http://%s:%d", db_path, *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        db.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="hospital.db", help="database file")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to listen on")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=REQUEST_WORKERS, help="request threads")
+    parser.add_argument("--token", default=os.environ.get("HMS_TOKEN"),
+                        help="shared token required on every request (default: $HMS_TOKEN, "
+                             "which unlike the option is not visible in the process list)")
+    parser.add_argument("--query-stats", action="store_true", default=None,
+                        help="time every statement for /metrics (default: $HMS_QUERY_STATS)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    serve(args.db, args.host, args.port, args.workers, args.token, args.query_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from database.connection import db
+from database.models import (AppointmentConflictError, AppointmentModel, DoctorModel, PatientModel,
+                             entity_cache)
+
+
+class ConflictDetectionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db.configure(os.path.join(self.directory.name, "hospital.db"))
+        entity_cache.clear()
+        self.appointments = AppointmentModel()
+        doctors, patients = DoctorModel(), PatientModel()
+        self.doctor = doctors.create_doctor(("سارا", "کریمی", "قلب", "", "", "L-1", "", 0))
+        self.other_doctor = doctors.create_doctor(("علی", "احمدی", "اطفال", "", "", "L-2", "", 0))
+        self.patient = patients.create_patient(("محمد", "رضایی", "N-1", "1990-01-01", "", "", "", "", ""))
+        self.other_patient = patients.create_patient(("زهرا", "موسوی", "N-2", "1992-01-01", "", "", "", "", ""))
+        self.booked = self.appointments.create_appointment(
+            (self.patient, self.doctor, "2024-05-10", "10:00", "فعال", ""))
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def slot(self, time, patient=None, doctor=None, status="فعال", day="2024-05-10"):
+        return (patient or self.other_patient, doctor or self.doctor, day, time, status, "")
+
+    def test_overlapping_doctor_slot_is_refused(self):
+        with self.assertRaises(AppointmentConflictError) as caught:
+            self.appointments.create_appointment(self.slot("10:10"))
+        self.assertEqual(caught.exception.kind, "doctor")
+        self.assertEqual([row[0] for row in caught.exception.conflicts], [self.booked])
+
+    def test_overlapping_patient_slot_is_refused(self):
+        conflict = self.appointments.find_conflicts(self.slot("09:50", self.patient, self.other_doctor))
+        self.assertEqual(conflict[0], "patient")
+        with self.assertRaises(AppointmentConflictError):
+            self.appointments.create_appointment(self.slot("09:50", self.patient, self.other_doctor))
+
+    def test_adjacent_and_other_day_slots_are_free(self):
+        # Slots last APPOINTMENT_DURATION_MINUTES (15): back-to-back is allowed
+        for time in ("09:45", "10:15"):
+            self.assertIsNone(self.appointments.find_conflicts(self.slot(time)))
+        self.assertIsNone(self.appointments.find_conflicts(self.slot("10:00", day="2024-05-11")))
+        self.assertIsNone(self.appointments.find_conflicts(self.slot("10:00", doctor=self.other_doctor)))
+
+    def test_cancelled_appointments_free_their_slot(self):
+        self.assertIsNone(self.appointments.find_conflicts(self.slot("10:00", status="لغو شده")))
+        self.appointments.bulk_update_status("لغو شده", ids=[self.booked])
+        self.assertIsNotNone(self.appointments.create_appointment(self.slot("10:00")))
+
+    def test_an_update_does_not_conflict_with_itself(self):
+        self.appointments.update_appointment(
+            self.booked, (self.patient, self.doctor, "2024-05-10", "10:05", "فعال", "moved"))
+        other = self.appointments.create_appointment(self.slot("11:00"))
+        with self.assertRaises(AppointmentConflictError):
+            self.appointments.update_appointment(other, self.slot("10:10"))
+
+    def test_update_many_checks_rows_against_the_batch(self):
+        first = self.appointments.create_appointment(self.slot("12:00"))
+        second = self.appointments.create_appointment(self.slot("13:00", self.patient))
+        with self.assertRaises(AppointmentConflictError):
+            self.appointments.update_many([
+                (first, self.slot("14:00")),
+                (second, self.slot("14:05", self.patient)),
+            ])
+        # The whole batch was rolled back
+        self.assertEqual(self.appointments.get_appointment_by_id(first)[4], "12:00")
+
+    def test_check_can_be_skipped(self):
+        self.assertIsNotNone(self.appointments.create_appointment(self.slot("10:00"), check_conflicts=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from database.connection import db
+from database.models import (AppointmentModel, DoctorModel, PatientModel, ReferencedRecordError,
+                             entity_cache)
+
+
+def patient(number):
+    return ("بیمار", f"شماره{number}", f"N-{number}", "1990-01-01", "", "", "", "", "")
+
+
+class DeleteManyTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db.configure(os.path.join(self.directory.name, "hospital.db"))
+        entity_cache.clear()
+        self.patients = PatientModel()
+        self.doctors = DoctorModel()
+        self.appointments = AppointmentModel()
+        self.doctor_id = self.doctors.create_doctor(("سارا", "کریمی", "قلب", "", "", "L-1", "", 0))
+        self.patient_ids = [self.patients.create_patient(patient(number)) for number in range(3)]
+        # Two appointments for the first patient, one for the second, none for the third
+        self.appointment_ids = [
+            self.appointments.create_appointment((patient_id, self.doctor_id, day, "10:00", "فعال", ""))
+            for patient_id, day in ((self.patient_ids[0], "2024-01-01"), (self.patient_ids[0], "2024-01-02"),
+                                    (self.patient_ids[1], "2024-01-03"))
+        ]
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def count(self, table):
+        with db.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            return cursor.fetchone()[0]
+
+    def test_unreferenced_rows_are_deleted(self):
+        self.assertEqual(self.patients.delete_many([self.patient_ids[2], 999]), 1)
+        self.assertIsNone(self.patients.get_patient_by_id(self.patient_ids[2]))
+
+    def test_restrict_reports_references_and_deletes_nothing(self):
+        with self.assertRaises(ReferencedRecordError) as caught:
+            self.patients.delete_many(self.patient_ids, on_delete="restrict")
+        self.assertEqual(caught.exception.table, "patients")
+        self.assertEqual(caught.exception.references, {"appointments": 3})
+        self.assertEqual((self.count("patients"), self.count("appointments")), (3, 3))
+
+        with self.assertRaises(ReferencedRecordError) as caught:
+            self.doctors.delete_doctor(self.doctor_id)
+        self.assertEqual(caught.exception.references, {"appointments": 3})
+
+    def test_cascade_deletes_the_referencing_rows(self):
+        self.assertEqual(self.patients.delete_many(self.patient_ids[:1], on_delete="cascade"), 1)
+        self.assertEqual(self.count("patients"), 2)
+        remaining = [row[0] for row in self.appointments.get_many(self.appointment_ids)]
+        self.assertEqual(remaining, self.appointment_ids[2:])
+
+    def test_cascade_invalidates_cached_children(self):
+        for appointment_id in self.appointment_ids:
+            self.appointments.get_appointment_by_id(appointment_id)
+        self.patients.get_patient_by_id(self.patient_ids[1])
+
+        self.patients.delete_patient(self.patient_ids[1], on_delete="cascade")
+        self.assertIsNone(self.patients.get_patient_by_id(self.patient_ids[1]))
+        self.assertIsNone(self.appointments.get_appointment_by_id(self.appointment_ids[2]))
+        self.assertIsNotNone(self.appointments.get_appointment_by_id(self.appointment_ids[0]))
+
+    def test_model_default_mode(self):
+        cascading = PatientModel(on_delete="cascade")
+        cascading.delete_many(self.patient_ids)
+        self.assertEqual((self.count("patients"), self.count("appointments")), (0, 0))
+
+    def test_unknown_mode_is_refused(self):
+        with self.assertRaises(ValueError):
+            self.patients.delete_many(self.patient_ids, on_delete="set null")
+        with self.assertRaises(ValueError):
+            PatientModel(on_delete="ignore")
+        self.assertEqual(self.count("patients"), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from database.connection import db
+from database.models import EntityCache, PatientModel, entity_cache
+
+
+def patient(number, first_name="محمد"):
+    return (first_name, f"بیمار{number}", f"N-{number}", "1990-01-01", "", "", "", "", "")
+
+
+class EntityCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hospital.db")
+        db.configure(self.path)
+        entity_cache.clear()
+        # Check data_version on every lookup instead of every CACHE_SYNC_INTERVAL seconds
+        self.cache = EntityCache(maxsize=3, sync_interval=0)
+        self.patients = PatientModel(cache=self.cache)
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def test_second_read_is_a_hit(self):
+        patient_id = self.patients.create_patient(patient(1))
+        row = self.patients.get_patient_by_id(patient_id)
+        self.assertEqual(self.patients.get_patient_by_id(patient_id), row)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+
+    def test_update_and_delete_invalidate(self):
+        patient_id = self.patients.create_patient(patient(1))
+        self.patients.get_patient_by_id(patient_id)
+
+        self.patients.update_patient(patient_id, patient(1, "علی"))
+        self.assertEqual(self.patients.get_patient_by_id(patient_id)[1], "علی")
+
+        self.patients.delete_patient(patient_id)
+        self.assertIsNone(self.patients.get_patient_by_id(patient_id))
+
+    def test_write_from_another_connection_empties_the_cache(self):
+        patient_id = self.patients.create_patient(patient(1))
+        self.patients.get_patient_by_id(patient_id)
+
+        other = sqlite3.connect(self.path)
+        with other:
+            other.execute("UPDATE patients SET first_name = 'علی' WHERE id = ?", (patient_id,))
+        other.close()
+
+        self.assertEqual(self.patients.get_patient_by_id(patient_id)[1], "علی")
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_own_writes_do_not_empty_the_cache(self):
+        first = self.patients.create_patient(patient(1))
+        self.patients.get_patient_by_id(first)
+        # data_version only changes for commits made by other connections
+        self.patients.create_patient(patient(2))
+        self.patients.get_patient_by_id(first)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_row_read_before_an_invalidation_is_not_cached(self):
+        generation = self.cache.generation
+        self.cache.invalidate("patients", 1)
+        self.cache.put("patients", 1, ("stale",), generation)
+        self.assertIs(self.cache.get("patients", 1), EntityCache._MISSING)
+
+    def test_least_recently_used_row_is_evicted(self):
+        ids = [self.patients.create_patient(patient(number)) for number in range(4)]
+        for patient_id in ids[:3]:
+            self.patients.get_patient_by_id(patient_id)
+        self.patients.get_patient_by_id(ids[0])
+        self.patients.get_patient_by_id(ids[3])
+
+        stats = self.cache.stats()
+        self.assertEqual((stats["size"], stats["evictions"]), (3, 1))
+        self.assertIs(self.cache.get("patients", ids[1]), EntityCache._MISSING)
+        self.assertIsNot(self.cache.get("patients", ids[0]), EntityCache._MISSING)
+
+    def test_get_many_mixes_cached_and_read_rows(self):
+        ids = [self.patients.create_patient(patient(number)) for number in range(3)]
+        self.patients.get_patient_by_id(ids[1])
+        rows = self.patients.get_many([ids[2], ids[1], 999, ids[0]])
+        self.assertEqual([row[0] for row in rows], [ids[2], ids[1], ids[0]])
+        self.assertEqual(self.cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from datetime import date, timedelta
+
+import jdatetime
+
+from views.jalali import format_jalali, from_jalali, query_date, to_jalali
+
+
+class JalaliTest(unittest.TestCase):
+    def test_matches_jdatetime_day_by_day(self):
+        # Covers several leap years (1399, 1403) and every month boundary
+        day = date(2019, 3, 1)
+        while day < date(2026, 4, 1):
+            jalali = jdatetime.date.fromgregorian(date=day)
+            self.assertEqual(to_jalali(day), (jalali.year, jalali.month, jalali.day), day)
+            self.assertEqual(from_jalali(jalali.year, jalali.month, jalali.day), day)
+            day += timedelta(days=1)
+
+    def test_leap_year_end(self):
+        self.assertEqual(from_jalali(1403, 12, 30), date(2025, 3, 20))
+        with self.assertRaises(ValueError):
+            from_jalali(1402, 12, 30)
+        for month, day in ((13, 1), (7, 31), (1, 0)):
+            with self.assertRaises(ValueError):
+                from_jalali(1402, month, day)
+
+    def test_outside_the_table_falls_back_to_jdatetime(self):
+        day = date(1700, 6, 15)
+        jalali = jdatetime.date.fromgregorian(date=day)
+        self.assertEqual(to_jalali(day), (jalali.year, jalali.month, jalali.day))
+        self.assertEqual(from_jalali(jalali.year, jalali.month, jalali.day), day)
+
+    def test_format(self):
+        self.assertEqual(format_jalali("2024-03-20"), "1403/01/01")
+        self.assertEqual(format_jalali("2024-03-19 23:59:00"), "1402/12/29")
+        self.assertEqual(format_jalali(None), "")
+        self.assertEqual(format_jalali("نامشخص"), "نامشخص")
+
+    def test_query_date_reads_both_calendars(self):
+        self.assertEqual(query_date("۱۴۰۳/۰۱/۰۱"), "2024-03-20")
+        self.assertEqual(query_date("1402-12-29"), "2024-03-19")
+        self.assertEqual(query_date("2024/03/20"), "2024-03-20")
+        with self.assertRaises(ValueError):
+            query_date("1402/12/30")
+        with self.assertRaises(ValueError):
+            query_date("2024-02-30")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from database import migrations
+from database.migrations import MIGRATIONS, SCHEMA_VERSION, get_version, migrate
+
+
+# Schema created by the application before versioned migrations existed
+BASELINE_SCHEMA = '''
+CREATE TABLE patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    national_id TEXT UNIQUE NOT NULL,
+    birth_date DATE,
+    phone TEXT,
+    address TEXT,
+    emergency_contact TEXT,
+    blood_type TEXT,
+    allergies TEXT
+);
+CREATE TABLE doctors (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    specialty TEXT NOT NULL,
+    phone TEXT,
+    email TEXT,
+    license_number TEXT UNIQUE,
+    office_number TEXT,
+    consultation_fee REAL DEFAULT 0
+);
+CREATE TABLE appointments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    doctor_id INTEGER NOT NULL,
+    appointment_date DATE NOT NULL,
+    appointment_time TIME NOT NULL,
+    status TEXT DEFAULT 'فعال',
+    notes TEXT,
+    FOREIGN KEY (patient_id) REFERENCES patients (id),
+    FOREIGN KEY (doctor_id) REFERENCES doctors (id)
+);
+'''
+
+BASELINE_ROWS = '''
+INSERT INTO patients (first_name, last_name, national_id) VALUES ('محمد', 'رضایی', '0012345678');
+INSERT INTO doctors (first_name, last_name, specialty, license_number) VALUES ('سارا', 'کریمی', 'قلب', 'L-1');
+INSERT INTO appointments (patient_id, doctor_id, appointment_date, appointment_time, status)
+VALUES (1, 1, '2024-01-02', '10:30', 'فعال'), (1, 1, '2024-01-09', '11:00', 'لغو شده');
+'''
+
+
+class MigrationsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.directory.name, "hospital.db"))
+
+    def tearDown(self):
+        self.conn.close()
+        self.directory.cleanup()
+
+    def scalar(self, sql, params=()):
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def names(self, kind):
+        return {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = ?", (kind,))}
+
+    def test_versions_are_consecutive(self):
+        self.assertEqual([version for version, _, _ in MIGRATIONS], list(range(1, SCHEMA_VERSION + 1)))
+
+    def test_upgrades_a_baseline_database_keeping_its_rows(self):
+        self.conn.executescript(BASELINE_SCHEMA + BASELINE_ROWS)
+
+        self.assertEqual(migrate(self.conn), list(range(1, SCHEMA_VERSION + 1)))
+
+        self.assertEqual(get_version(self.conn.cursor()), SCHEMA_VERSION)
+        self.assertEqual(self.scalar("SELECT COUNT(*) FROM appointments"), 2)
+        # Minutes since 1970-01-01 of 2024-01-02 10:30
+        self.assertEqual(self.scalar("SELECT appointment_ts FROM appointments WHERE id = 1"), 28403190)
+        self.assertTrue({"idx_appointments_ts", "idx_appointments_status_ts",
+                         "idx_appointments_doctor_agenda",
+                         "idx_appointments_patient_date_time"} <= self.names("index"))
+        # Superseded indexes are dropped
+        self.assertFalse({"idx_appointments_date_time", "idx_appointments_patient_date",
+                          "idx_appointments_doctor_date_time"} & self.names("index"))
+        self.assertEqual(self.scalar("SELECT SUM(appointments) FROM doctor_daily_stats"), 2)
+        self.assertEqual(self.scalar("PRAGMA integrity_check"), "ok")
+
+    def test_existing_rows_are_full_text_indexed(self):
+        self.conn.executescript(BASELINE_SCHEMA + BASELINE_ROWS)
+        migrate(self.conn)
+        if "patients_fts" not in self.names("table"):
+            self.skipTest("SQLite built without FTS5 trigram")
+        self.assertEqual(self.scalar("SELECT rowid FROM patients_fts WHERE patients_fts MATCH ?", ('"رضایی"',)), 1)
+
+    def test_generated_timestamp_follows_the_date_and_time(self):
+        migrate(self.conn)
+        self.conn.executescript(BASELINE_ROWS)
+        self.conn.execute("UPDATE appointments SET appointment_time = '10:45' WHERE id = 1")
+        self.assertEqual(self.scalar("SELECT appointment_ts FROM appointments WHERE id = 1"), 28403205)
+
+    def test_migrating_again_applies_nothing(self):
+        self.assertEqual(len(migrate(self.conn)), SCHEMA_VERSION)
+        self.assertEqual(migrate(self.conn), [])
+
+    def test_failed_migration_rolls_back_and_keeps_the_version(self):
+        failing = MIGRATIONS + [(SCHEMA_VERSION + 1, "broken", [
+            "CREATE TABLE half_done (id INTEGER)",
+            "THIS IS NOT SQL",
+        ])]
+        migrate(self.conn)
+        with mock.patch.object(migrations, "MIGRATIONS", failing), \
+                mock.patch.object(migrations, "SCHEMA_VERSION", SCHEMA_VERSION + 1):
+            with self.assertRaises(sqlite3.OperationalError):
+                migrate(self.conn)
+        self.assertEqual(get_version(self.conn.cursor()), SCHEMA_VERSION)
+        self.assertNotIn("half_done", self.names("table"))
+
+    def test_refuses_an_old_sqlite(self):
+        with mock.patch.object(sqlite3, "sqlite_version_info", (3, 31, 1)):
+            with self.assertRaises(RuntimeError):
+                migrate(self.conn)
+        self.assertEqual(get_version(self.conn.cursor()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from database.connection import db
+from database.models import (AppointmentModel, DoctorModel, PatientModel, decode_cursor, encode_cursor,
+                             entity_cache)
+
+
+def patient(number):
+    return ("بیمار", f"شماره{number}", f"N-{number}", "1990-01-01", "", "", "", "", "")
+
+
+class KeysetPaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db.configure(os.path.join(self.directory.name, "hospital.db"))
+        entity_cache.clear()
+        self.patients = PatientModel()
+        self.doctors = DoctorModel()
+        self.appointments = AppointmentModel()
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor((28403190, 17))
+        self.assertEqual(decode_cursor(token), (28403190, 17))
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor(""))
+        with self.assertRaises(ValueError):
+            decode_cursor("not a cursor")
+
+    def test_pages_cover_every_patient_once_newest_first(self):
+        ids = [self.patients.create_patient(patient(number)) for number in range(10)]
+
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.patients.get_patients_page(cursor, limit=3)
+            self.assertLessEqual(len(rows), 3)
+            seen += [row[0] for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ids[::-1])
+        self.assertEqual([row[0] for row in self.patients.iter_patients(page_size=4)], ids[::-1])
+
+    def test_insert_between_pages_does_not_shift_the_next_page(self):
+        ids = [self.patients.create_patient(patient(number)) for number in range(6)]
+        first, cursor = self.patients.get_patients_page(limit=3)
+        self.patients.create_patient(patient("new"))
+        second, cursor = self.patients.get_patients_page(cursor, limit=3)
+
+        self.assertEqual([row[0] for row in first], ids[:2:-1])
+        self.assertEqual([row[0] for row in second], ids[2::-1])
+        self.assertIsNone(cursor)
+
+    def test_exact_multiple_of_the_page_size_has_no_empty_last_page(self):
+        for number in range(4):
+            self.patients.create_patient(patient(number))
+        rows, cursor = self.patients.get_patients_page(limit=2)
+        rows, cursor = self.patients.get_patients_page(cursor, limit=2)
+        self.assertEqual(len(rows), 2)
+        self.assertIsNone(cursor)
+
+    def test_appointments_page_by_time_then_id(self):
+        doctor_id = self.doctors.create_doctor(("سارا", "کریمی", "قلب", "", "", "L-1", "", 0))
+        patient_ids = [self.patients.create_patient(patient(number)) for number in range(6)]
+        slots = [("2024-01-02", "10:00"), ("2024-01-01", "09:00"), ("2024-01-02", "10:00"),
+                 ("2024-01-03", "08:00"), ("2024-01-02", "10:00"), ("2024-01-01", "11:30")]
+        created = [self.appointments.create_appointment((patient_id, doctor_id, day, time, "فعال", ""),
+                                                        check_conflicts=False)
+                   for patient_id, (day, time) in zip(patient_ids, slots)]
+
+        expected = sorted(created, key=lambda appointment_id: (slots[created.index(appointment_id)],
+                                                               appointment_id), reverse=True)
+        seen = [row[0] for row in self.appointments.iter_appointments(page_size=2)]
+        self.assertEqual(seen, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import random
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from database.connection import db
+from database.models import AppointmentModel, DoctorModel, PatientModel, entity_cache
+from database.reports import ReportModel
+
+
+STATUSES = ("فعال", "انجام شده", "لغو شده", "به تعویق افتاده")
+
+DAILY_FROM_APPOINTMENTS = '''
+    SELECT doctor_id, appointment_date, status, COUNT(*) FROM appointments
+    GROUP BY doctor_id, appointment_date, status ORDER BY 1, 2, 3
+'''
+MONTHLY_FROM_APPOINTMENTS = '''
+    SELECT doctor_id, substr(appointment_date, 1, 7), status, COUNT(*) FROM appointments
+    GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+'''
+
+
+class ReportStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db.configure(os.path.join(self.directory.name, "hospital.db"))
+        entity_cache.clear()
+        self.appointments = AppointmentModel()
+        self.reports = ReportModel()
+        doctors, patients = DoctorModel(), PatientModel()
+        self.doctor_ids = [doctors.create_doctor(("پزشک", str(number), "عمومی", "", "", f"L-{number}", "",
+                                                  100 * (number + 1)))
+                           for number in range(3)]
+        self.patient_id = patients.create_patient(("محمد", "رضایی", "N-1", "1990-01-01", "", "", "", "", ""))
+
+        rng = random.Random(7)
+        self.ids = []
+        for _ in range(300):
+            day = date(2024, 1, 1) + timedelta(days=rng.randrange(120))
+            self.ids.append(self.appointments.create_appointment(
+                (self.patient_id, rng.choice(self.doctor_ids), day.isoformat(), "10:00",
+                 rng.choice(STATUSES), ""), check_conflicts=False))
+        self.rng = rng
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def fetch(self, sql, params=()):
+        with db.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def assertStatsMatchAppointments(self):
+        self.assertEqual(self.fetch("SELECT doctor_id, day, status, appointments FROM doctor_daily_stats "
+                                    "ORDER BY 1, 2, 3"), self.fetch(DAILY_FROM_APPOINTMENTS))
+        self.assertEqual(self.fetch("SELECT doctor_id, month, status, appointments FROM doctor_monthly_stats "
+                                    "ORDER BY 1, 2, 3"), self.fetch(MONTHLY_FROM_APPOINTMENTS))
+
+    def test_inserts_are_counted(self):
+        self.assertStatsMatchAppointments()
+
+    def test_updates_move_the_counts(self):
+        rng = self.rng
+        for appointment_id in rng.sample(self.ids, 60):
+            day = date(2024, 1, 1) + timedelta(days=rng.randrange(150))
+            self.appointments.update_appointment(
+                appointment_id, (self.patient_id, rng.choice(self.doctor_ids), day.isoformat(), "11:00",
+                                 rng.choice(STATUSES), "moved"), check_conflicts=False)
+        self.appointments.bulk_update_status("لغو شده", doctor_id=self.doctor_ids[0],
+                                             date_from="2024-02-01", date_to="2024-02-29")
+        self.assertStatsMatchAppointments()
+
+    def test_deletes_remove_empty_rows(self):
+        for appointment_id in self.ids[::2]:
+            self.appointments.delete_appointment(appointment_id)
+        self.assertStatsMatchAppointments()
+        self.assertEqual(self.fetch("SELECT COUNT(*) FROM doctor_daily_stats WHERE appointments <= 0"), [(0,)])
+
+    def test_rebuild_gives_the_same_summaries(self):
+        daily = self.fetch("SELECT * FROM doctor_daily_stats ORDER BY 1, 2, 3")
+        self.reports.rebuild_stats()
+        self.assertEqual(self.fetch("SELECT * FROM doctor_daily_stats ORDER BY 1, 2, 3"), daily)
+        self.assertStatsMatchAppointments()
+
+    def test_doctor_summary_matches_a_group_by(self):
+        # Starts and ends mid-month, so both the daily and the monthly rows are read
+        date_from, date_to, today = "2024-01-15", "2024-04-10", "2024-03-05"
+        expected = self.fetch('''
+            SELECT doctor_id, COUNT(*),
+                   SUM(status = 'انجام شده'), SUM(status = 'لغو شده'), SUM(status = 'به تعویق افتاده'),
+                   SUM(status = 'فعال' AND appointment_date < ?)
+            FROM appointments WHERE appointment_date BETWEEN ? AND ?
+            GROUP BY doctor_id ORDER BY doctor_id
+        ''', (today, date_from, date_to))
+
+        rows = self.reports.doctor_summary(date_from, date_to, today)
+        self.assertEqual(sorted(tuple(row[i] for i in (0, 3, 4, 5, 6, 7)) for row in rows), expected)
+        fees = {doctor_id: 100 * (number + 1) for number, doctor_id in enumerate(self.doctor_ids)}
+        for row in rows:
+            self.assertEqual(row[10], row[4] * fees[row[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
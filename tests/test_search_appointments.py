@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from database import models
+from database.connection import db
+from database.models import AppointmentModel, DoctorModel, PatientModel, entity_cache
+
+
+class SearchAppointmentsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        db.configure(os.path.join(self.directory.name, "hospital.db"))
+        entity_cache.clear()
+        self.patients = PatientModel()
+        self.doctors = DoctorModel()
+        self.appointments = AppointmentModel()
+
+    def tearDown(self):
+        db.close_all()
+        entity_cache.clear()
+        self.directory.cleanup()
+
+    def test_finds_the_appointments_of_every_matching_patient(self):
+        doctor_id = self.doctors.create_doctor(("سارا", "کریمی", "قلب", "", "", "L-1", "", 0))
+        expected = []
+        # More matching patients than the old per-term owner limit (20)
+        for number in range(30):
+            patient_id = self.patients.create_patient(
+                ("محمد", f"بیمار{number}", f"N-{number}", "1990-01-01", "", "", "", "", ""))
+            expected.append(self.appointments.create_appointment(
+                (patient_id, doctor_id, f"2024-01-{number + 1:02d}", "10:00", "فعال", "")))
+        other_id = self.patients.create_patient(("علی", "رضایی", "N-other", "1990-01-01", "", "", "", "", ""))
+        self.appointments.create_appointment((other_id, doctor_id, "2024-02-01", "10:00", "فعال", ""))
+
+        rows = self.appointments.search_appointments("محمد")
+        self.assertEqual([row[0] for row in rows], expected[::-1])
+
+        rows = self.appointments.search_appointments("محمد", limit=5)
+        self.assertEqual([row[0] for row in rows], expected[:-6:-1])
+
+    def test_common_term_filters_by_name_newest_first(self):
+        doctor_id = self.doctors.create_doctor(("محمد", "کریمی", "قلب", "", "", "L-1", "", 0))
+        other_doctor_id = self.doctors.create_doctor(("سارا", "احمدی", "قلب", "", "", "L-2", "", 0))
+        expected = []
+        for number in range(12):
+            first_name = "محمد" if number % 2 else "علی"
+            patient_id = self.patients.create_patient(
+                (first_name, f"بیمار{number}", f"N-{number}", "1990-01-01", "", "", "", "", ""))
+            # The matching doctor's appointments come in through the doctor
+            appointment_doctor = doctor_id if number % 3 == 0 else other_doctor_id
+            appointment_id = self.appointments.create_appointment(
+                (patient_id, appointment_doctor, f"2024-03-{number + 1:02d}", "09:00", "لغو شده", ""))
+            if first_name == "محمد" or appointment_doctor == doctor_id:
+                expected.append(appointment_id)
+
+        exact = self.appointments.search_appointments("محمد")
+        self.assertEqual([row[0] for row in exact], expected[::-1])
+
+        # More matching patients than the limit: no ids are collected
+        with mock.patch.object(models, "OWNER_MATCH_LIMIT", 3):
+            rows = self.appointments.search_appointments("محمد")
+            self.assertEqual(rows, exact)
+            rows = self.appointments.search_appointments("محمد", limit=4)
+            self.assertEqual([row[0] for row in rows], expected[:-5:-1])
+            rows = self.appointments.search_appointments("محمد", date_from="2024-03-05", date_to="2024-03-09")
+            self.assertEqual([row[0] for row in rows],
+                             [row[0] for row in exact if "2024-03-05" <= row[3] <= "2024-03-09"])
+
+
+if __name__ == "__main__":
+    unittest.main()
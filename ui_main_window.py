@@ -40,6 +40,14 @@ class Ui_MainWindow(object):
         self.btn_appointments.setStyleSheet("QPushButton { background-color: #e74c3c; color: white; padding: 15px; font-size: 14px; border-radius: 5px; }")
         self.btn_appointments.setObjectName("btn_appointments")
         self.nav_layout.addWidget(self.btn_appointments)
+        self.btn_agenda = QtWidgets.QPushButton(self.centralwidget)
+        self.btn_agenda.setStyleSheet("QPushButton { background-color: #9b59b6; color: white; padding: 15px; font-size: 14px; border-radius: 5px; }")
+        self.btn_agenda.setObjectName("btn_agenda")
+        self.nav_layout.addWidget(self.btn_agenda)
+        self.btn_reports = QtWidgets.QPushButton(self.centralwidget)
+        self.btn_reports.setStyleSheet("QPushButton { background-color: #16a085; color: white; padding: 15px; font-size: 14px; border-radius: 5px; }")
+        self.btn_reports.setObjectName("btn_reports")
+        self.nav_layout.addWidget(self.btn_reports)
         self.verticalLayout.addLayout(self.nav_layout)
         self.search_layout = QtWidgets.QHBoxLayout()
         self.search_layout.setObjectName("search_layout")
@@ -50,13 +58,15 @@ class Ui_MainWindow(object):
         self.btn_search.setStyleSheet("QPushButton { background-color: #95a5a6; color: white; padding: 8px; }")
         self.btn_search.setObjectName("btn_search")
         self.search_layout.addWidget(self.btn_search)
+        self.btn_refresh = QtWidgets.QPushButton(self.centralwidget)
+        self.btn_refresh.setStyleSheet("QPushButton { background-color: #7f8c8d; color: white; padding: 8px; }")
+        self.btn_refresh.setObjectName("btn_refresh")
+        self.search_layout.addWidget(self.btn_refresh)
         self.verticalLayout.addLayout(self.search_layout)
-        self.table = QtWidgets.QTableWidget(self.centralwidget)
+        self.table = QtWidgets.QTableView(self.centralwidget)
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setObjectName("table")
-        self.table.setColumnCount(0)
-        self.table.setRowCount(0)
         self.verticalLayout.addWidget(self.table)
         self.operation_layout = QtWidgets.QHBoxLayout()
         self.operation_layout.setObjectName("operation_layout")
@@ -72,6 +82,10 @@ class Ui_MainWindow(object):
         self.btn_delete.setStyleSheet("QPushButton { background-color: #e74c3c; color: white; padding: 10px; font-size: 12px; border-radius: 3px; }")
         self.btn_delete.setObjectName("btn_delete")
         self.operation_layout.addWidget(self.btn_delete)
+        self.btn_bulk_status = QtWidgets.QPushButton(self.centralwidget)
+        self.btn_bulk_status.setStyleSheet("QPushButton { background-color: #34495e; color: white; padding: 10px; font-size: 12px; border-radius: 3px; }")
+        self.btn_bulk_status.setObjectName("btn_bulk_status")
+        self.operation_layout.addWidget(self.btn_bulk_status)
         self.verticalLayout.addLayout(self.operation_layout)
         MainWindow.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(MainWindow)
@@ -93,11 +107,15 @@ class Ui_MainWindow(object):
         self.btn_patients.setText(_translate("MainWindow", "مدیریت بیماران"))
         self.btn_doctors.setText(_translate("MainWindow", "مدیریت پزشکان"))
         self.btn_appointments.setText(_translate("MainWindow", "مدیریت نوبت‌ها"))
+        self.btn_agenda.setText(_translate("MainWindow", "تقویم پزشکان"))
+        self.btn_reports.setText(_translate("MainWindow", "گزارش‌ها"))
         self.search_input.setPlaceholderText(_translate("MainWindow", "جستجو..."))
         self.btn_search.setText(_translate("MainWindow", "جستجو"))
+        self.btn_refresh.setText(_translate("MainWindow", "بارگذاری مجدد"))
         self.btn_add.setText(_translate("MainWindow", "افزودن"))
         self.btn_edit.setText(_translate("MainWindow", "ویرایش"))
         self.btn_delete.setText(_translate("MainWindow", "حذف"))
+        self.btn_bulk_status.setText(_translate("MainWindow", "تغییر وضعیت گروهی"))
 
 
 if __name__ == "__main__":
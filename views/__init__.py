@@ -0,0 +1,6 @@
+from .table_model import RecordTableModel
+from .query_runner import QueryRunner
+from .agenda_view import DoctorAgendaView
+from .reports_view import ReportsView
+
+__all__ = ['RecordTableModel', 'QueryRunner', 'DoctorAgendaView', 'ReportsView']
@@ -0,0 +1,208 @@
+from datetime import date, timedelta
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QVariant, pyqtSignal
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (QHBoxLayout, QHeaderView, QLabel, QMessageBox, QPushButton, QTableView,
+                             QVBoxLayout, QWidget)
+
+from database.models import APPOINTMENT_DURATION_MINUTES
+from dialogs.record_picker import RecordPicker
+from .jalali import format_jalali
+
+
+WEEKDAY_NAMES = ["شنبه", "یکشنبه", "دوشنبه", "سه‌شنبه", "چهارشنبه", "پنجشنبه", "جمعه"]
+
+# Working hours always shown; earlier or later appointments extend the grid
+DAY_START_MINUTES = 8 * 60
+DAY_END_MINUTES = 20 * 60
+
+STATUS_COLORS = {
+    "فعال": "#d6eaf8",
+    "انجام شده": "#d5f5e3",
+    "لغو شده": "#f5b7b1",
+    "به تعویق افتاده": "#fdebd0",
+}
+
+
+def week_start(day):
+    """Saturday starting the (Iranian) week that contains day"""
+    return day - timedelta(days=(day.weekday() - 5) % 7)
+
+
+def _minutes(appointment_time):
+    hours, minutes = appointment_time.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+class WeekAgendaModel(QAbstractTableModel):
+    """One doctor-week: a column per day and a row per appointment slot.
+
+    Built from get_doctor_agenda rows; a cell holds every appointment
+    starting within its slot.
+    """
+
+    def __init__(self, slot_minutes=APPOINTMENT_DURATION_MINUTES, parent=None):
+        super().__init__(parent)
+        self.slot_minutes = slot_minutes
+        self._start = week_start(date.today())
+        self._slots = []
+        self._cells = {}
+        self._build([])
+
+    def set_week(self, start, rows):
+        """Show the week starting at start with its agenda rows"""
+        self.beginResetModel()
+        self._start = start
+        self._build(rows)
+        self.endResetModel()
+
+    def _build(self, rows):
+        self._cells = {}
+        first, last = DAY_START_MINUTES, DAY_END_MINUTES - self.slot_minutes
+        for row in rows:
+            day = (date.fromisoformat(row[1]) - self._start).days
+            slot = _minutes(row[2]) // self.slot_minutes * self.slot_minutes
+            self._cells.setdefault((slot, day), []).append(row)
+            first, last = min(first, slot), max(last, slot)
+        self._slots = list(range(first, last + 1, self.slot_minutes))
+
+    def day(self, column):
+        return self._start + timedelta(days=column)
+
+    def appointments(self, index):
+        """Agenda rows of a cell"""
+        if not index.isValid():
+            return []
+        return self._cells.get((self._slots[index.row()], index.column()), [])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._slots)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(WEEKDAY_NAMES)
+
+    def data(self, index, role=Qt.DisplayRole):
+        rows = self.appointments(index)
+        if not rows:
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            return "\n".join(f"{row[2]} {row[5]}" for row in rows)
+        if role == Qt.ToolTipRole:
+            return "\n".join(f"{row[2]} - {row[5]} ({row[3]})" for row in rows)
+        if role == Qt.BackgroundRole:
+            return QColor(STATUS_COLORS.get(rows[0][3], "#ffffff"))
+        if role == Qt.UserRole:
+            return rows[0][0]
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal and section < len(WEEKDAY_NAMES):
+            return f"{WEEKDAY_NAMES[section]}\n{format_jalali(self.day(section).isoformat())}"
+        if orientation == Qt.Vertical and section < len(self._slots):
+            slot = self._slots[section]
+            return f"{slot // 60:02d}:{slot % 60:02d}"
+        return QVariant()
+
+
+class DoctorAgendaView(QWidget):
+    """Weekly calendar of one doctor's appointments.
+
+    Only the shown doctor-week is queried (get_doctor_agenda, served from
+    a covering index) and the query runs on the QueryRunner, so moving
+    between weeks does not block the window.
+    """
+
+    appointmentActivated = pyqtSignal(int)
+
+    def __init__(self, query_runner, appointment_model, doctor_model, parent=None):
+        super().__init__(parent)
+        self.query_runner = query_runner
+        self.appointment_model = appointment_model
+        self.doctor_model = doctor_model
+        self.week = week_start(date.today())
+
+        self.doctor_picker = RecordPicker(doctor_model.search_doctors, self.format_doctor,
+                                          "نام یا تخصص پزشک را تایپ کنید...",
+                                          query_runner=query_runner)
+        self.btn_previous = QPushButton("هفته قبل")
+        self.btn_today = QPushButton("هفته جاری")
+        self.btn_next = QPushButton("هفته بعد")
+        self.week_label = QLabel()
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(self.doctor_picker, 1)
+        toolbar.addWidget(self.btn_previous)
+        toolbar.addWidget(self.btn_today)
+        toolbar.addWidget(self.btn_next)
+        toolbar.addWidget(self.week_label)
+
+        self.agenda_model = WeekAgendaModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.agenda_model)
+        self.table.setWordWrap(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(toolbar)
+        layout.addWidget(self.table)
+
+        self.doctor_picker.currentIndexChanged.connect(lambda _index: self.reload())
+        self.btn_previous.clicked.connect(lambda: self.show_week(self.week - timedelta(weeks=1)))
+        self.btn_today.clicked.connect(lambda: self.show_week(week_start(date.today())))
+        self.btn_next.clicked.connect(lambda: self.show_week(self.week + timedelta(weeks=1)))
+        self.table.doubleClicked.connect(self.on_double_clicked)
+
+        self.update_week_label()
+
+    def format_doctor(self, doctor):
+        return f"دکتر {doctor[1]} {doctor[2]} - {doctor[3]}"
+
+    def set_doctor(self, doctor):
+        """Show the agenda of a doctor row"""
+        self.doctor_picker.set_record(doctor)
+
+    def show_doctor(self, doctor_id):
+        """Load a doctor in the background and show their agenda"""
+        self.query_runner.submit("agenda:doctor", self.doctor_model.get_doctor_by_id, doctor_id,
+                                 on_result=self.set_doctor, on_error=self.on_error)
+
+    def show_week(self, start):
+        self.week = start
+        self.update_week_label()
+        self.reload()
+
+    def update_week_label(self):
+        end = self.week + timedelta(days=6)
+        self.week_label.setText(f"{format_jalali(self.week.isoformat())} تا {format_jalali(end.isoformat())}")
+
+    def reload(self):
+        """Query the shown doctor-week in the background"""
+        doctor_id = self.doctor_picker.currentData()
+        start = self.week
+        if doctor_id is None:
+            self.query_runner.cancel("agenda")
+            self.agenda_model.set_week(start, [])
+            return
+
+        end = start + timedelta(days=6)
+        self.query_runner.submit("agenda", self.appointment_model.get_doctor_agenda,
+                                 doctor_id, start.isoformat(), end.isoformat(),
+                                 on_result=lambda rows: self.agenda_model.set_week(start, rows),
+                                 on_error=self.on_error)
+
+    def on_error(self, message):
+        QMessageBox.critical(self, "خطا", f"خطا در بارگذاری تقویم: {message}")
+
+    def on_double_clicked(self, index):
+        appointment_id = self.agenda_model.data(index, Qt.UserRole)
+        if appointment_id is not None:
+            self.appointmentActivated.emit(appointment_id)
@@ -0,0 +1,101 @@
+"""Jalali (Persian calendar) display of the Gregorian dates stored in the database.
+
+Dates stay Gregorian yyyy-MM-dd in the database; they are converted only
+for display and when a Jalali date is typed into a search. Conversion
+uses a table of the day numbers (date.toordinal) on which each Jalali
+year starts, built once from jdatetime, so a date is one bisect plus a
+little arithmetic. Formatted texts are memoized, since a grid repeats
+the same few hundred dates across many rows.
+"""
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+
+
+# Jalali years covered by the lookup table; dates outside it go through jdatetime
+FIRST_YEAR = 1200
+LAST_YEAR = 1600
+
+# Days in Farvardin..Shahrivar (31 each) before Mehr
+FIRST_HALF_DAYS = 6 * 31
+
+# Typed years below this are Jalali, the others Gregorian
+JALALI_YEAR_LIMIT = 1700
+
+PERSIAN_DIGITS = str.maketrans("۰۱۲۳۴۵۶۷۸۹٠١٢٣٤٥٦٧٨٩", "01234567890123456789")
+
+
+@lru_cache(maxsize=None)
+def _year_starts():
+    """Day number of 1 Farvardin of FIRST_YEAR..LAST_YEAR + 1"""
+    import jdatetime
+    return [jdatetime.date(year, 1, 1).togregorian().toordinal()
+            for year in range(FIRST_YEAR, LAST_YEAR + 2)]
+
+
+def to_jalali(day):
+    """(year, month, day) in the Jalali calendar of a datetime.date"""
+    ordinal = day.toordinal()
+    starts = _year_starts()
+    index = bisect_right(starts, ordinal) - 1
+    if index < 0 or index >= len(starts) - 1:
+        import jdatetime
+        jalali = jdatetime.date.fromgregorian(date=day)
+        return jalali.year, jalali.month, jalali.day
+
+    day_of_year = ordinal - starts[index]
+    if day_of_year < FIRST_HALF_DAYS:
+        month, day_of_month = divmod(day_of_year, 31)
+    else:
+        month, day_of_month = divmod(day_of_year - FIRST_HALF_DAYS, 30)
+        month += 6
+    return FIRST_YEAR + index, month + 1, day_of_month + 1
+
+
+def from_jalali(year, month, day):
+    """datetime.date of a Jalali date; ValueError if it does not exist"""
+    if not FIRST_YEAR <= year <= LAST_YEAR:
+        import jdatetime
+        return jdatetime.date(year, month, day).togregorian()
+
+    starts = _year_starts()
+    start = starts[year - FIRST_YEAR]
+    year_length = starts[year - FIRST_YEAR + 1] - start
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid Jalali month: {month}")
+    if month <= 6:
+        offset, length = (month - 1) * 31, 31
+    else:
+        offset, length = FIRST_HALF_DAYS + (month - 7) * 30, 30
+    if month == 12:
+        length = year_length - offset
+    if not 1 <= day <= length:
+        raise ValueError(f"Invalid day for Jalali month {year}/{month}: {day}")
+    return date.fromordinal(start + offset + day - 1)
+
+
+@lru_cache(maxsize=8192)
+def format_jalali(value):
+    """yyyy/MM/dd Jalali text of a stored yyyy-MM-dd date; other values are returned as text"""
+    try:
+        year, month, day = to_jalali(date.fromisoformat(value[:10]))
+    except (TypeError, ValueError):
+        return "" if value is None else str(value)
+    return f"{year:04d}/{month:02d}/{day:02d}"
+
+
+def normalize_digits(text):
+    """Replace Persian and Arabic-Indic digits with ASCII digits"""
+    return text.translate(PERSIAN_DIGITS)
+
+
+def query_date(text):
+    """Gregorian yyyy-MM-dd of a typed date (yyyy/MM/dd or yyyy-MM-dd).
+
+    Years before JALALI_YEAR_LIMIT are read as Jalali, so both calendars
+    can be typed into a search; ValueError for a date that does not exist.
+    """
+    year, month, day = (int(part) for part in normalize_digits(text).replace("/", "-").split("-"))
+    if year < JALALI_YEAR_LIMIT:
+        return from_jalali(year, month, day).isoformat()
+    return date(year, month, day).isoformat()
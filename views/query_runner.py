@@ -0,0 +1,113 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class _QueryTask(QRunnable):
+    def __init__(self, ticket, func, args, signals):
+        super().__init__()
+        self.ticket = ticket
+        self.func = func
+        self.args = args
+        # The runner owns the task until its result has been delivered
+        self.setAutoDelete(False)
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.ticket, str(e))
+        else:
+            self.signals.finished.emit(self.ticket, result)
+
+
+class QueryRunner(QObject):
+    """Run model calls on a thread pool and deliver results on the GUI thread.
+
+    Every request belongs to a channel (e.g. "grid"). Submitting a new
+    request on a channel supersedes the pending one: when the older
+    request finishes its result is dropped instead of being delivered.
+    Each pool thread uses its own SQLite connection through the
+    per-thread connection manager.
+    """
+
+    busyChanged = pyqtSignal(bool)
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        # Keep threads (and their SQLite connections) alive between queries
+        self.pool.setExpiryTimeout(-1)
+
+        # Shared by every task. Created on the GUI thread, so emits from the
+        # pool are queued back to it, and parented after the pool: children
+        # are destroyed in order, and the pool waits for running tasks first.
+        self._signals = _TaskSignals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+
+        self._next_ticket = 0
+        self._latest = {}    # channel -> newest ticket
+        self._pending = {}   # ticket -> (channel, on_result, on_error, task)
+
+    def submit(self, channel, func, *args, on_result=None, on_error=None):
+        """Run func(*args) in the pool; return the request ticket"""
+        self._next_ticket += 1
+        ticket = self._next_ticket
+        self._latest[channel] = ticket
+        task = _QueryTask(ticket, func, args, self._signals)
+        # Hold a reference until delivery; the pool does not own the task
+        self._pending[ticket] = (channel, on_result, on_error, task)
+        self.pool.start(task)
+
+        if len(self._pending) == 1:
+            self.busyChanged.emit(True)
+        return ticket
+
+    def cancel(self, channel):
+        """Drop the result of the pending request on a channel"""
+        self._latest.pop(channel, None)
+
+    def is_busy(self):
+        return bool(self._pending)
+
+    def wait_for_done(self, msecs=-1):
+        """Block until the pool is idle (used by benchmarks and shutdown)"""
+        return self.pool.waitForDone(msecs)
+
+    def shutdown(self):
+        """Drop every pending result and wait for the running queries.
+
+        Called before the window closes, so no pool thread is left emitting
+        through a signals object that is being destroyed.
+        """
+        self._latest.clear()
+        # Queries that have not started yet are never run
+        self.pool.clear()
+        self.wait_for_done()
+
+    def _take(self, ticket):
+        channel, on_result, on_error, _ = self._pending.pop(ticket)
+        if not self._pending:
+            self.busyChanged.emit(False)
+        if self._latest.get(channel) != ticket:
+            return None, None
+        del self._latest[channel]
+        return on_result, on_error
+
+    @pyqtSlot(int, object)
+    def _on_finished(self, ticket, result):
+        on_result, _ = self._take(ticket)
+        if on_result is not None:
+            on_result(result)
+
+    @pyqtSlot(int, str)
+    def _on_failed(self, ticket, message):
+        _, on_error = self._take(ticket)
+        if on_error is not None:
+            on_error(message)
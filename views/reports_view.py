@@ -0,0 +1,132 @@
+from datetime import date
+
+from PyQt5.QtCore import QCalendar, QDate
+from PyQt5.QtWidgets import (QComboBox, QDateEdit, QFileDialog, QHBoxLayout, QHeaderView, QLabel,
+                             QMessageBox, QPushButton, QTableView, QVBoxLayout, QWidget)
+
+from database.exporter import write_csv
+from database.reports import ReportModel
+from .jalali import format_jalali
+from .table_model import RecordTableModel
+
+
+def format_amount(value):
+    return f"{value:,.0f}"
+
+
+# (title, ReportModel method, headers, column formatters)
+REPORT_TYPES = [
+    ("خلاصه پزشکان", "doctor_summary",
+     ("شناسه", "پزشک", "تخصص", "نوبت‌ها", "انجام شده", "لغو شده", "به تعویق افتاده",
+      "عدم مراجعه", "درصد لغو", "درصد عدم مراجعه", "درآمد"),
+     {10: format_amount}),
+    ("روزانه پزشکان", "doctor_daily",
+     ("تاریخ", "شناسه", "پزشک", "نوبت‌ها", "انجام شده", "لغو شده", "به تعویق افتاده", "درآمد"),
+     {0: format_jalali, 7: format_amount}),
+    ("وضعیت نوبت‌ها", "status_summary",
+     ("وضعیت", "نوبت‌ها", "درصد"),
+     {}),
+]
+
+
+class ReportsView(QWidget):
+    """Doctor utilization, status and revenue reports over a date range.
+
+    Reports are read from the summary tables (database.reports), on the
+    QueryRunner so a long range does not block the window, and can be
+    saved as CSV.
+    """
+
+    def __init__(self, query_runner, parent=None):
+        super().__init__(parent)
+        self.query_runner = query_runner
+        self.report_model = ReportModel()
+        self.rows = []
+
+        self.report_type = QComboBox()
+        for title, *_ in REPORT_TYPES:
+            self.report_type.addItem(title)
+
+        today = QDate.currentDate()
+        self.date_from = self.create_date_edit(today.addYears(-1).addDays(1))
+        self.date_to = self.create_date_edit(today)
+
+        self.btn_run = QPushButton("نمایش گزارش")
+        self.btn_export = QPushButton("خروجی CSV")
+        self.btn_export.setEnabled(False)
+        self.summary_label = QLabel()
+
+        toolbar = QHBoxLayout()
+        toolbar.addWidget(self.report_type)
+        toolbar.addWidget(QLabel("از:"))
+        toolbar.addWidget(self.date_from)
+        toolbar.addWidget(QLabel("تا:"))
+        toolbar.addWidget(self.date_to)
+        toolbar.addWidget(self.btn_run)
+        toolbar.addWidget(self.btn_export)
+        toolbar.addWidget(self.summary_label, 1)
+
+        self.table_model = RecordTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setAlternatingRowColors(True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(toolbar)
+        layout.addWidget(self.table)
+
+        self.report_type.currentIndexChanged.connect(lambda _index: self.reload())
+        self.btn_run.clicked.connect(self.reload)
+        self.btn_export.clicked.connect(self.export_csv)
+
+    def create_date_edit(self, value):
+        date_edit = QDateEdit()
+        date_edit.setDate(value)
+        date_edit.setCalendarPopup(True)
+        # Shown and picked in the Jalali calendar; date() stays a Gregorian QDate
+        date_edit.setCalendar(QCalendar(QCalendar.System.Jalali))
+        date_edit.setDisplayFormat("yyyy/MM/dd")
+        return date_edit
+
+    def current_report(self):
+        return REPORT_TYPES[self.report_type.currentIndex()]
+
+    def reload(self):
+        """Run the selected report for the selected range in the background"""
+        title, method, headers, formatters = self.current_report()
+        date_from = self.date_from.date().toString("yyyy-MM-dd")
+        date_to = self.date_to.date().toString("yyyy-MM-dd")
+        self.rows = []
+        self.btn_export.setEnabled(False)
+        self.table_model.set_source(headers, [], formatters=formatters)
+        self.summary_label.setText("در حال بارگذاری...")
+        self.query_runner.submit("reports", getattr(self.report_model, method), date_from, date_to,
+                                 on_result=self.on_result, on_error=self.on_error)
+
+    def on_result(self, rows):
+        title, method, headers, formatters = self.current_report()
+        self.rows = rows
+        self.table_model.set_source(headers, rows, formatters=formatters)
+        self.btn_export.setEnabled(bool(rows))
+        self.summary_label.setText(f"{len(rows)} ردیف")
+
+    def on_error(self, message):
+        self.summary_label.clear()
+        QMessageBox.critical(self, "خطا", f"خطا در تهیه گزارش: {message}")
+
+    def export_csv(self):
+        title, method, headers, formatters = self.current_report()
+        default_name = f"{method}-{date.today().isoformat()}.csv"
+        path, _ = QFileDialog.getSaveFileName(self, "ذخیره گزارش", default_name, "CSV (*.csv)")
+        if not path:
+            return
+
+        try:
+            # utf-8-sig so spreadsheet programs detect the Persian text correctly
+            with open(path, "w", newline="", encoding="utf-8-sig") as file:
+                count = write_csv(self.rows, headers, file)
+            QMessageBox.information(self, "موفقیت", f"گزارش با موفقیت ذخیره شد ({count} ردیف).")
+        except Exception as e:
+            QMessageBox.critical(self, "خطا", f"خطا در ذخیره گزارش: {str(e)}")
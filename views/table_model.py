@@ -0,0 +1,176 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QVariant, pyqtSignal
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Read-only table model over query result rows.
+
+    Rows arrive one page at a time: when the view scrolls near the end,
+    fetchMore emits moreRequested and the owner appends the next page with
+    append_rows once it has been loaded. Cells are only formatted when
+    the view asks for them in data(), through the column's formatter if
+    one is set (e.g. Jalali dates).
+    """
+
+    CHUNK_SIZE = 100
+
+    moreRequested = pyqtSignal()
+
+    def __init__(self, headers=None, rows=(), parent=None):
+        super().__init__(parent)
+        self._headers = list(headers or [])
+        self._rows = list(rows)
+        self._formatters = {}
+        self._has_more = False
+        self._loading = False
+
+    def set_source(self, headers, rows=(), has_more=False, formatters=None):
+        """Replace headers and rows; has_more tells whether further pages exist.
+
+        formatters maps a column number to a function turning a non-NULL
+        value into its display text.
+        """
+        self.beginResetModel()
+        self._headers = list(headers)
+        self._rows = list(rows)
+        self._formatters = dict(formatters or {})
+        self._has_more = has_more
+        self._loading = False
+        self.endResetModel()
+
+    def append_rows(self, rows, has_more):
+        """Append a loaded page"""
+        self._loading = False
+        self._has_more = has_more
+        if not rows:
+            return
+
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def stop_loading(self):
+        """Give up on further pages, e.g. after a failed request"""
+        self._loading = False
+        self._has_more = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+
+        if role == Qt.DisplayRole:
+            value = self._rows[index.row()][index.column()]
+            if value is None:
+                return ""
+            formatter = self._formatters.get(index.column())
+            return formatter(value) if formatter else str(value)
+
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal and section < len(self._headers):
+            return self._headers[section]
+        if orientation == Qt.Vertical:
+            return section + 1
+        return QVariant()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._loading = True
+        self.moreRequested.emit()
+
+    def find_row(self, record_id):
+        """View row holding record_id among the loaded rows, or -1"""
+        for row, record in enumerate(self._rows):
+            if record[0] == record_id:
+                return row
+        return -1
+
+    def insert_record(self, record, row=0):
+        """Insert a single record without resetting the model"""
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, tuple(record))
+        self.endInsertRows()
+
+    def insert_sorted(self, record, sort_key):
+        """Insert a record where it belongs among rows loaded in descending sort_key order.
+
+        Return False without inserting when it sorts after the last loaded
+        row and further pages exist: it is loaded with its page instead.
+        """
+        key = sort_key(record)
+        row = 0
+        while row < len(self._rows) and sort_key(self._rows[row]) > key:
+            row += 1
+        if row == len(self._rows) and self._has_more:
+            return False
+        self.insert_record(record, row)
+        return True
+
+    def update_record(self, record):
+        """Replace the loaded row with the same id; return False if it is not loaded"""
+        row = self.find_row(record[0])
+        if row < 0:
+            return False
+        self._rows[row] = tuple(record)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+        return True
+
+    def remove_record(self, record_id):
+        """Remove the loaded row with record_id; return False if it is not loaded"""
+        row = self.find_row(record_id)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self.endRemoveRows()
+        return True
+
+    def set_column(self, record_ids, column, value):
+        """Set one column of the loaded rows with any of record_ids; return how many were loaded"""
+        record_ids = set(record_ids)
+        changed = 0
+        for row, record in enumerate(self._rows):
+            if record[0] in record_ids:
+                self._rows[row] = tuple(record[:column]) + (value,) + tuple(record[column + 1:])
+                self.dataChanged.emit(self.index(row, column), self.index(row, column))
+                changed += 1
+        return changed
+
+    def remove_records(self, record_ids):
+        """Remove the loaded rows with any of record_ids; return how many were removed"""
+        record_ids = set(record_ids)
+        removed = 0
+        for row in range(len(self._rows) - 1, -1, -1):
+            if self._rows[row][0] in record_ids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._rows[row]
+                self.endRemoveRows()
+                removed += 1
+        return removed
+
+    def record(self, row):
+        """Raw database row at the given view row"""
+        return self._rows[row]
+
+    def record_id(self, row):
+        """Primary key (first column) of the row"""
+        return self._rows[row][0]